@@ -4,11 +4,26 @@
 
 __version__ = '1.0.3'
 
+from nexo.account_pool import AccountPool, AsyncAccountPool
 from nexo.async_client import AsyncClient
+from nexo.balance_watcher import BalanceDelta, BalanceWatcher
 from nexo.client import Client
+from nexo.fixed_point import FixedPoint, Units
+from nexo.history_store import HistoryStore
+from nexo.kill_switch import AsyncKillSwitch, KillReport, KillSwitch
+from nexo.nonce import NonceGenerator
+from nexo.pairs_cache import PairsCache
+from nexo.rate_limiter import RateLimiter
+from nexo.request_result import RequestResult
+from nexo.retry import RetryBudget, RetryPolicy
+from nexo.scheduler import RequestScheduler
+from nexo.trade_log import TradeLog
+from nexo.transport import TransportConfig
+from nexo.websocket_client import ThreadedWebSocketClient, WebSocketClient
 from nexo.response_serializers import (
     AdvancedOrderResponse,
     Balances,
+    LazySequence,
     Orders,
     Pairs,
     Quote,
@@ -19,6 +34,7 @@ from nexo.response_serializers import (
 )
 from nexo.exceptions import (
     NexoAPIException,
+    NexoOrderStateUnknownException,
     NotImplementedException,
     NexoRequestException,
     NEXO_API_ERROR_CODES,
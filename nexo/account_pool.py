@@ -0,0 +1,284 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import aiohttp
+import requests
+
+from nexo.async_client import AsyncClient
+from nexo.client import Client
+from nexo.exceptions import NexoRequestException
+from nexo.rate_limiter import RateLimiter
+from nexo.response_serializers import Balances
+from nexo.transport import TransportConfig
+
+BALANCE_FIELDS = ("totalBalance", "availableBalance", "lockedBalance", "debt", "interest")
+
+
+def merge_balances(accounts: Dict[str, Dict]) -> Dict:
+    """Balances of several accounts summed per asset, in first seen order.
+
+    Amounts are added as decimals and returned as strings, like the API
+    sends them.
+    """
+    totals: Dict[str, Dict[str, Decimal]] = {}
+    for balances_json in accounts.values():
+        for balance in balances_json.get("balances", []):
+            asset = totals.setdefault(balance["assetName"], {})
+            for field in BALANCE_FIELDS:
+                if balance.get(field) is not None:
+                    asset[field] = asset.get(field, Decimal(0)) + Decimal(str(balance[field]))
+
+    return {
+        "balances": [
+            {"assetName": name, **{field: str(value) for field, value in fields.items()}}
+            for name, fields in totals.items()
+        ]
+    }
+
+
+def merge_positions(accounts: Dict[str, Any]) -> Dict:
+    # every position tagged with the account holding it
+    positions = []
+    for name, positions_json in accounts.items():
+        if isinstance(positions_json, dict):
+            positions_json = positions_json.get("positions", [])
+        positions += [dict(position, account=name) for position in positions_json]
+    return {"positions": positions}
+
+
+class BaseAccountPool:
+    """Clients for several accounts, sharing one connection pool.
+
+    `accounts` maps a name to an `(api_key, api_secret)` pair. Each account
+    gets its own client, and so its own nonces and rate limiter (from
+    `rate_limiter_factory`, the default limits otherwise), while requests
+    go through a single session. The sync clients also share one thread
+    pool for their fan-outs, while `each` calls every account from a thread
+    of its own. `pool["name"]` is the client of an account,
+    other keyword arguments are passed to every client.
+    """
+
+    def __init__(
+        self,
+        accounts: Dict[str, Tuple[str, str]],
+        transport: Optional[TransportConfig] = None,
+        rate_limiter_factory: Optional[Callable[[], RateLimiter]] = None,
+        **client_options,
+    ):
+        if not accounts:
+            raise ValueError("An account pool needs at least one account")
+        self.transport = transport or TransportConfig()
+        self.rate_limiter_factory = rate_limiter_factory
+        self.client_options = client_options
+        self.clients: Dict = {}
+
+    def _rate_limiter(self) -> Optional[RateLimiter]:
+        return self.rate_limiter_factory() if self.rate_limiter_factory else None
+
+    def __getitem__(self, name: str):
+        try:
+            return self.clients[name]
+        except KeyError:
+            raise NexoRequestException(f"Bad Request: Unknown account {name}")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.clients)
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.clients)
+
+    @staticmethod
+    def _collect(results: Dict[str, Any], return_exceptions: bool) -> Dict[str, Any]:
+        if not return_exceptions:
+            for result in results.values():
+                if isinstance(result, BaseException):
+                    raise result
+        return results
+
+    @staticmethod
+    def _succeeded(results: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            name: result
+            for name, result in results.items()
+            if not isinstance(result, BaseException)
+        }
+
+
+class AccountPool(BaseAccountPool):
+    def __init__(
+        self,
+        accounts: Dict[str, Tuple[str, str]],
+        transport: Optional[TransportConfig] = None,
+        rate_limiter_factory: Optional[Callable[[], RateLimiter]] = None,
+        session: Optional[requests.Session] = None,
+        **client_options,
+    ):
+        super().__init__(accounts, transport, rate_limiter_factory, **client_options)
+        self._owns_session = session is None
+        self.session = session or self.transport.create_session()
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(Client.FAN_OUT_WORKERS, self.transport.max_connections),
+            thread_name_prefix="nexo-accounts",
+        )
+        self.clients = {
+            name: Client(
+                api_key,
+                api_secret,
+                rate_limiter=self._rate_limiter(),
+                transport=self.transport,
+                session=self.session,
+                executor=self._executor,
+                **client_options,
+            )
+            for name, (api_key, api_secret) in accounts.items()
+        }
+
+    def close_connection(self):
+        for client in self.clients.values():
+            client.close_connection()
+        self._executor.shutdown(wait=True)
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close_connection()
+
+    def each(self, method: str, *args, return_exceptions: bool = False, **kwargs) -> Dict[str, Any]:
+        """Calls a client method on every account concurrently, by account name."""
+        results: Dict[str, Any] = {}
+
+        def call(name: str, client: Client):
+            try:
+                results[name] = getattr(client, method)(*args, **kwargs)
+            except Exception as e:
+                results[name] = e
+
+        # one thread per account, outside of the shared pool, so that the
+        # fan-outs of the clients (e.g. `kill_switch`) get the whole pool
+        threads = [
+            threading.Thread(target=call, args=(name, client), name=f"nexo-account-{name}")
+            for name, client in self.clients.items()
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self._collect(
+            {name: results[name] for name in self.clients}, return_exceptions
+        )
+
+    def get_account_balances(
+        self, serialize_json_to_object: bool = False, return_exceptions: bool = False
+    ):
+        # accounts that failed are left out of the totals
+        accounts = self.each("get_account_balances", return_exceptions=return_exceptions)
+        balances_json = merge_balances(self._succeeded(accounts))
+        balances_json["accounts"] = accounts
+
+        if serialize_json_to_object:
+            return Balances(balances_json, fixed_point=self.client_options.get("fixed_point"))
+
+        return balances_json
+
+    def get_future_positions(self, status: str, return_exceptions: bool = False) -> Dict:
+        accounts = self.each(
+            "get_future_positions", status, return_exceptions=return_exceptions
+        )
+        positions_json = merge_positions(self._succeeded(accounts))
+        positions_json["accounts"] = accounts
+        return positions_json
+
+
+class AsyncAccountPool(BaseAccountPool):
+    def __init__(
+        self,
+        accounts: Dict[str, Tuple[str, str]],
+        loop=None,
+        transport: Optional[TransportConfig] = None,
+        rate_limiter_factory: Optional[Callable[[], RateLimiter]] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        **client_options,
+    ):
+        super().__init__(accounts, transport, rate_limiter_factory, **client_options)
+        self.loop = loop or asyncio.get_event_loop()
+        self._owns_session = session is None
+        self.session = session or self.transport.create_async_session(self.loop)
+        self.clients = {
+            name: AsyncClient(
+                api_key,
+                api_secret,
+                self.loop,
+                rate_limiter=self._rate_limiter(),
+                transport=self.transport,
+                session=self.session,
+                **client_options,
+            )
+            for name, (api_key, api_secret) in accounts.items()
+        }
+
+    @classmethod
+    async def create(
+        cls,
+        accounts: Dict[str, Tuple[str, str]],
+        loop=None,
+        transport: Optional[TransportConfig] = None,
+        rate_limiter_factory: Optional[Callable[[], RateLimiter]] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        **client_options,
+    ):
+        return cls(accounts, loop, transport, rate_limiter_factory, session, **client_options)
+
+    async def close_connection(self):
+        for client in self.clients.values():
+            await client.close_connection()
+        if self._owns_session:
+            await self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close_connection()
+
+    async def each(
+        self, method: str, *args, return_exceptions: bool = False, **kwargs
+    ) -> Dict[str, Any]:
+        """Calls a client method on every account concurrently, by account name."""
+        results = await asyncio.gather(
+            *(getattr(client, method)(*args, **kwargs) for client in self.clients.values()),
+            return_exceptions=True,
+        )
+        return self._collect(dict(zip(self.clients, results)), return_exceptions)
+
+    async def get_account_balances(
+        self, serialize_json_to_object: bool = False, return_exceptions: bool = False
+    ):
+        # accounts that failed are left out of the totals
+        accounts = await self.each(
+            "get_account_balances", return_exceptions=return_exceptions
+        )
+        balances_json = merge_balances(self._succeeded(accounts))
+        balances_json["accounts"] = accounts
+
+        if serialize_json_to_object:
+            return Balances(balances_json, fixed_point=self.client_options.get("fixed_point"))
+
+        return balances_json
+
+    async def get_future_positions(self, status: str, return_exceptions: bool = False) -> Dict:
+        accounts = await self.each(
+            "get_future_positions", status, return_exceptions=return_exceptions
+        )
+        positions_json = merge_positions(self._succeeded(accounts))
+        positions_json["accounts"] = accounts
+        return positions_json
@@ -1,14 +1,38 @@
-from nexo.base_client import BaseClient
+from nexo.balance_watcher import AdaptiveInterval, BalanceSnapshot
+from nexo.base_client import BaseClient, PreparedRequest
 from typing import Dict, Optional, List, Tuple
 
+from functools import partial
 from operator import itemgetter
+from collections import deque
 import aiohttp
 import asyncio
 import json
 import time
 
-from nexo.exceptions import NexoAPIException, NEXO_API_ERROR_CODES, NexoRequestException
-from nexo.helpers import check_pair_validity, compact_json_dict
+from multidict import CIMultiDict
+
+from nexo.coalescing import AsyncSingleFlight
+from nexo.codec import JSONCodec
+from nexo.columns import order_columns, trade_columns
+from nexo.exceptions import (
+    NexoAPIException,
+    NexoOrderStateUnknownException,
+    NexoRequestException,
+)
+from nexo.fixed_point import FixedPoint
+from nexo.helpers import check_pair_validity
+from nexo.history import HistoryShard, make_shards, merge_records
+from nexo.history_store import ORDERS, TRADES, HistoryStore
+from nexo.json_stream import JSONArrayStream
+from nexo.kill_switch import AsyncKillSwitch, KillReport
+from nexo.nonce import NonceGenerator
+from nexo.pairs_cache import PairsCache
+from nexo.rate_limiter import RateLimiter
+from nexo.request_result import RequestResult
+from nexo.retry import VERIFY, RetryPolicy, match_placed_order
+from nexo.scheduler import RequestScheduler
+from nexo.transport import TransportConfig
 from nexo.response_serializers import (
     Balances,
     AdvancedOrderResponse,
@@ -18,126 +42,320 @@ from nexo.response_serializers import (
     Pairs,
     Transaction,
     Quote,
+    Trade,
     TradeHistory,
 )
 
 
 class AsyncClient(BaseClient):
-    def __init__(self, api_key, api_secret, loop=None):
+    def __init__(
+        self,
+        api_key,
+        api_secret,
+        loop=None,
+        rate_limiter: Optional[RateLimiter] = None,
+        nonce_generator: Optional[NonceGenerator] = None,
+        transport: Optional[TransportConfig] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        pairs_cache: Optional[PairsCache] = None,
+        single_flight: Optional[AsyncSingleFlight] = None,
+        json_codec: Optional[JSONCodec] = None,
+        fixed_point: Optional[FixedPoint] = None,
+        debug_history: int = 0,
+        scheduler: Optional[RequestScheduler] = None,
+    ):
         self.loop = loop or asyncio.get_event_loop()
-        super().__init__(api_key, api_secret)
-        self._init_session()
+        super().__init__(
+            api_key,
+            api_secret,
+            rate_limiter,
+            nonce_generator,
+            retry_policy,
+            pairs_cache,
+            json_codec,
+            fixed_point,
+        )
+        self.transport = transport or TransportConfig()
+        # identical concurrent GETs share one request
+        self.single_flight = single_flight or AsyncSingleFlight()
+        self._pairs_refresh = None
+        # opt-in ring buffer of the last `debug_history` request results,
+        # responses themselves are never kept once their body is read
+        self.debug_history = deque(maxlen=debug_history) if debug_history else None
+        # rate limiter tokens go to cancels first, bulk history last
+        self.scheduler = scheduler or RequestScheduler(self.rate_limiter)
+        # a session passed in may be shared with other clients, leave it open
+        self._owns_session = session is None
+        if session is None:
+            self._init_session()
+        else:
+            self.session = session
 
     @classmethod
-    async def create(cls, api_key=None, api_secret=None, loop=None):
-        return cls(api_key, api_secret, loop)
+    async def create(
+        cls,
+        api_key=None,
+        api_secret=None,
+        loop=None,
+        rate_limiter: Optional[RateLimiter] = None,
+        nonce_generator: Optional[NonceGenerator] = None,
+        transport: Optional[TransportConfig] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        pairs_cache: Optional[PairsCache] = None,
+        single_flight: Optional[AsyncSingleFlight] = None,
+        json_codec: Optional[JSONCodec] = None,
+        fixed_point: Optional[FixedPoint] = None,
+        debug_history: int = 0,
+        scheduler: Optional[RequestScheduler] = None,
+    ):
+        return cls(
+            api_key,
+            api_secret,
+            loop,
+            rate_limiter,
+            nonce_generator,
+            transport,
+            session,
+            retry_policy,
+            pairs_cache,
+            single_flight,
+            json_codec,
+            fixed_point,
+            debug_history,
+            scheduler,
+        )
 
     def _init_session(self):
-        session = aiohttp.ClientSession(loop=self.loop)
-        headers = {
-            "Accept": "application/json",
-            "User-Agent": "python-nexo",
-            "Content-Type": "application/json",
-            "X-API-KEY": self.API_KEY,
-        }
-        session.headers.update(headers)
-
-        self.session = session
+        self.session = self.transport.create_async_session(self.loop)
 
     async def close_connection(self):
-        if self.session:
+        if self.session and self._owns_session:
             assert self.session
             await self.session.close()
 
-    async def _handle_response(self, response: aiohttp.ClientResponse):
-        json_response = {}
-
-        try:
-            json_response = await response.json()
-        except Exception:
-            if not response.ok:
-                raise NexoRequestException(
-                    f"Failed to get API response: \nCode: {response.status_code}\nRequest: {str(response.request.body)}"
-                )
-
-        try:
-            if "errorCode" in json_response:
-                if json_response["errorCode"] in NEXO_API_ERROR_CODES:
-                    raise NexoAPIException(
-                        json_response["errorCode"], await response.text()
-                    )
-                else:
-                    raise NexoRequestException(
-                        f'Invalid Response: status: {json_response["errorCode"]}, message: {json_response["errorMessage"]}\n body: {response.request.body}'
-                    )
-            else:
-                if not response.ok:
-                    raise NexoRequestException(
-                        f"Failed to get API response: \nCode: {response.status_code}\nRequest: {str(response.request.body)}"
-                    )
+    def _handle_response(
+        self, request: PreparedRequest, response: aiohttp.ClientResponse, body: bytes
+    ):
+        return self._parse_response(request, response.status, body)
 
-                return json_response
+    async def _request(
+        self, method, path: str, version=BaseClient.PUBLIC_API_VERSION, data: Optional[Dict] = None
+    ) -> RequestResult:
+        return await self._call(self._prepare(method, path, version, data))
 
-        except ValueError:
-            raise NexoRequestException("Invalid Response: %s" % json_response)
+    async def _call(self, request: PreparedRequest) -> RequestResult:
+        if request.limits is not None:
+            await self._check_pair_limits(*request.limits)
 
-    async def _request(
-        self, method, path: str, version=BaseClient.PUBLIC_API_VERSION, **kwargs
-    ):
-        # set default requests timeout
-        kwargs["timeout"] = 10
+        if request.key is not None:
+            return await self.single_flight.do(request.key, lambda: self._execute(request))
 
-        kwargs["data"] = kwargs.get("data", {})
-        kwargs["headers"] = kwargs.get("headers", {})
+        return await self._execute(request)
 
-        full_path = self._create_path(path, version)
-        uri = self._create_api_uri(full_path)
+    async def request(
+        self,
+        method: str,
+        path: str,
+        data: Optional[Dict] = None,
+        version=BaseClient.PUBLIC_API_VERSION,
+    ) -> RequestResult:
+        """Calls any endpoint, returning the JSON with the status, headers and timing."""
+        return await self._request(method.lower(), path, version, data)
+
+    async def _execute(self, request: PreparedRequest) -> RequestResult:
+        self.retry_policy.budget.deposit()
+        attempt = 1
+        delay = 0.0
+        started = time.monotonic()
+
+        while True:
+            sent_at = self.nonce_generator.server_time()
+            try:
+                result = await self._send(request)
+                result.attempts = attempt
+                return result
+            except Exception as e:
+                action = self.retry_policy.action(request.method, request.path, e, attempt)
+                if action is None:
+                    raise
+
+                if action == VERIFY:
+                    order_id = await self._confirm_placed_order(request.data, sent_at, e)
+                    return RequestResult(
+                        request.method,
+                        request.path,
+                        None,
+                        CIMultiDict(),
+                        time.monotonic() - started,
+                        {"orderId": order_id},
+                        attempt,
+                    )
 
-        nonce = str(int(time.time() * 1000))
-        kwargs["headers"]["X-NONCE"] = nonce
-        kwargs["headers"]["X-SIGNATURE"] = self._generate_signature(nonce).decode(
-            "utf8"
+            delay = self.retry_policy.backoff(delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _confirm_placed_order(self, data: Dict, since: float, error: Exception) -> str:
+        # the history may not show the order yet, look a few times before
+        # giving up without sending it again
+        for attempt in range(self.retry_policy.verify_attempts):
+            if attempt:
+                await asyncio.sleep(self.retry_policy.verify_delay)
+            try:
+                order_id = await self._find_placed_order(data, since)
+            except Exception:
+                continue
+            if order_id:
+                return order_id
+        raise NexoOrderStateUnknownException(data, error) from error
+
+    async def _find_placed_order(self, data: Dict, since: float) -> Optional[str]:
+        orders_json = (
+            await self._call(
+                self._live(
+                    self._prepare("get", "orders", data=self._order_lookup_params(data, since))
+                )
+            )
+        ).json
+        return match_placed_order(orders_json, data, since)
+
+    async def _open(
+        self, request: PreparedRequest
+    ) -> Tuple[aiohttp.ClientResponse, float]:
+        await self.scheduler.acquire(request.path, request.method, request.priority)
+        self._sign(request)
+
+        sent_at = time.monotonic()
+        response = await self.session.request(
+            request.method,
+            request.uri,
+            params=request.params,
+            data=request.body,
+            headers=request.headers,
+            timeout=self.REQUEST_TIMEOUT,
         )
+        self.nonce_generator.observe(
+            response.headers.get("Date"), sent_at, time.monotonic()
+        )
+        return response, sent_at
+
+    async def _send(self, request: PreparedRequest) -> RequestResult:
+        response, sent_at = await self._open(request)
+        # the body is read once and the connection released before parsing,
+        # only the status and a copy of the headers outlive the response
+        async with response:
+            body = await response.read()
+        result = RequestResult(
+            request.method,
+            request.path,
+            response.status,
+            CIMultiDict(response.headers),
+            time.monotonic() - sent_at,
+        )
+        if self.debug_history is not None:
+            self.debug_history.append(result)
 
-        if kwargs["data"] and method == "get":
-            kwargs["params"] = kwargs["data"]
-            del kwargs["data"]
+        try:
+            result.json = self._handle_response(request, response, body)
+        except NexoAPIException as e:
+            if e.code == 301:
+                self.rate_limiter.on_rate_limited(request.path, request.method)
+            raise
+
+        self.rate_limiter.on_success(request.path, request.method)
+        return result
+
+    async def _stream(self, request: PreparedRequest, key: str):
+        # GET yielding the records of the `key` array while the body downloads,
+        # it is not retried since records may already have been consumed
+        response, _ = await self._open(request)
+        async with response:
+            try:
+                if not response.ok:
+                    self._handle_response(request, response, await response.read())
 
-        if method != "get" and kwargs["data"]:
-            kwargs["data"] = compact_json_dict(kwargs["data"])
+                parser = JSONArrayStream(key, self.json_codec)
+                async for chunk in response.content.iter_chunked(self.STREAM_CHUNK_SIZE):
+                    for record in parser.feed(chunk):
+                        yield record
+                self._check_error_body(parser.close())
+            except NexoAPIException as e:
+                if e.code == 301:
+                    self.rate_limiter.on_rate_limited(request.path, request.method)
+                raise
 
-        async with getattr(self.session, method)(uri, **kwargs) as response:
-            self.response = response
-            return await self._handle_response(response)
+        self.rate_limiter.on_success(request.path, request.method)
 
     async def _get(self, path, version=BaseClient.PUBLIC_API_VERSION, **kwargs):
-        return await self._request("get", path, version, **kwargs)
+        return (await self._request("get", path, version, **kwargs)).json
 
     async def _post(
         self, path, version=BaseClient.PUBLIC_API_VERSION, **kwargs
     ) -> Dict:
-        return await self._request("post", path, version, **kwargs)
+        return (await self._request("post", path, version, **kwargs)).json
 
     async def _put(self, path, version=BaseClient.PUBLIC_API_VERSION, **kwargs) -> Dict:
-        return await self._request("put", path, version, **kwargs)
+        return (await self._request("put", path, version, **kwargs)).json
 
     async def _delete(
         self, path, version=BaseClient.PUBLIC_API_VERSION, **kwargs
     ) -> Dict:
-        return await self._request("delete", path, version, **kwargs)
+        return (await self._request("delete", path, version, **kwargs)).json
+
+    async def _refresh_pairs(self):
+        try:
+            await self.get_pairs()
+        except Exception:
+            self.pairs_cache.end_refresh()
+
+    async def _check_pair_limits(
+        self, pair: str, amount, action: str, amount_name: str = "quantity"
+    ):
+        if self.pairs_cache is None:
+            return
+
+        if self.pairs_cache.is_empty:
+            try:
+                await self.get_pairs()
+            except Exception:
+                # without metadata the server is left to validate the order
+                return
+        elif self.pairs_cache.begin_refresh():
+            self._pairs_refresh = asyncio.ensure_future(self._refresh_pairs())
+
+        self.pairs_cache.validate(pair, amount, action, amount_name)
 
     async def get_account_balances(
-        self, serialize_json_to_object: bool = False
+        self, serialize_json_to_object: bool = False, lazy: bool = False
     ) -> Dict:
         balances_json = await self._get("accountSummary")
 
         if serialize_json_to_object:
-            return Balances(balances_json)
+            return Balances(balances_json, lazy=lazy, fixed_point=self.fixed_point)
 
         return balances_json
 
+    async def watch_balances(
+        self, min_interval: float = 1.0, max_interval: float = 30.0, backoff: float = 2.0
+    ):
+        # yields a `BalanceDelta` per asset that changed since the previous
+        # poll, every asset on the first one, polling less often while
+        # nothing changes
+        snapshot = BalanceSnapshot(self.fixed_point)
+        interval = AdaptiveInterval(min_interval, max_interval, backoff)
+
+        while True:
+            deltas = snapshot.update(await self._get("accountSummary"))
+            for delta in deltas:
+                yield delta
+            await asyncio.sleep(interval.next(bool(deltas)))
+
     async def get_pairs(self, serialize_json_to_object: bool = False) -> Dict:
         pairs_json = await self._get("pairs")
+        if self.pairs_cache is not None:
+            self.pairs_cache.update(pairs_json)
 
         if serialize_json_to_object:
             return Pairs(pairs_json)
@@ -152,24 +370,12 @@ class AsyncClient(BaseClient):
         exchanges: str = None,
         serialize_json_to_object: bool = False,
     ) -> Dict:
-        if side != "buy" and side != "sell":
-            raise NexoRequestException(
-                f"Bad Request: Tried to get price quote with side = {side}, side must be 'buy' or 'sell'"
-            )
-        if not check_pair_validity(pair):
-            raise NexoRequestException(
-                f"Bad Request: Tried to place a trigger order with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
-            )
-
-        data = {"side": side, "amount": amount, "pair": pair}
-
-        if exchanges:
-            data["exchanges"] = exchanges
-
-        quote_json = await self._get("quote", data=data)
+        quote_json = (
+            await self._call(self._build_get_price_quote(pair, amount, side, exchanges))
+        ).json
 
         if serialize_json_to_object:
-            return Quote(quote_json)
+            return Quote(quote_json, fixed_point=self.fixed_point)
 
         return quote_json
 
@@ -181,32 +387,29 @@ class AsyncClient(BaseClient):
         page_size: int,
         page_num: int,
         serialize_json_to_object: bool = False,
+        lazy: bool = False,
+        columns: bool = False,
     ) -> Dict:
-        data = {
-            "pairs": pairs,
-            "startDate": start_date,
-            "endDate": end_date,
-            "pageSize": page_size,
-            "pageNum": page_num,
-        }
-        orders_json = await self._get("orders", data=data)
+        orders_json = (
+            await self._call(
+                self._build_get_order_history(pairs, start_date, end_date, page_size, page_num)
+            )
+        ).json
 
+        if columns:
+            return order_columns(orders_json.get("orders", []))
         if serialize_json_to_object:
-            return Orders(orders_json)
+            return Orders(orders_json, lazy=lazy, fixed_point=self.fixed_point)
 
         return orders_json
 
     async def get_order_details(
         self, id: str, serialize_json_to_object: bool = False
     ) -> Dict:
-        data = {
-            "id": id,
-        }
-
-        order_details_json = await self._get(f"orderDetails", data=data)
+        order_details_json = (await self._call(self._build_get_order_details(id))).json
 
         if serialize_json_to_object:
-            return OrderDetails(order_details_json)
+            return OrderDetails(order_details_json, fixed_point=self.fixed_point)
 
         return order_details_json
 
@@ -218,38 +421,293 @@ class AsyncClient(BaseClient):
         page_size: int,
         page_num: int,
         serialize_json_to_object: bool = False,
+        lazy: bool = False,
+        columns: bool = False,
     ) -> Dict:
+        trades_json = (
+            await self._call(
+                self._build_get_trade_history(pairs, start_date, end_date, page_size, page_num)
+            )
+        ).json
+
+        if columns:
+            return trade_columns(trades_json.get("trades", []))
+        if serialize_json_to_object:
+            return TradeHistory(trades_json, lazy=lazy, fixed_point=self.fixed_point)
+
+        return trades_json
+
+    async def _iter_history(
+        self, fetch, key: str, page_size: int, page_num: int, record=None, page_record=None
+    ):
+        # the next page is requested while the current one is being consumed,
+        # `page_record` turns whole pages into one item, e.g. into columns
+        page_size = int(page_size)
+        page_num = int(page_num)
+        next_page = asyncio.ensure_future(fetch(page_num))
+        try:
+            while next_page is not None:
+                records = (await next_page).get(key, [])
+
+                if len(records) < page_size:
+                    next_page = None
+                else:
+                    page_num += 1
+                    next_page = asyncio.ensure_future(fetch(page_num))
+
+                if page_record is not None:
+                    if records:
+                        yield page_record(records)
+                else:
+                    for item in records:
+                        yield record(item) if record else item
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    @staticmethod
+    async def _iter_history_stream(stream, page_size: int, page_num: int, record=None):
+        # records are handed out while their page is still downloading
+        page_size = int(page_size)
+        page_num = int(page_num)
+        while True:
+            count = 0
+            async for item in stream(page_num):
+                count += 1
+                yield record(item) if record else item
+
+            if count < page_size:
+                return
+            page_num += 1
+
+    def iter_order_history(
+        self,
+        pairs: List[str],
+        start_date: int,
+        end_date: int,
+        page_size: int = 100,
+        page_num: int = 0,
+        serialize_json_to_object: bool = False,
+        columns: bool = False,
+        stream: bool = False,
+    ):
+        record = (
+            partial(OrderDetails, fixed_point=self.fixed_point)
+            if serialize_json_to_object
+            else None
+        )
+        if stream and not columns:
+            return self._iter_history_stream(
+                lambda page: self._stream(
+                    self._build_get_order_history(
+                        pairs, start_date, end_date, page_size, page
+                    ),
+                    "orders",
+                ),
+                page_size,
+                page_num,
+                record,
+            )
+
+        async def fetch(page):
+            return await self.get_order_history(
+                pairs, start_date, end_date, page_size, page
+            )
+
+        return self._iter_history(
+            fetch,
+            "orders",
+            page_size,
+            page_num,
+            record,
+            order_columns if columns else None,
+        )
+
+    def iter_trade_history(
+        self,
+        pairs: List[str],
+        start_date: int,
+        end_date: int,
+        page_size: int = 100,
+        page_num: int = 0,
+        serialize_json_to_object: bool = False,
+        columns: bool = False,
+        stream: bool = False,
+    ):
+        record = (
+            partial(Trade, fixed_point=self.fixed_point)
+            if serialize_json_to_object
+            else None
+        )
+        if stream and not columns:
+            return self._iter_history_stream(
+                lambda page: self._stream(
+                    self._build_get_trade_history(
+                        pairs, start_date, end_date, page_size, page
+                    ),
+                    "trades",
+                ),
+                page_size,
+                page_num,
+                record,
+            )
+
+        async def fetch(page):
+            return await self.get_trade_history(
+                pairs, start_date, end_date, page_size, page
+            )
+
+        return self._iter_history(
+            fetch,
+            "trades",
+            page_size,
+            page_num,
+            record,
+            trade_columns if columns else None,
+        )
+
+    async def download_trade_history(
+        self,
+        pairs: List[str],
+        start_date: int,
+        end_date: int,
+        shard_duration: int = 86_400_000,
+        pairs_per_shard: int = 10,
+        max_concurrency: int = 8,
+        page_size: int = 500,
+        max_pages_per_shard: int = 2,
+        min_shard_duration: int = 60_000,
+        serialize_json_to_object: bool = False,
+    ) -> List:
+        # Splits [start_date, end_date] and the pairs into shards fetched
+        # concurrently, the shared rate limiter bounding the request rate. A
+        # shard with more than `max_pages_per_shard` pages is split in two
+        # time halves, only over the part of its window those pages did not
+        # cover, and duplicates at the boundary are dropped when merging.
         for pair in pairs:
             if not check_pair_validity(pair):
                 raise NexoRequestException(
                     f"Bad Request: Tried to get trade history with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
                 )
 
-        data = {
-            "pairs": pairs,
-            "startDate": start_date,
-            "endDate": end_date,
-            "pageSize": page_size,
-            "pageNum": page_num,
-        }
+        queue = asyncio.Queue()
+        for shard in make_shards(
+            pairs, start_date, end_date, shard_duration, pairs_per_shard
+        ):
+            queue.put_nowait(shard)
+
+        batches = []
+        errors = []
+
+        async def fetch_shard(shard: HistoryShard):
+            page_num = 0
+            first = None
+            while True:
+                records = (
+                    await self.get_trade_history(
+                        shard.pairs,
+                        shard.start_date,
+                        shard.end_date,
+                        page_size,
+                        page_num,
+                    )
+                ).get("trades", [])
+                batches.append(records)
+
+                if len(records) < page_size:
+                    return
+                page_num += 1
+                if first is None:
+                    first = int(records[0]["timestamp"])
+
+                if page_num >= max_pages_per_shard:
+                    rest = shard.remaining(first, int(records[-1]["timestamp"]))
+                    if rest.duration > min_shard_duration:
+                        for half in rest.split():
+                            queue.put_nowait(half)
+                        return
+
+        async def worker():
+            while True:
+                shard = await queue.get()
+                try:
+                    if not errors:
+                        await fetch_shard(shard)
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(max_concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
-        trades_json = await self._get("trades", data=data)
+        if errors:
+            raise errors[0]
 
+        trades = merge_records(batches)
         if serialize_json_to_object:
-            return TradeHistory(trades_json)
+            return [Trade(trade, fixed_point=self.fixed_point) for trade in trades]
+        return trades
+
+    async def _sync_history(
+        self, store: HistoryStore, kind: str, pairs, start_date, end_date, page_size
+    ) -> int:
+        if end_date is None:
+            end_date = int(self.nonce_generator.server_time())
+        iterate = self.iter_trade_history if kind == TRADES else self.iter_order_history
+        add = store.add_trades if kind == TRADES else store.add_orders
+
+        async def sync_pair(pair):
+            start = store.sync_start(kind, pair, start_date)
+            records = [
+                record
+                async for record in iterate([pair], start, end_date, page_size=page_size)
+            ]
+            # stored in one go, the watermark only moves once the window is complete
+            return add(records)
+
+        return sum(await asyncio.gather(*(sync_pair(pair) for pair in pairs)))
+
+    async def sync_trade_history(
+        self,
+        store: HistoryStore,
+        pairs: List[str],
+        start_date: int = 0,
+        end_date: Optional[int] = None,
+        page_size: int = 500,
+    ) -> int:
+        # only trades newer than the store's watermark for each pair are fetched
+        return await self._sync_history(
+            store, TRADES, pairs, start_date, end_date, page_size
+        )
 
-        return trades_json
+    async def sync_order_history(
+        self,
+        store: HistoryStore,
+        pairs: List[str],
+        start_date: int = 0,
+        end_date: Optional[int] = None,
+        page_size: int = 500,
+    ) -> int:
+        # newer orders, and the ones that were still open, are fetched again
+        return await self._sync_history(
+            store, ORDERS, pairs, start_date, end_date, page_size
+        )
 
     async def get_transaction_info(
         self, transaction_id: str, serialize_json_to_object: bool = False
     ) -> Dict:
-
-        data = {"transactionId": transaction_id}
-
-        transaction_json = await self._get(f"transaction", data=data)
+        transaction_json = (
+            await self._call(self._build_get_transaction_info(transaction_id))
+        ).json
 
         if serialize_json_to_object:
-            return Transaction(transaction_json)
+            return Transaction(transaction_json, fixed_point=self.fixed_point)
 
         return transaction_json
 
@@ -262,31 +720,50 @@ class AsyncClient(BaseClient):
         price: float = None,
         serialize_json_to_object: bool = False,
     ) -> Dict:
-        if side != "buy" and side != "sell":
-            raise NexoRequestException(
-                f"Bad Request: Tried to place an order with side = {side}, side must be 'buy' or 'sell'"
-            )
-        if type != "market" and type != "limit":
-            raise NexoRequestException(
-                f"Bad Request: Tried to place an order with type = {type}, side must be 'market' or 'limit'"
-            )
-        if not check_pair_validity(pair):
-            raise NexoRequestException(
-                f"Bad Request: Tried to place an order with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
-            )
-
-        data = {"pair": pair, "side": side, "type": type, "quantity": quantity}
-
-        if price:
-            data["price"] = price
-
-        order_id_json = await self._post("orders", data=data)
+        order_id_json = (
+            await self._call(self._build_place_order(pair, side, type, quantity, price))
+        ).json
 
         if serialize_json_to_object:
             return OrderResponse(order_id_json)
 
         return order_id_json
 
+    async def place_orders(
+        self,
+        intents: List[Dict],
+        max_concurrency: int = 10,
+        serialize_json_to_object: bool = False,
+    ) -> List:
+        # Each intent holds the place_order arguments. Results come back in
+        # the order of the intents, an order id response or the exception
+        # raised for that intent. Invalid intents are rejected before any
+        # order is sent.
+        results = [None] * len(intents)
+        valid = []
+
+        for i, intent in enumerate(intents):
+            try:
+                await self._check_pair_limits(*self._build_place_order(**intent).limits)
+            except Exception as e:
+                results[i] = e
+            else:
+                valid.append(i)
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def submit(i: int):
+            async with semaphore:
+                try:
+                    results[i] = await self.place_order(
+                        **intents[i], serialize_json_to_object=serialize_json_to_object
+                    )
+                except Exception as e:
+                    results[i] = e
+
+        await asyncio.gather(*[submit(i) for i in valid])
+        return results
+
     async def place_trigger_order(
         self,
         pair: str,
@@ -298,38 +775,19 @@ class AsyncClient(BaseClient):
         trailing_percentage: float = None,
         serialize_json_to_object: bool = False,
     ) -> Dict:
-        if side != "buy" and side != "sell":
-            raise NexoRequestException(
-                f"Bad Request: Tried to place a trigger order with side = {side}, side must be 'buy' or 'sell'"
-            )
-        if (
-            trigger_type != "stopLoss"
-            and trigger_type != "takeProfit"
-            and trigger_type != "trailing"
-        ):
-            raise NexoRequestException(
-                f"Bad Request: Tried to place a trigger order with trigger type = {trigger_type}, trigger type must be 'stopLoss' or 'takeProfit' or 'trailing'"
-            )
-        if not check_pair_validity(pair):
-            raise NexoRequestException(
-                f"Bad Request: Tried to place a trigger order with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
+        order_id_json = (
+            await self._call(
+                self._build_place_trigger_order(
+                    pair,
+                    side,
+                    trigger_type,
+                    amount,
+                    trigger_price,
+                    trailing_distance,
+                    trailing_percentage,
+                )
             )
-
-        data = {
-            "pair": pair,
-            "side": side,
-            "triggerType": trigger_type,
-            "amount": amount,
-            "triggerPrice": trigger_price,
-        }
-
-        if trailing_distance:
-            data["trailingDistance"] = trailing_distance
-
-        if trailing_percentage:
-            data["trailingPercentage"] = trailing_percentage
-
-        order_id_json = await self._post("orders", data=data)
+        ).json
 
         if serialize_json_to_object:
             return OrderResponse(order_id_json)
@@ -345,24 +803,13 @@ class AsyncClient(BaseClient):
         take_profit_price: str,
         serialize_json_to_object: bool = False,
     ) -> Dict:
-        if side != "buy" and side != "sell":
-            raise NexoRequestException(
-                f"Bad Request: Tried to place an advanced order with side = {side}, side must be 'buy' or 'sell'"
-            )
-
-        if not check_pair_validity(pair):
-            raise NexoRequestException(
-                f"Bad Request: Tried to place an advanced order with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
+        order_id_json = (
+            await self._call(
+                self._build_place_advanced_order(
+                    pair, side, amount, stop_loss_price, take_profit_price
+                )
             )
-
-        data = {
-            "pair": pair,
-            "side": side,
-            "amount": amount,
-            "stopLossPrice": stop_loss_price,
-            "takeProfitPrice": take_profit_price,
-        }
-        order_id_json = await self._post("orders", data=data)
+        ).json
 
         if serialize_json_to_object:
             return AdvancedOrderResponse(order_id_json)
@@ -379,28 +826,13 @@ class AsyncClient(BaseClient):
         exchanges: List[str] = None,
         serialize_json_to_object: bool = False,
     ) -> Dict:
-        if side != "buy" and side != "sell":
-            raise NexoRequestException(
-                f"Bad Request: Tried to place a twap order with side = {side}, side must be 'buy' or 'sell'"
-            )
-
-        if not check_pair_validity(pair):
-            raise NexoRequestException(
-                f"Bad Request: Tried to place a twap order with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
+        twap_order_json = (
+            await self._call(
+                self._build_place_twap_order(
+                    pair, side, quantity, splits, execution_interval, exchanges
+                )
             )
-
-        data = {
-            "pair": pair,
-            "side": side,
-            "quantity": quantity,
-            "splits": splits,
-            "executionInterval": execution_interval,
-        }
-
-        if exchanges:
-            data["exchanges"] = exchanges
-
-        twap_order_json = await self._post("orders/twap", data=data)
+        ).json
 
         if serialize_json_to_object:
             return AdvancedOrderResponse(twap_order_json)
@@ -408,32 +840,16 @@ class AsyncClient(BaseClient):
         return twap_order_json
 
     async def cancel_order(self, order_id: str):
-        data = {"orderId": order_id}
-
-        return await self._post("orders/cancel", data=data)
+        return (await self._call(self._build_cancel_order(order_id))).json
 
     async def cancel_all_orders(self, pair: str):
-        if not check_pair_validity(pair):
-            raise NexoRequestException(
-                f"Bad Request: Tried to cancel all orders with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
-            )
-
-        data = {"pair": pair}
-
-        return await self._post("orders/cancel/all", data=data)
+        return (await self._call(self._build_cancel_all_orders(pair))).json
 
     async def get_all_future_instruments(self):
         return await self._get("futures/instruments")
 
     async def get_future_positions(self, status: str):
-        if status != "any" and status != "active" and status != "inactive":
-            raise NexoRequestException(
-                f"Bad Request: Tried to get future positions with status = {status}, status must be 'any', 'active' or 'inactive'"
-            )
-
-        data = {"status": status}
-
-        return await self._get("futures/positions", data=data)
+        return (await self._call(self._build_get_future_positions(status))).json
 
     async def place_future_order(
         self,
@@ -443,30 +859,20 @@ class AsyncClient(BaseClient):
         type: str,
         quantity: float,
     ):
-        if position_action != "open" and position_action != "close":
-            raise NexoRequestException(
-                f"Bad Request: Tried to place future position with position action = {position_action}, must be 'open' or 'close'"
-            )
-
-        if position_side != "long" and position_side != "short":
-            raise NexoRequestException(
-                f"Bad Request: Tried to place future position with position side = {position_side}, must be 'long' or 'short'"
-            )
-
-        if type != "market":
-            raise NexoRequestException(
-                f"Bad Request: Tried to place future position with type = {type}, must be 'market'"
+        return (
+            await self._call(
+                self._build_place_future_order(
+                    instrument, position_action, position_side, type, quantity
+                )
             )
-
-        data = {
-            "positionAction": position_action,
-            "instrument": instrument,
-            "positionSide": position_side,
-            "type": type,
-            "quantity": quantity,
-        }
-
-        return await self._post("futures/order", data=data)
+        ).json
 
     async def close_all_future_positions(self):
         return await self._post("futures/close-all-positions")
+
+    async def kill_switch(
+        self, pairs: List[str], close_positions: bool = True, verify: bool = True
+    ) -> KillReport:
+        # cancels every order on `pairs` and closes all futures positions
+        # concurrently, see `AsyncKillSwitch` to warm connections up beforehand
+        return await AsyncKillSwitch(self, pairs, close_positions).fire(verify)
@@ -0,0 +1,173 @@
+import queue
+import threading
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional
+
+from nexo.fixed_point import FixedPoint
+from nexo.response_serializers import WalletBalance
+
+# amounts compared between two snapshots, by attribute of `WalletBalance`
+BALANCE_AMOUNTS = {
+    key: attribute
+    for key, attribute in WalletBalance._FIELDS.items()
+    if key in WalletBalance._NUMERIC
+}
+
+
+def _amount(value):
+    if value is None:
+        return 0
+    if isinstance(value, int):
+        # units in fixed point mode
+        return value
+    return Decimal(str(value))
+
+
+class BalanceDelta:
+    """How one asset changed between two polls.
+
+    `changes` maps the amounts that moved (e.g. "available_balance") to
+    their difference, decimals or fixed point units. `previous` is None for
+    an asset seen for the first time and `current` for one that is gone.
+    """
+
+    __slots__ = ("asset_name", "previous", "current", "changes")
+
+    def __init__(
+        self,
+        asset_name: str,
+        previous: Optional[WalletBalance],
+        current: Optional[WalletBalance],
+    ):
+        self.asset_name = asset_name
+        self.previous = previous
+        self.current = current
+        self.changes = {}
+        for attribute in BALANCE_AMOUNTS.values():
+            change = _amount(getattr(current, attribute, None)) - _amount(
+                getattr(previous, attribute, None)
+            )
+            if change:
+                self.changes[attribute] = change
+
+    def __repr__(self):
+        return f"BalanceDelta({self.asset_name}, {self.changes})"
+
+
+class BalanceSnapshot:
+    """The last balance of every asset, by `asset_name`.
+
+    Raw amounts are compared first, so `WalletBalance` objects are only
+    built for the assets that changed.
+    """
+
+    def __init__(self, fixed_point: Optional[FixedPoint] = None):
+        self.fixed_point = fixed_point
+        self.balances: Dict[str, WalletBalance] = {}
+        self._raw: Dict[str, tuple] = {}
+
+    def update(self, balances_json: Dict) -> List[BalanceDelta]:
+        deltas = []
+        seen = set()
+
+        for balance in balances_json.get("balances") or []:
+            name = balance["assetName"]
+            seen.add(name)
+            raw = tuple(balance.get(key) for key in BALANCE_AMOUNTS)
+            if self._raw.get(name) == raw:
+                continue
+
+            current = WalletBalance(balance, fixed_point=self.fixed_point)
+            delta = BalanceDelta(name, self.balances.get(name), current)
+            self._raw[name] = raw
+            self.balances[name] = current
+            if delta.changes or delta.previous is None:
+                deltas.append(delta)
+
+        for name in [name for name in self.balances if name not in seen]:
+            deltas.append(BalanceDelta(name, self.balances.pop(name), None))
+            del self._raw[name]
+
+        return deltas
+
+
+class AdaptiveInterval:
+    """Poll interval growing by `backoff` while nothing changes."""
+
+    def __init__(self, min_interval: float = 1.0, max_interval: float = 30.0, backoff: float = 2.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+
+    def next(self, changed: bool) -> float:
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        return self.interval
+
+
+class BalanceWatcher:
+    """Polls balances on a background thread, iterating yields the deltas.
+
+    Returned started by `Client.watch_balances`. An error while polling
+    stops the watcher and is raised by the iteration.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        client,
+        min_interval: float = 1.0,
+        max_interval: float = 30.0,
+        backoff: float = 2.0,
+    ):
+        self.client = client
+        self.snapshot = BalanceSnapshot(client.fixed_point)
+        self.interval = AdaptiveInterval(min_interval, max_interval, backoff)
+        self._deltas = queue.Queue()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="nexo-balance-watcher", daemon=True
+        )
+
+    @property
+    def balances(self) -> Dict[str, WalletBalance]:
+        return self.snapshot.balances
+
+    def start(self) -> "BalanceWatcher":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        self._deltas.put(self._STOP)
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        try:
+            while not self._stopping.is_set():
+                deltas = self.snapshot.update(self.client._get("accountSummary"))
+                for delta in deltas:
+                    self._deltas.put(delta)
+                self._stopping.wait(self.interval.next(bool(deltas)))
+        except Exception as e:
+            self._deltas.put(e)
+
+    def __iter__(self) -> Iterator[BalanceDelta]:
+        while True:
+            delta = self._deltas.get()
+            if delta is self._STOP:
+                return
+            if isinstance(delta, Exception):
+                raise delta
+            yield delta
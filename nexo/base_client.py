@@ -1,18 +1,144 @@
 import base64
-from typing import Dict, Optional, List, Tuple
+from functools import lru_cache
+from typing import Any, Dict, Optional, List, Tuple
 import hmac
 import hashlib
 
+from nexo.coalescing import request_key
+from nexo.codec import DEFAULT_CODEC, JSONCodec
+from nexo.exceptions import NEXO_API_ERROR_CODES, NexoAPIException, NexoRequestException
+from nexo.fixed_point import AMOUNT, PRICE, FixedPoint, Units
+from nexo.helpers import check_pair_validity
+from nexo.nonce import NonceGenerator
+from nexo.pairs_cache import PairsCache
+from nexo.rate_limiter import RateLimiter
+from nexo.retry import RetryPolicy
+
+
+@lru_cache(maxsize=512)
+def _endpoint(api_url: str, api_version: str, path: str) -> Tuple[str, str]:
+    full_path = f"/api/{api_version}/{path}"
+    return full_path, f"{api_url}{full_path}"
+
+
+class PreparedRequest:
+    """An endpoint call turned into what goes on the wire, minus the signature.
+
+    Built by `BaseClient._prepare` and executed by either transport, which
+    signs it with `BaseClient._sign` right before sending. `data` is the
+    payload as given, kept to look for a placed order after a lost response.
+    `limits` holds the `(pair, amount, action, amount_name)` to check against
+    the pairs cache before sending, which may take a request of its own.
+    Identical GETs sharing a `key` are coalesced, a request without one is
+    always sent. `priority` overrides the request scheduler's class for the
+    endpoint, on `AsyncClient`.
+    """
+
+    __slots__ = (
+        "method",
+        "path",
+        "full_path",
+        "uri",
+        "data",
+        "params",
+        "body",
+        "headers",
+        "key",
+        "limits",
+        "priority",
+    )
+
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        full_path: str,
+        uri: str,
+        data: Dict,
+        params: Optional[Dict],
+        body: Optional[bytes],
+        headers: Dict[str, str],
+        key: Optional[Any] = None,
+        limits: Optional[Tuple] = None,
+        priority: Optional[int] = None,
+    ):
+        self.method = method
+        self.path = path
+        self.full_path = full_path
+        self.uri = uri
+        self.data = data
+        self.params = params
+        self.body = body
+        self.headers = headers
+        self.key = key
+        self.limits = limits
+        self.priority = priority
+
+
 class BaseClient:
     API_URL = "https://pro-api.nexo.io"
     PUBLIC_API_VERSION = "v1"
 
     REQUEST_TIMEOUT = 10
+    REQUEST_RATE = 10.0
+    REQUEST_BURST = 10.0
+    STREAM_CHUNK_SIZE = 65536
 
-    def __init__(self, api_key, api_secret):
+    def __init__(
+        self,
+        api_key,
+        api_secret,
+        rate_limiter: Optional[RateLimiter] = None,
+        nonce_generator: Optional[NonceGenerator] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        pairs_cache: Optional[PairsCache] = None,
+        json_codec: Optional[JSONCodec] = None,
+        fixed_point: Optional[FixedPoint] = None,
+    ):
         self.API_KEY = api_key
         self.API_SECRET = api_secret
-        self.timestamp_offset = 0
+        self.nonce_generator = nonce_generator or NonceGenerator()
+        self.rate_limiter = rate_limiter or RateLimiter(
+            self.REQUEST_RATE, self.REQUEST_BURST
+        )
+        self.retry_policy = retry_policy or RetryPolicy()
+        # opt-in, orders are checked against the listed pairs and limits
+        self.pairs_cache = pairs_cache
+        self.json_codec = json_codec or DEFAULT_CODEC
+        # opt-in, amounts and prices as scaled integers
+        self.fixed_point = fixed_point
+
+    @property
+    def API_KEY(self):
+        return self._api_key
+
+    @API_KEY.setter
+    def API_KEY(self, api_key):
+        self._api_key = api_key
+        # copied into every request, the signature is added to the copy
+        self._static_headers = {"X-API-KEY": api_key}
+
+    @property
+    def API_SECRET(self):
+        return self._api_secret
+
+    @API_SECRET.setter
+    def API_SECRET(self, api_secret):
+        self._api_secret = api_secret
+        # keyed once, each signature continues a copy of this state
+        self._hmac = (
+            hmac.new(api_secret.encode("utf-8"), digestmod=hashlib.sha256)
+            if api_secret is not None
+            else None
+        )
+
+    @property
+    def timestamp_offset(self) -> float:
+        return self.nonce_generator.offset
+
+    @timestamp_offset.setter
+    def timestamp_offset(self, offset: float):
+        self.nonce_generator.offset = offset
 
     def _create_path(self, path: str, api_version: str = PUBLIC_API_VERSION):
         return f"/api/{api_version}/{path}"
@@ -20,12 +146,394 @@ class BaseClient:
     def _create_api_uri(self, path: str) -> str:
         return f"{self.API_URL}{path}"
 
+    def _prepare(
+        self,
+        method: str,
+        path: str,
+        version: str = PUBLIC_API_VERSION,
+        data: Optional[Dict] = None,
+        limits: Optional[Tuple] = None,
+    ) -> PreparedRequest:
+        data = data or {}
+        full_path, uri = _endpoint(self.API_URL, version, path)
+        params = body = key = None
+
+        if method == "get":
+            params = data or None
+            # identical GETs from this key are coalesced
+            key = request_key(self.API_KEY, method, full_path, params)
+        elif data:
+            body = self.json_codec.dumps(data)
+
+        return PreparedRequest(
+            method,
+            path,
+            full_path,
+            uri,
+            data,
+            params,
+            body,
+            dict(self._static_headers),
+            key,
+            limits,
+        )
+
+    @staticmethod
+    def _live(request: PreparedRequest) -> PreparedRequest:
+        # for checks that must see the effect of a request of ours, which a
+        # coalesced or still fresh result may predate
+        request.key = None
+        return request
+
+    def _sign(self, request: PreparedRequest):
+        # called by the transports as late as possible, so that nonces
+        # reach the server in order
+        nonce = self._generate_nonce()
+        request.headers["X-NONCE"] = nonce
+        request.headers["X-SIGNATURE"] = self._generate_signature(nonce).decode("utf8")
+
+    def _parse_response(self, request: PreparedRequest, status: int, body: bytes) -> Dict:
+        # shared by both transports once the body has been read
+        ok = status < 400
+        json_response = {}
+
+        try:
+            json_response = self.json_codec.loads(body)
+        except Exception:
+            if not ok:
+                raise NexoRequestException(
+                    f"Failed to get API response: \nCode: {status}\nRequest: {request.method.upper()} {request.uri}",
+                    status,
+                )
+
+        try:
+            if "errorCode" in json_response:
+                if json_response["errorCode"] in NEXO_API_ERROR_CODES:
+                    raise NexoAPIException(
+                        json_response["errorCode"],
+                        body.decode("utf-8", "replace"),
+                        json_response,
+                    )
+                else:
+                    raise NexoRequestException(
+                        f'Invalid Response: status: {json_response["errorCode"]}, message: {json_response.get("errorMessage")}\n request: {request.method.upper()} {request.uri}'
+                    )
+            else:
+                if not ok:
+                    raise NexoRequestException(
+                        f"Failed to get API response: \nCode: {status}\nRequest: {request.method.upper()} {request.uri}",
+                        status,
+                    )
+
+                return json_response
+
+        except (TypeError, ValueError):
+            raise NexoRequestException("Invalid Response: %s" % json_response)
+
+    def _generate_nonce(self) -> str:
+        return str(self.nonce_generator.next())
+
+    def get_clock_stats(self) -> Dict:
+        return self.nonce_generator.stats()
+
+    @staticmethod
+    def _check_order(pair: str, side: str, type: str):
+        if side != "buy" and side != "sell":
+            raise NexoRequestException(
+                f"Bad Request: Tried to place an order with side = {side}, side must be 'buy' or 'sell'"
+            )
+        if type != "market" and type != "limit":
+            raise NexoRequestException(
+                f"Bad Request: Tried to place an order with type = {type}, side must be 'market' or 'limit'"
+            )
+        if not check_pair_validity(pair):
+            raise NexoRequestException(
+                f"Bad Request: Tried to place an order with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
+            )
+
+    def _amounts(self, pair: str, amount, *prices) -> Tuple:
+        # an amount followed by prices, those wrapped in `Units` are sent as
+        # numbers that print exactly, anything else is sent as given
+        values = (amount,) + prices
+        if not any(isinstance(value, Units) for value in values):
+            return values
+        if self.fixed_point is None:
+            raise NexoRequestException(
+                "Bad Request: Units amounts need a client created with a fixed_point"
+            )
+        return tuple(
+            self.fixed_point.to_number(value.value, pair, AMOUNT if i == 0 else PRICE)
+            if isinstance(value, Units)
+            else value
+            for i, value in enumerate(values)
+        )
+
+    @staticmethod
+    def _order_lookup_params(data: Dict, since: float) -> Dict:
+        # order history window in which an order sent at `since` would show up
+        return {
+            "pairs": [data.get("pair")],
+            "startDate": int(since) - 60_000,
+            "endDate": int(since) + 600_000,
+            "pageSize": 50,
+            "pageNum": 0,
+        }
+
+    @staticmethod
+    def _check_error_body(json_response: Dict):
+        # for bodies parsed outside of `_handle_response`, e.g. streamed ones
+        if "errorCode" not in json_response:
+            return
+        if json_response["errorCode"] in NEXO_API_ERROR_CODES:
+            raise NexoAPIException(
+                json_response["errorCode"], str(json_response), json_response
+            )
+        raise NexoRequestException(
+            f'Invalid Response: status: {json_response["errorCode"]}, message: {json_response.get("errorMessage")}'
+        )
+
+    # Endpoint builders, shared by both clients so that they validate and
+    # send the same thing: each turns the arguments of the endpoint method
+    # of the same name into its request, the clients only execute it and
+    # serialize the response.
+
+    def _build_get_price_quote(
+        self, pair: str, amount, side: str, exchanges: str = None
+    ) -> PreparedRequest:
+        if side != "buy" and side != "sell":
+            raise NexoRequestException(
+                f"Bad Request: Tried to get price quote with side = {side}, side must be 'buy' or 'sell'"
+            )
+        if not check_pair_validity(pair):
+            raise NexoRequestException(
+                f"Bad Request: Tried to place a trigger order with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
+            )
+
+        (amount,) = self._amounts(pair, amount)
+        data = {"side": side, "amount": amount, "pair": pair}
+
+        if exchanges:
+            data["exchanges"] = exchanges
+
+        return self._prepare(
+            "get", "quote", data=data, limits=(pair, amount, "get price quote", "amount")
+        )
+
+    def _build_get_order_history(
+        self, pairs: List[str], start_date: int, end_date: int, page_size: int, page_num: int
+    ) -> PreparedRequest:
+        data = {
+            "pairs": pairs,
+            "startDate": start_date,
+            "endDate": end_date,
+            "pageSize": page_size,
+            "pageNum": page_num,
+        }
+        return self._prepare("get", "orders", data=data)
+
+    def _build_get_order_details(self, id: str) -> PreparedRequest:
+        return self._prepare("get", "orderDetails", data={"id": id})
+
+    def _build_get_trade_history(
+        self, pairs: List[str], start_date: int, end_date: int, page_size: int, page_num: int
+    ) -> PreparedRequest:
+        for pair in pairs:
+            if not check_pair_validity(pair):
+                raise NexoRequestException(
+                    f"Bad Request: Tried to get trade history with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
+                )
+
+        data = {
+            "pairs": pairs,
+            "startDate": start_date,
+            "endDate": end_date,
+            "pageSize": page_size,
+            "pageNum": page_num,
+        }
+        return self._prepare("get", "trades", data=data)
+
+    def _build_get_transaction_info(self, transaction_id: str) -> PreparedRequest:
+        return self._prepare("get", "transaction", data={"transactionId": transaction_id})
+
+    def _build_place_order(
+        self, pair: str, side: str, type: str, quantity, price=None
+    ) -> PreparedRequest:
+        self._check_order(pair, side, type)
+        quantity, price = self._amounts(pair, quantity, price)
+
+        data = {"pair": pair, "side": side, "type": type, "quantity": quantity}
+
+        if price:
+            data["price"] = price
+
+        return self._prepare(
+            "post", "orders", data=data, limits=(pair, quantity, "place an order", "quantity")
+        )
+
+    def _build_place_trigger_order(
+        self,
+        pair: str,
+        side: str,
+        trigger_type: str,
+        amount,
+        trigger_price,
+        trailing_distance=None,
+        trailing_percentage=None,
+    ) -> PreparedRequest:
+        if side != "buy" and side != "sell":
+            raise NexoRequestException(
+                f"Bad Request: Tried to place a trigger order with side = {side}, side must be 'buy' or 'sell'"
+            )
+        if (
+            trigger_type != "stopLoss"
+            and trigger_type != "takeProfit"
+            and trigger_type != "trailing"
+        ):
+            raise NexoRequestException(
+                f"Bad Request: Tried to place a trigger order with trigger type = {trigger_type}, trigger type must be 'stopLoss' or 'takeProfit' or 'trailing'"
+            )
+        if not check_pair_validity(pair):
+            raise NexoRequestException(
+                f"Bad Request: Tried to place a trigger order with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
+            )
+
+        amount, trigger_price, trailing_distance = self._amounts(
+            pair, amount, trigger_price, trailing_distance
+        )
+
+        data = {
+            "pair": pair,
+            "side": side,
+            "triggerType": trigger_type,
+            "amount": amount,
+            "triggerPrice": trigger_price,
+        }
+
+        if trailing_distance:
+            data["trailingDistance"] = trailing_distance
+
+        if trailing_percentage:
+            data["trailingPercentage"] = trailing_percentage
+
+        return self._prepare(
+            "post", "orders", data=data, limits=(pair, amount, "place a trigger order", "amount")
+        )
+
+    def _build_place_advanced_order(
+        self, pair: str, side: str, amount, stop_loss_price, take_profit_price
+    ) -> PreparedRequest:
+        if side != "buy" and side != "sell":
+            raise NexoRequestException(
+                f"Bad Request: Tried to place an advanced order with side = {side}, side must be 'buy' or 'sell'"
+            )
+
+        if not check_pair_validity(pair):
+            raise NexoRequestException(
+                f"Bad Request: Tried to place an advanced order with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
+            )
+
+        amount, stop_loss_price, take_profit_price = self._amounts(
+            pair, amount, stop_loss_price, take_profit_price
+        )
+
+        data = {
+            "pair": pair,
+            "side": side,
+            "amount": amount,
+            "stopLossPrice": stop_loss_price,
+            "takeProfitPrice": take_profit_price,
+        }
+        return self._prepare(
+            "post", "orders", data=data, limits=(pair, amount, "place an advanced order", "amount")
+        )
+
+    def _build_place_twap_order(
+        self,
+        pair: str,
+        side: str,
+        quantity,
+        splits: int,
+        execution_interval: int,
+        exchanges: List[str] = None,
+    ) -> PreparedRequest:
+        if side != "buy" and side != "sell":
+            raise NexoRequestException(
+                f"Bad Request: Tried to place a twap order with side = {side}, side must be 'buy' or 'sell'"
+            )
+
+        if not check_pair_validity(pair):
+            raise NexoRequestException(
+                f"Bad Request: Tried to place a twap order with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
+            )
+
+        (quantity,) = self._amounts(pair, quantity)
+
+        data = {
+            "pair": pair,
+            "side": side,
+            "quantity": quantity,
+            "splits": splits,
+            "executionInterval": execution_interval,
+        }
+
+        if exchanges:
+            data["exchanges"] = exchanges
+
+        return self._prepare(
+            "post", "orders/twap", data=data, limits=(pair, quantity, "place a twap order", "quantity")
+        )
+
+    def _build_cancel_order(self, order_id: str) -> PreparedRequest:
+        return self._prepare("post", "orders/cancel", data={"orderId": order_id})
+
+    def _build_cancel_all_orders(self, pair: str) -> PreparedRequest:
+        if not check_pair_validity(pair):
+            raise NexoRequestException(
+                f"Bad Request: Tried to cancel all orders with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
+            )
+
+        return self._prepare("post", "orders/cancel/all", data={"pair": pair})
+
+    def _build_get_future_positions(self, status: str) -> PreparedRequest:
+        if status != "any" and status != "active" and status != "inactive":
+            raise NexoRequestException(
+                f"Bad Request: Tried to get future positions with status = {status}, status must be 'any', 'active' or 'inactive'"
+            )
+
+        return self._prepare("get", "futures/positions", data={"status": status})
+
+    def _build_place_future_order(
+        self, instrument: str, position_action: str, position_side: str, type: str, quantity
+    ) -> PreparedRequest:
+        if position_action != "open" and position_action != "close":
+            raise NexoRequestException(
+                f"Bad Request: Tried to place future position with position action = {position_action}, must be 'open' or 'close'"
+            )
+
+        if position_side != "long" and position_side != "short":
+            raise NexoRequestException(
+                f"Bad Request: Tried to place future position with position side = {position_side}, must be 'long' or 'short'"
+            )
+
+        if type != "market":
+            raise NexoRequestException(
+                f"Bad Request: Tried to place future position with type = {type}, must be 'market'"
+            )
+
+        data = {
+            "positionAction": position_action,
+            "instrument": instrument,
+            "positionSide": position_side,
+            "type": type,
+            "quantity": quantity,
+        }
+        return self._prepare("post", "futures/order", data=data)
+
     @staticmethod
     def _get_params_for_sig(data: Dict) -> str:
         return "&".join(["{}={}".format(key, data[key]) for key in data])
 
-    def _generate_signature(self, nonce: str,) -> str:
-        m = hmac.new(
-            self.API_SECRET.encode("utf-8"), str(nonce).encode("utf-8"), hashlib.sha256
-        )
+    def _generate_signature(self, nonce: str) -> bytes:
+        m = self._hmac.copy()
+        m.update(str(nonce).encode("utf-8"))
         return base64.b64encode(m.digest())
@@ -1,15 +1,30 @@
-from nexo.base_client import BaseClient
-from typing import Dict, Optional, List, Tuple
+from nexo.balance_watcher import BalanceWatcher
+from nexo.base_client import BaseClient, PreparedRequest
+from typing import Any, Callable, Dict, Iterable, Optional, List, Tuple
 import hmac
 import hashlib
+from functools import partial
 from operator import itemgetter
 import base64
 import urllib3
 import requests
 import json
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import time
-from nexo.exceptions import NexoAPIException, NEXO_API_ERROR_CODES, NexoRequestException
-from nexo.helpers import check_pair_validity, compact_json_dict
+from nexo.coalescing import SingleFlight
+from nexo.codec import JSONCodec
+from nexo.columns import order_columns, trade_columns
+from nexo.exceptions import NexoAPIException, NexoOrderStateUnknownException
+from nexo.fixed_point import FixedPoint
+from nexo.history_store import ORDERS, TRADES, HistoryStore
+from nexo.json_stream import JSONArrayStream
+from nexo.kill_switch import KillSwitch, KillReport
+from nexo.nonce import NonceGenerator
+from nexo.pairs_cache import PairsCache
+from nexo.rate_limiter import RateLimiter
+from nexo.retry import VERIFY, RetryPolicy, match_placed_order
+from nexo.transport import TransportConfig
 from nexo.response_serializers import (
     Balances,
     AdvancedOrderResponse,
@@ -19,83 +34,265 @@ from nexo.response_serializers import (
     Pairs,
     Transaction,
     Quote,
+    Trade,
     TradeHistory,
 )
 
-class Client(BaseClient):
-    def __init__(self, api_key, api_secret):
-        super().__init__(api_key, api_secret)
-        self.session = self._init_session()
-
-    def _init_session(self):
+# set on threads running fan-out calls, of any client
+_fan_out_worker = threading.local()
 
-        session = requests.session()
-        headers = {
-            "Accept": "application/json",
-            "User-Agent": "python-nexo",
-            "Content-Type": "application/json",
-            "X-API-KEY": self.API_KEY,
-        }
 
-        session.headers.update(headers)
-        return session
+class Client(BaseClient):
+    # fan-out threads, at most one per pooled connection
+    FAN_OUT_WORKERS = 32
 
-    @staticmethod
-    def _handle_response(response: requests.Response):
-        json_response = {}
+    def __init__(
+        self,
+        api_key,
+        api_secret,
+        rate_limiter: Optional[RateLimiter] = None,
+        nonce_generator: Optional[NonceGenerator] = None,
+        transport: Optional[TransportConfig] = None,
+        session: Optional[requests.Session] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        pairs_cache: Optional[PairsCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        json_codec: Optional[JSONCodec] = None,
+        fixed_point: Optional[FixedPoint] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        super().__init__(
+            api_key,
+            api_secret,
+            rate_limiter,
+            nonce_generator,
+            retry_policy,
+            pairs_cache,
+            json_codec,
+            fixed_point,
+        )
+        self.transport = transport or TransportConfig()
+        # identical concurrent GETs share one request
+        self.single_flight = single_flight or SingleFlight()
+        # a session passed in may be shared with other clients, leave it open
+        self._owns_session = session is None
+        self.session = session or self._init_session()
+        # fan-out threads, started on first use unless an executor shared
+        # with other clients is passed in
+        self._owns_executor = executor is None
+        self._executor = executor
+        self._executor_lock = threading.Lock()
 
-        try:
-            json_response = response.json()
-        except Exception:
-            if not response.ok:
-                raise NexoRequestException(
-                    f"Failed to get API response: \nCode: {response.status_code}\nRequest: {str(response.request.body)}"
+    def _init_session(self):
+        return self.transport.create_session()
+
+    def close_connection(self):
+        with self._executor_lock:
+            if self._executor is not None and self._owns_executor:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        if self.session and self._owns_session:
+            self.session.close()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=min(self.FAN_OUT_WORKERS, self.transport.max_connections),
+                    thread_name_prefix="nexo-client",
                 )
+            return self._executor
 
+    @staticmethod
+    def _run_call(call: Callable[[], Any]):
+        _fan_out_worker.active = True
         try:
-            if "errorCode" in json_response:
-                if json_response["errorCode"] in NEXO_API_ERROR_CODES:
-                    raise NexoAPIException(json_response["errorCode"], response.text)
-                else:
-                    raise NexoRequestException(
-                        f'Invalid Response: status: {json_response["errorCode"]}, message: {json_response["errorMessage"]}\n body: {response.request.body}'
-                    )
-            else:
-                if not response.ok:
-                    raise NexoRequestException(
-                        f"Failed to get API response: \nCode: {response.status_code}\nRequest: {str(response.request.body)}"
-                    )
+            return call()
+        finally:
+            _fan_out_worker.active = False
 
-                return json_response
+    def gather(
+        self,
+        calls: Iterable[Callable[[], Any]],
+        return_exceptions: bool = False,
+        max_concurrency: Optional[int] = None,
+    ) -> List:
+        """Runs calls concurrently, returning their results in order.
+
+        Each call takes no arguments, e.g. `partial(client.get_price_quote,
+        pair, amount, side)`. They run on the client's thread pool, of at most
+        `FAN_OUT_WORKERS` threads and no more than the session's connection
+        pool, at most `max_concurrency` at a time.
+        Every call completes before returning: a failed call's exception is
+        in its slot with `return_exceptions`, otherwise the first one in
+        input order is raised. Calls made from a pool thread run inline, so
+        nested fan-outs cannot exhaust the pool.
+        """
+        calls = list(calls)
+        results: List[Any] = [None] * len(calls)
+        failed = [False] * len(calls)
+
+        if getattr(_fan_out_worker, "active", False):
+            for i, call in enumerate(calls):
+                try:
+                    results[i] = call()
+                except Exception as e:
+                    results[i], failed[i] = e, True
+        else:
+            executor = self._get_executor()
+            limit = max_concurrency or len(calls)
+            pending = {}
+            position = 0
+            while position < len(calls) or pending:
+                while position < len(calls) and len(pending) < limit:
+                    future = executor.submit(self._run_call, calls[position])
+                    pending[future] = position
+                    position += 1
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = pending.pop(future)
+                    try:
+                        results[i] = future.result()
+                    except Exception as e:
+                        results[i], failed[i] = e, True
+
+        if not return_exceptions and any(failed):
+            raise results[failed.index(True)]
+        return results
+
+    def map(
+        self,
+        method: Callable,
+        arg_list: Iterable,
+        return_exceptions: bool = False,
+        max_concurrency: Optional[int] = None,
+    ) -> List:
+        """`gather` of `method` over `arg_list`, in order.
+
+        A dict item is passed as keyword arguments, a tuple as positional
+        arguments and anything else as the single argument.
+        """
+        calls = []
+        for args in arg_list:
+            if isinstance(args, dict):
+                calls.append(partial(method, **args))
+            elif isinstance(args, tuple):
+                calls.append(partial(method, *args))
+            else:
+                calls.append(partial(method, args))
+        return self.gather(calls, return_exceptions, max_concurrency)
 
-        except ValueError:
-            raise NexoRequestException("Invalid Response: %s" % json_response)
+    def _handle_response(self, request: PreparedRequest, response: requests.Response):
+        return self._parse_response(request, response.status_code, response.content)
 
     def _request(
-        self, method, path: str, version=BaseClient.PUBLIC_API_VERSION, **kwargs
+        self, method, path: str, version=BaseClient.PUBLIC_API_VERSION, data: Optional[Dict] = None
     ):
-        # set default requests timeout
-        kwargs["timeout"] = 10
-
-        kwargs["data"] = kwargs.get("data", {})
-        kwargs["headers"] = kwargs.get("headers", {})
-
-        full_path = self._create_path(path, version)
-        uri = self._create_api_uri(full_path)
-
-        nonce = str(int(time.time() * 1000))
-        kwargs["headers"]["X-NONCE"] = nonce
-        kwargs["headers"]["X-SIGNATURE"] = self._generate_signature(nonce)
-
-        if kwargs["data"] and method == "get":
-            kwargs["params"] = kwargs["data"]
-            del kwargs["data"]
+        return self._call(self._prepare(method, path, version, data))
+
+    def _call(self, request: PreparedRequest):
+        if request.limits is not None:
+            self._check_pair_limits(*request.limits)
+
+        if request.key is not None:
+            return self.single_flight.do(request.key, lambda: self._execute(request))
+
+        return self._execute(request)
+
+    def _execute(self, request: PreparedRequest):
+        self.retry_policy.budget.deposit()
+        attempt = 1
+        delay = 0.0
+
+        while True:
+            sent_at = self.nonce_generator.server_time()
+            try:
+                return self._send(request)
+            except Exception as e:
+                action = self.retry_policy.action(request.method, request.path, e, attempt)
+                if action is None:
+                    raise
+
+                if action == VERIFY:
+                    order_id = self._confirm_placed_order(request.data, sent_at, e)
+                    return {"orderId": order_id}
+
+            delay = self.retry_policy.backoff(delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def _confirm_placed_order(self, data: Dict, since: float, error: Exception) -> str:
+        # the history may not show the order yet, look a few times before
+        # giving up without sending it again
+        for attempt in range(self.retry_policy.verify_attempts):
+            if attempt:
+                time.sleep(self.retry_policy.verify_delay)
+            try:
+                order_id = self._find_placed_order(data, since)
+            except Exception:
+                continue
+            if order_id:
+                return order_id
+        raise NexoOrderStateUnknownException(data, error) from error
+
+    def _find_placed_order(self, data: Dict, since: float) -> Optional[str]:
+        orders_json = self._call(
+            self._live(
+                self._prepare("get", "orders", data=self._order_lookup_params(data, since))
+            )
+        )
+        return match_placed_order(orders_json, data, since)
+
+    def _open(self, request: PreparedRequest, **kwargs) -> requests.Response:
+        self.rate_limiter.acquire(request.path, request.method)
+        self._sign(request)
+
+        sent_at = time.monotonic()
+        response = self.session.request(
+            request.method,
+            request.uri,
+            params=request.params,
+            data=request.body,
+            headers=request.headers,
+            timeout=self.REQUEST_TIMEOUT,
+            **kwargs,
+        )
+        self.nonce_generator.observe(
+            response.headers.get("Date"), sent_at, time.monotonic()
+        )
+        return response
+
+    def _send(self, request: PreparedRequest):
+        response = self._open(request)
+        try:
+            json_response = self._handle_response(request, response)
+        except NexoAPIException as e:
+            if e.code == 301:
+                self.rate_limiter.on_rate_limited(request.path, request.method)
+            raise
+
+        self.rate_limiter.on_success(request.path, request.method)
+        return json_response
+
+    def _stream(self, request: PreparedRequest, key: str):
+        # GET yielding the records of the `key` array while the body downloads,
+        # it is not retried since records may already have been consumed
+        response = self._open(request, stream=True)
+        with response:
+            try:
+                if not response.ok:
+                    self._handle_response(request, response)
 
-        if method != "get" and kwargs["data"]:
-            kwargs["data"] = compact_json_dict(kwargs["data"])
+                parser = JSONArrayStream(key, self.json_codec)
+                for chunk in response.iter_content(self.STREAM_CHUNK_SIZE):
+                    yield from parser.feed(chunk)
+                self._check_error_body(parser.close())
+            except NexoAPIException as e:
+                if e.code == 301:
+                    self.rate_limiter.on_rate_limited(request.path, request.method)
+                raise
 
-        response = getattr(self.session, method)(uri, **kwargs)
-        return self._handle_response(response)
+        self.rate_limiter.on_success(request.path, request.method)
 
     def _get(self, path, version=BaseClient.PUBLIC_API_VERSION, **kwargs):
         return self._request("get", path, version, **kwargs)
@@ -109,16 +306,49 @@ class Client(BaseClient):
     def _delete(self, path, version=BaseClient.PUBLIC_API_VERSION, **kwargs) -> Dict:
         return self._request("delete", path, version, **kwargs)
 
-    def get_account_balances(self, serialize_json_to_object: bool = False) -> Dict:
+    def _refresh_pairs(self):
+        try:
+            self.get_pairs()
+        except Exception:
+            self.pairs_cache.end_refresh()
+
+    def _check_pair_limits(
+        self, pair: str, amount, action: str, amount_name: str = "quantity"
+    ):
+        if self.pairs_cache is None:
+            return
+
+        if self.pairs_cache.is_empty:
+            try:
+                self.get_pairs()
+            except Exception:
+                # without metadata the server is left to validate the order
+                return
+        elif self.pairs_cache.begin_refresh():
+            threading.Thread(target=self._refresh_pairs, daemon=True).start()
+
+        self.pairs_cache.validate(pair, amount, action, amount_name)
+
+    def get_account_balances(
+        self, serialize_json_to_object: bool = False, lazy: bool = False
+    ) -> Dict:
         balances_json = self._get("accountSummary")
 
         if serialize_json_to_object:
-            return Balances(balances_json)
+            return Balances(balances_json, lazy=lazy, fixed_point=self.fixed_point)
 
         return balances_json
 
+    def watch_balances(
+        self, min_interval: float = 1.0, max_interval: float = 30.0, backoff: float = 2.0
+    ) -> BalanceWatcher:
+        # started polling thread, iterate it for the assets that changed
+        return BalanceWatcher(self, min_interval, max_interval, backoff).start()
+
     def get_pairs(self, serialize_json_to_object: bool = False) -> Dict:
         pairs_json = self._get("pairs")
+        if self.pairs_cache is not None:
+            self.pairs_cache.update(pairs_json)
 
         if serialize_json_to_object:
             return Pairs(pairs_json)
@@ -133,24 +363,12 @@ class Client(BaseClient):
         exchanges: str = None,
         serialize_json_to_object: bool = False,
     ) -> Dict:
-        if side != "buy" and side != "sell":
-            raise NexoRequestException(
-                f"Bad Request: Tried to get price quote with side = {side}, side must be 'buy' or 'sell'"
-            )
-        if not check_pair_validity(pair):
-            raise NexoRequestException(
-                f"Bad Request: Tried to place a trigger order with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
-            )
-
-        data = {"side": side, "amount": amount, "pair": pair}
-
-        if exchanges:
-            data["exchanges"] = exchanges
-
-        quote_json = self._get("quote", data=data)
+        quote_json = self._call(
+            self._build_get_price_quote(pair, amount, side, exchanges)
+        )
 
         if serialize_json_to_object:
-            return Quote(quote_json)
+            return Quote(quote_json, fixed_point=self.fixed_point)
 
         return quote_json
 
@@ -162,32 +380,27 @@ class Client(BaseClient):
         page_size: int,
         page_num: int,
         serialize_json_to_object: bool = False,
+        lazy: bool = False,
+        columns: bool = False,
     ) -> Dict:
-        data = {
-            "pairs": pairs,
-            "startDate": start_date,
-            "endDate": end_date,
-            "pageSize": page_size,
-            "pageNum": page_num,
-        }
-        orders_json = self._get("orders", data=data)
+        orders_json = self._call(
+            self._build_get_order_history(pairs, start_date, end_date, page_size, page_num)
+        )
 
+        if columns:
+            return order_columns(orders_json.get("orders", []))
         if serialize_json_to_object:
-            return Orders(orders_json)
+            return Orders(orders_json, lazy=lazy, fixed_point=self.fixed_point)
 
         return orders_json
 
     def get_order_details(
         self, id: str, serialize_json_to_object: bool = False
     ) -> Dict:
-        data = {
-            "id": id,
-        }
-
-        order_details_json = self._get(f"orderDetails", data=data)
+        order_details_json = self._call(self._build_get_order_details(id))
 
         if serialize_json_to_object:
-            return OrderDetails(order_details_json)
+            return OrderDetails(order_details_json, fixed_point=self.fixed_point)
 
         return order_details_json
 
@@ -199,38 +412,180 @@ class Client(BaseClient):
         page_size: int,
         page_num: int,
         serialize_json_to_object: bool = False,
+        lazy: bool = False,
+        columns: bool = False,
     ) -> Dict:
-        for pair in pairs:
-            if not check_pair_validity(pair):
-                raise NexoRequestException(
-                    f"Bad Request: Tried to get trade history with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
-                )
-
-        data = {
-            "pairs": pairs,
-            "startDate": start_date,
-            "endDate": end_date,
-            "pageSize": page_size,
-            "pageNum": page_num,
-        }
-
-        trades_json = self._get("trades", data=data)
+        trades_json = self._call(
+            self._build_get_trade_history(pairs, start_date, end_date, page_size, page_num)
+        )
 
+        if columns:
+            return trade_columns(trades_json.get("trades", []))
         if serialize_json_to_object:
-            return TradeHistory(trades_json)
+            return TradeHistory(trades_json, lazy=lazy, fixed_point=self.fixed_point)
 
         return trades_json
 
+    @staticmethod
+    def _iter_history(
+        fetch, key: str, page_size: int, page_num: int, record=None, page_record=None
+    ):
+        # `page_record` turns whole pages into one item, e.g. into columns
+        page_size = int(page_size)
+        page_num = int(page_num)
+        while True:
+            records = fetch(page_num).get(key, [])
+
+            if page_record is not None:
+                if records:
+                    yield page_record(records)
+            else:
+                for item in records:
+                    yield record(item) if record else item
+
+            if len(records) < page_size:
+                return
+            page_num += 1
+
+    @staticmethod
+    def _iter_history_stream(stream, page_size: int, page_num: int, record=None):
+        # records are handed out while their page is still downloading
+        page_size = int(page_size)
+        page_num = int(page_num)
+        while True:
+            count = 0
+            for item in stream(page_num):
+                count += 1
+                yield record(item) if record else item
+
+            if count < page_size:
+                return
+            page_num += 1
+
+    def iter_order_history(
+        self,
+        pairs: List[str],
+        start_date: int,
+        end_date: int,
+        page_size: int = 100,
+        page_num: int = 0,
+        serialize_json_to_object: bool = False,
+        columns: bool = False,
+        stream: bool = False,
+    ):
+        record = (
+            partial(OrderDetails, fixed_point=self.fixed_point)
+            if serialize_json_to_object
+            else None
+        )
+        if stream and not columns:
+            return self._iter_history_stream(
+                lambda page: self._stream(
+                    self._build_get_order_history(
+                        pairs, start_date, end_date, page_size, page
+                    ),
+                    "orders",
+                ),
+                page_size,
+                page_num,
+                record,
+            )
+
+        return self._iter_history(
+            lambda page: self.get_order_history(
+                pairs, start_date, end_date, page_size, page
+            ),
+            "orders",
+            page_size,
+            page_num,
+            record,
+            order_columns if columns else None,
+        )
+
+    def iter_trade_history(
+        self,
+        pairs: List[str],
+        start_date: int,
+        end_date: int,
+        page_size: int = 100,
+        page_num: int = 0,
+        serialize_json_to_object: bool = False,
+        columns: bool = False,
+        stream: bool = False,
+    ):
+        record = (
+            partial(Trade, fixed_point=self.fixed_point)
+            if serialize_json_to_object
+            else None
+        )
+        if stream and not columns:
+            return self._iter_history_stream(
+                lambda page: self._stream(
+                    self._build_get_trade_history(
+                        pairs, start_date, end_date, page_size, page
+                    ),
+                    "trades",
+                ),
+                page_size,
+                page_num,
+                record,
+            )
+
+        return self._iter_history(
+            lambda page: self.get_trade_history(
+                pairs, start_date, end_date, page_size, page
+            ),
+            "trades",
+            page_size,
+            page_num,
+            record,
+            trade_columns if columns else None,
+        )
+
+    def _sync_history(
+        self, store: HistoryStore, kind: str, pairs, start_date, end_date, page_size
+    ) -> int:
+        if end_date is None:
+            end_date = int(self.nonce_generator.server_time())
+        iterate = self.iter_trade_history if kind == TRADES else self.iter_order_history
+        add = store.add_trades if kind == TRADES else store.add_orders
+
+        count = 0
+        for pair in pairs:
+            start = store.sync_start(kind, pair, start_date)
+            # stored in one go, the watermark only moves once the window is complete
+            count += add(list(iterate([pair], start, end_date, page_size=page_size)))
+        return count
+
+    def sync_trade_history(
+        self,
+        store: HistoryStore,
+        pairs: List[str],
+        start_date: int = 0,
+        end_date: Optional[int] = None,
+        page_size: int = 500,
+    ) -> int:
+        # only trades newer than the store's watermark for each pair are fetched
+        return self._sync_history(store, TRADES, pairs, start_date, end_date, page_size)
+
+    def sync_order_history(
+        self,
+        store: HistoryStore,
+        pairs: List[str],
+        start_date: int = 0,
+        end_date: Optional[int] = None,
+        page_size: int = 500,
+    ) -> int:
+        # newer orders, and the ones that were still open, are fetched again
+        return self._sync_history(store, ORDERS, pairs, start_date, end_date, page_size)
+
     def get_transaction_info(
         self, transaction_id: str, serialize_json_to_object: bool = False
     ) -> Dict:
-
-        data = {"transactionId": transaction_id}
-
-        transaction_json = self._get(f"transaction", data=data)
+        transaction_json = self._call(self._build_get_transaction_info(transaction_id))
 
         if serialize_json_to_object:
-            return Transaction(transaction_json)
+            return Transaction(transaction_json, fixed_point=self.fixed_point)
 
         return transaction_json
 
@@ -243,31 +598,46 @@ class Client(BaseClient):
         price: float = None,
         serialize_json_to_object: bool = False,
     ) -> Dict:
-        if side != "buy" and side != "sell":
-            raise NexoRequestException(
-                f"Bad Request: Tried to place an order with side = {side}, side must be 'buy' or 'sell'"
-            )
-        if type != "market" and type != "limit":
-            raise NexoRequestException(
-                f"Bad Request: Tried to place an order with type = {type}, side must be 'market' or 'limit'"
-            )
-        if not check_pair_validity(pair):
-            raise NexoRequestException(
-                f"Bad Request: Tried to place an order with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
-            )
-
-        data = {"pair": pair, "side": side, "type": type, "quantity": quantity}
-
-        if price:
-            data["price"] = price
-
-        order_id_json = self._post("orders", data=data)
+        order_id_json = self._call(
+            self._build_place_order(pair, side, type, quantity, price)
+        )
 
         if serialize_json_to_object:
             return OrderResponse(order_id_json)
 
         return order_id_json
 
+    def place_orders(
+        self,
+        intents: List[Dict],
+        max_concurrency: int = 10,
+        serialize_json_to_object: bool = False,
+    ) -> List:
+        # Each intent holds the place_order arguments. Results come back in
+        # the order of the intents, an order id response or the exception
+        # raised for that intent. Invalid intents are rejected before any
+        # order is sent.
+        results = [None] * len(intents)
+        valid = []
+
+        for i, intent in enumerate(intents):
+            try:
+                self._check_pair_limits(*self._build_place_order(**intent).limits)
+            except Exception as e:
+                results[i] = e
+            else:
+                valid.append(i)
+
+        placed = self.map(
+            partial(self.place_order, serialize_json_to_object=serialize_json_to_object),
+            [intents[i] for i in valid],
+            return_exceptions=True,
+            max_concurrency=max_concurrency,
+        )
+        for i, result in zip(valid, placed):
+            results[i] = result
+        return results
+
     def place_trigger_order(
         self,
         pair: str,
@@ -279,38 +649,17 @@ class Client(BaseClient):
         trailing_percentage: float = None,
         serialize_json_to_object: bool = False,
     ) -> Dict:
-        if side != "buy" and side != "sell":
-            raise NexoRequestException(
-                f"Bad Request: Tried to place a trigger order with side = {side}, side must be 'buy' or 'sell'"
-            )
-        if (
-            trigger_type != "stopLoss"
-            and trigger_type != "takeProfit"
-            and trigger_type != "trailing"
-        ):
-            raise NexoRequestException(
-                f"Bad Request: Tried to place a trigger order with trigger type = {trigger_type}, trigger type must be 'stopLoss' or 'takeProfit' or 'trailing'"
+        order_id_json = self._call(
+            self._build_place_trigger_order(
+                pair,
+                side,
+                trigger_type,
+                amount,
+                trigger_price,
+                trailing_distance,
+                trailing_percentage,
             )
-        if not check_pair_validity(pair):
-            raise NexoRequestException(
-                f"Bad Request: Tried to place a trigger order with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
-            )
-
-        data = {
-            "pair": pair,
-            "side": side,
-            "triggerType": trigger_type,
-            "amount": amount,
-            "triggerPrice": trigger_price,
-        }
-
-        if trailing_distance:
-            data["trailingDistance"] = trailing_distance
-
-        if trailing_percentage:
-            data["trailingPercentage"] = trailing_percentage
-
-        order_id_json = self._post("orders", data=data)
+        )
 
         if serialize_json_to_object:
             return OrderResponse(order_id_json)
@@ -326,24 +675,11 @@ class Client(BaseClient):
         take_profit_price: str,
         serialize_json_to_object: bool = False,
     ) -> Dict:
-        if side != "buy" and side != "sell":
-            raise NexoRequestException(
-                f"Bad Request: Tried to place an advanced order with side = {side}, side must be 'buy' or 'sell'"
-            )
-
-        if not check_pair_validity(pair):
-            raise NexoRequestException(
-                f"Bad Request: Tried to place an advanced order with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
+        order_id_json = self._call(
+            self._build_place_advanced_order(
+                pair, side, amount, stop_loss_price, take_profit_price
             )
-
-        data = {
-            "pair": pair,
-            "side": side,
-            "amount": amount,
-            "stopLossPrice": stop_loss_price,
-            "takeProfitPrice": take_profit_price,
-        }
-        order_id_json = self._post("orders", data=data)
+        )
 
         if serialize_json_to_object:
             return AdvancedOrderResponse(order_id_json)
@@ -360,28 +696,11 @@ class Client(BaseClient):
         exchanges: List[str] = None,
         serialize_json_to_object: bool = False,
     ) -> Dict:
-        if side != "buy" and side != "sell":
-            raise NexoRequestException(
-                f"Bad Request: Tried to place a twap order with side = {side}, side must be 'buy' or 'sell'"
-            )
-
-        if not check_pair_validity(pair):
-            raise NexoRequestException(
-                f"Bad Request: Tried to place a twap order with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
+        twap_order_json = self._call(
+            self._build_place_twap_order(
+                pair, side, quantity, splits, execution_interval, exchanges
             )
-
-        data = {
-            "pair": pair,
-            "side": side,
-            "quantity": quantity,
-            "splits": splits,
-            "executionInterval": execution_interval,
-        }
-
-        if exchanges:
-            data["exchanges"] = exchanges
-
-        twap_order_json = self._post("orders/twap", data=data)
+        )
 
         if serialize_json_to_object:
             return AdvancedOrderResponse(twap_order_json)
@@ -389,32 +708,16 @@ class Client(BaseClient):
         return twap_order_json
 
     def cancel_order(self, order_id: str):
-        data = {"orderId": order_id}
-
-        return self._post("orders/cancel", data=data)
+        return self._call(self._build_cancel_order(order_id))
 
     def cancel_all_orders(self, pair: str):
-        if not check_pair_validity(pair):
-            raise NexoRequestException(
-                f"Bad Request: Tried to cancel all orders with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
-            )
-
-        data = {"pair": pair}
-
-        return self._post("orders/cancel/all", data=data)
+        return self._call(self._build_cancel_all_orders(pair))
 
     def get_all_future_instruments(self):
         return self._get("futures/instruments")
 
     def get_future_positions(self, status: str):
-        if status != "any" and status != "active" and status != "inactive":
-            raise NexoRequestException(
-                f"Bad Request: Tried to get future positions with status = {status}, status must be 'any', 'active' or 'inactive'"
-            )
-
-        data = {"status": status}
-
-        return self._get("futures/positions", data=data)
+        return self._call(self._build_get_future_positions(status))
 
     def place_future_order(
         self,
@@ -424,32 +727,20 @@ class Client(BaseClient):
         type: str,
         quantity: float,
     ):
-        if position_action != "open" and position_action != "close":
-            raise NexoRequestException(
-                f"Bad Request: Tried to place future position with position action = {position_action}, must be 'open' or 'close'"
+        return self._call(
+            self._build_place_future_order(
+                instrument, position_action, position_side, type, quantity
             )
-
-        if position_side != "long" and position_side != "short":
-            raise NexoRequestException(
-                f"Bad Request: Tried to place future position with position side = {position_side}, must be 'long' or 'short'"
-            )
-
-        if type != "market":
-            raise NexoRequestException(
-                f"Bad Request: Tried to place future position with type = {type}, must be 'market'"
-            )
-
-        data = {
-            "positionAction": position_action,
-            "instrument": instrument,
-            "positionSide": position_side,
-            "type": type,
-            "quantity": quantity,
-        }
-
-        return self._post("futures/order", data=data)
+        )
 
     def close_all_future_positions(self):
         return self._post("futures/close-all-positions")
 
+    def kill_switch(
+        self, pairs: List[str], close_positions: bool = True, verify: bool = True
+    ) -> KillReport:
+        # cancels every order on `pairs` and closes all futures positions
+        # concurrently, see `KillSwitch` to warm connections up beforehand
+        return KillSwitch(self, pairs, close_positions).fire(verify)
+
 
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+def request_key(api_key: str, method: str, path: str, params: Optional[Dict]) -> Tuple:
+    # the key is part of it so that an instance can be shared between clients
+    return (
+        api_key,
+        method,
+        path,
+        json.dumps(params or {}, sort_keys=True, separators=(",", ":"), default=str),
+    )
+
+
+class _FreshResults:
+    MAX_ENTRIES = 1024
+
+    def __init__(self, freshness: float):
+        self.freshness = freshness
+        self.results: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key):
+        entry = self.results.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return True, entry[1]
+        return False, None
+
+    def put(self, key, result):
+        if self.freshness <= 0:
+            return
+        now = time.monotonic()
+        if len(self.results) >= self.MAX_ENTRIES:
+            self.results = {k: v for k, v in self.results.items() if v[0] > now}
+        self.results[key] = (now + self.freshness, result)
+
+
+class SingleFlight:
+    """Runs concurrent calls sharing a key once, from any number of threads.
+
+    Callers arriving while the call is in flight get its result (or its
+    exception). With a `freshness` in seconds, the result is also handed to
+    callers arriving shortly after. The result object is shared between all
+    of them and should be treated as read-only.
+    """
+
+    def __init__(self, freshness: float = 0.0):
+        self._calls: Dict[Hashable, Future] = {}
+        self._fresh = _FreshResults(freshness)
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]):
+        with self._lock:
+            found, result = self._fresh.get(key)
+            if found:
+                return result
+
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                del self._calls[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._calls[key]
+            self._fresh.put(key, result)
+        future.set_result(result)
+        return result
+
+
+class AsyncSingleFlight:
+    """`SingleFlight` for coroutines running on one event loop.
+
+    The shared call runs in its own task, so cancelling one of the waiting
+    callers does not cancel it for the others.
+    """
+
+    def __init__(self, freshness: float = 0.0):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._fresh = _FreshResults(freshness)
+
+    async def do(self, key: Hashable, fn: Callable[[], Any]):
+        found, result = self._fresh.get(key)
+        if found:
+            return result
+
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(fn())
+
+            def done(finished):
+                self._calls.pop(key, None)
+                if not finished.cancelled() and finished.exception() is None:
+                    self._fresh.put(key, finished.result())
+
+            task.add_done_callback(done)
+
+        return await asyncio.shield(task)
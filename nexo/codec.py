@@ -0,0 +1,79 @@
+import json
+from typing import Any, Optional, Union
+
+
+class JSONCodec:
+    """Compact JSON to bytes and back, with the standard library.
+
+    The other codecs use a faster library when it is installed. Decoding
+    accepts bytes, so response bodies are parsed without decoding them
+    to text first.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self.dumps = orjson.dumps
+        self.loads = orjson.loads
+
+
+class MsgspecCodec(JSONCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+
+        self.dumps = msgspec.json.Encoder().encode
+        self.loads = msgspec.json.Decoder().decode
+
+
+class UjsonCodec(JSONCodec):
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+
+        self._ujson = ujson
+        self.loads = ujson.loads
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._ujson.dumps(
+            obj, ensure_ascii=False, escape_forward_slashes=False
+        ).encode("utf-8")
+
+
+CODECS = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "ujson": UjsonCodec,
+    "json": JSONCodec,
+}
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """The codec called `name`, or the fastest one installed."""
+    if name is not None:
+        if name not in CODECS:
+            raise ValueError(f"Unknown JSON codec {name}, expected one of {list(CODECS)}")
+        return CODECS[name]()
+
+    for codec in CODECS.values():
+        try:
+            return codec()
+        except ImportError:
+            continue
+
+
+DEFAULT_CODEC = get_codec()
@@ -0,0 +1,149 @@
+from typing import Dict, Iterable, List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+FLOAT = "float"
+INT = "int"
+CATEGORY = "category"
+TEXT = "text"
+
+# column name -> (JSON key, kind)
+TRADE_COLUMNS = {
+    "id": ("id", TEXT),
+    "symbol": ("symbol", CATEGORY),
+    "side": ("side", CATEGORY),
+    "trade_amount": ("tradeAmount", FLOAT),
+    "executed_price": ("executedPrice", FLOAT),
+    "timestamp": ("timestamp", INT),
+    "order_id": ("orderId", TEXT),
+}
+
+ORDER_COLUMNS = {
+    "id": ("id", TEXT),
+    "pair": ("pair", CATEGORY),
+    "side": ("side", CATEGORY),
+    "quantity": ("quantity", FLOAT),
+    "exchange_rate": ("exchangeRate", FLOAT),
+    "exchange_quantity": ("exchangeQuantity", FLOAT),
+    "timestamp": ("timestamp", INT),
+}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "numpy is required for columnar output, install python-nexo[columns]"
+        )
+
+
+class Columns:
+    """Struct of NumPy arrays, one per column, for a list of records.
+
+    Prices and amounts are float64 (NaN when missing), timestamps int64
+    (0 when missing), and ids object arrays. Categorical columns hold int32
+    codes into `categories[name]`, e.g. `columns.side == columns.code("side", "buy")`.
+    """
+
+    def __init__(self, arrays: Dict, categories: Dict[str, List]):
+        self.arrays = arrays
+        self.categories = categories
+
+    @classmethod
+    def from_json(cls, records: Sequence[Dict], spec: Dict) -> "Columns":
+        _require_numpy()
+        count = len(records)
+        arrays = {}
+        categories = {}
+
+        for name, (key, kind) in spec.items():
+            if kind == FLOAT:
+                arrays[name] = np.fromiter(
+                    (float(r[key]) if r.get(key) is not None else np.nan for r in records),
+                    dtype=np.float64,
+                    count=count,
+                )
+            elif kind == INT:
+                arrays[name] = np.fromiter(
+                    (int(r[key]) if r.get(key) is not None else 0 for r in records),
+                    dtype=np.int64,
+                    count=count,
+                )
+            elif kind == CATEGORY:
+                labels = {}
+                arrays[name] = np.fromiter(
+                    (labels.setdefault(r.get(key), len(labels)) for r in records),
+                    dtype=np.int32,
+                    count=count,
+                )
+                categories[name] = list(labels)
+            else:
+                arrays[name] = np.array([r.get(key) for r in records], dtype=object)
+
+        return cls(arrays, categories)
+
+    @classmethod
+    def concat(cls, parts: Iterable["Columns"]) -> "Columns":
+        _require_numpy()
+        parts = list(parts)
+        if not parts:
+            return cls({}, {})
+
+        arrays = {}
+        categories = {}
+        for name in parts[0].arrays:
+            if name not in parts[0].categories:
+                arrays[name] = np.concatenate([part.arrays[name] for part in parts])
+                continue
+
+            # re-code every part against the union of the labels
+            labels = {}
+            recoded = []
+            for part in parts:
+                mapping = np.array(
+                    [labels.setdefault(label, len(labels)) for label in part.categories[name]],
+                    dtype=np.int32,
+                )
+                recoded.append(mapping[part.arrays[name]] if len(mapping) else part.arrays[name])
+            arrays[name] = np.concatenate(recoded)
+            categories[name] = list(labels)
+
+        return cls(arrays, categories)
+
+    def code(self, name: str, label) -> int:
+        """Code of `label` in the categorical column `name`, -1 if absent."""
+        try:
+            return self.categories[name].index(label)
+        except ValueError:
+            return -1
+
+    def labels(self, name: str):
+        """The categorical column `name` decoded back to its labels."""
+        return np.array(self.categories[name], dtype=object)[self.arrays[name]]
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["arrays"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, name: str):
+        return self.arrays[name]
+
+    def __len__(self) -> int:
+        for array in self.arrays.values():
+            return len(array)
+        return 0
+
+    def __repr__(self):
+        return f"Columns({', '.join(self.arrays)}; {len(self)} rows)"
+
+
+def trade_columns(records: Sequence[Dict]) -> Columns:
+    return Columns.from_json(records, TRADE_COLUMNS)
+
+
+def order_columns(records: Sequence[Dict]) -> Columns:
+    return Columns.from_json(records, ORDER_COLUMNS)
@@ -1,4 +1,5 @@
 import json
+from typing import Dict, Optional
 
 NEXO_API_ERROR_CODES = {
     100: "API-Key is malformed or invalid.",
@@ -16,17 +17,19 @@ NEXO_API_ERROR_CODES = {
 
 
 class NexoAPIException(Exception):
-    def __init__(self, status_code: int, response: str):
+    def __init__(self, status_code: int, response: str, json_response: Optional[Dict] = None):
+        # `json_response` saves parsing the body a second time
         self.code = 0
-        try:
-            json_res = json.loads(response)
-        except ValueError:
-            self.message = "Invalid JSON error message from Nexo: {}".format(
-                response.text
-            )
-        else:
-            self.code = json_res["errorCode"]
-            self.message = json_res["errorMessage"]
+        if json_response is None:
+            try:
+                json_response = json.loads(response)
+            except ValueError:
+                self.message = "Invalid JSON error message from Nexo: {}".format(
+                    response
+                )
+        if json_response is not None:
+            self.code = json_response["errorCode"]
+            self.message = json_response["errorMessage"]
         self.status_code = status_code
         self.response = response
         self.request = getattr(response, "request", None)
@@ -36,13 +39,31 @@ class NexoAPIException(Exception):
 
 
 class NexoRequestException(Exception):
-    def __init__(self, message):
+    def __init__(self, message, status_code=None):
         self.message = message
+        self.status_code = status_code
 
     def __str__(self):
         return "NexoRequestException: %s" % self.message
 
 
+class NexoOrderStateUnknownException(NexoRequestException):
+    """An order placement failed ambiguously and was not found afterwards.
+
+    The order may still show up in the order history later, so it is not
+    sent again: `data` is the payload that was sent and `error` the failure
+    of the request.
+    """
+
+    def __init__(self, data: Dict, error: Exception):
+        super().__init__(
+            f"Order state unknown: {data.get('side')} {data.get('pair')} failed with {error!r} "
+            "and is not in the order history yet, check it before placing it again"
+        )
+        self.data = data
+        self.error = error
+
+
 class NotImplementedException(Exception):
     def __init__(self, value):
         message = f"Not implemented: {value}"
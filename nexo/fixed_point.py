@@ -0,0 +1,125 @@
+from decimal import Decimal
+from typing import Dict, Optional, Tuple, Union
+
+from nexo.exceptions import NexoRequestException
+
+# what a value counts, each pair may scale prices and amounts differently
+PRICE = "price"
+AMOUNT = "amount"
+
+
+class Units:
+    """An amount or price counted in units of the client's `FixedPoint`.
+
+    Order methods only read integers as units when wrapped, e.g.
+    `quantity=Units(10_000_000)`, a plain `1` is still one whole unit of
+    the asset.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: int):
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise TypeError(f"Units must be an int, got {value!r}")
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, Units) and other.value == self.value
+
+    def __hash__(self):
+        return hash((Units, self.value))
+
+    def __repr__(self):
+        return f"Units({self.value})"
+
+
+class FixedPoint:
+    """Prices and amounts as integers counting units of 10 ** -decimals.
+
+    Pairs listed in `pair_decimals` use their own precision, either one
+    number of decimals or a `(price_decimals, amount_decimals)` tuple since
+    a pair's prices and amounts rarely share a scale. Anything else
+    (including balances, which have no pair) uses `decimals`. Parsing is
+    exact, a value with more decimals than its precision raises ValueError
+    instead of being rounded. Empty values parse to None, as do other
+    non-numbers unless `strict`, so that one odd field does not fail a
+    whole response.
+    """
+
+    def __init__(
+        self,
+        decimals: int = 8,
+        pair_decimals: Optional[Dict[str, Union[int, Tuple[int, int]]]] = None,
+    ):
+        self.decimals = decimals
+        self.pair_decimals = {
+            pair: (value, value) if isinstance(value, int) else tuple(value)
+            for pair, value in (pair_decimals or {}).items()
+        }
+
+    def decimals_for(self, pair: Optional[str] = None, kind: str = AMOUNT) -> int:
+        precision = self.pair_decimals.get(pair)
+        if precision is None:
+            return self.decimals
+        return precision[0] if kind == PRICE else precision[1]
+
+    def parse(
+        self, value, pair: Optional[str] = None, strict: bool = True, kind: str = AMOUNT
+    ) -> Optional[int]:
+        if value is None:
+            return None
+        decimals = self.decimals_for(pair, kind)
+
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value * 10 ** decimals
+        if isinstance(value, float):
+            # the shortest repr round-trips, so it is the value that was sent
+            value = repr(value)
+        elif isinstance(value, Decimal):
+            value = str(value)
+
+        text = value.strip() if isinstance(value, str) else ""
+        if not text:
+            if strict and not isinstance(value, str):
+                raise ValueError(f"Invalid decimal number: {value!r}")
+            return None
+        if "e" in text or "E" in text:
+            try:
+                text = format(Decimal(text), "f")
+            except ArithmeticError:
+                text = ""
+
+        negative = text.startswith("-")
+        whole, _, fraction = text.lstrip("+-").partition(".")
+        if not (whole or fraction) or not (whole + fraction).isdigit():
+            if strict:
+                raise ValueError(f"Invalid decimal number: {value!r}")
+            return None
+
+        fraction = fraction.rstrip("0")
+        if len(fraction) > decimals:
+            raise ValueError(
+                f"{value!r} has more decimals than the {kind} precision of {decimals}"
+            )
+        units = int(whole or "0") * 10 ** decimals + int(fraction.ljust(decimals, "0") or "0")
+        return -units if negative else units
+
+    def format(self, units: int, pair: Optional[str] = None, kind: str = AMOUNT) -> str:
+        decimals = self.decimals_for(pair, kind)
+        whole, fraction = divmod(abs(units), 10 ** decimals)
+        sign = "-" if units < 0 else ""
+        fraction = str(fraction).rjust(decimals, "0").rstrip("0") if decimals else ""
+        return f"{sign}{whole}.{fraction}" if fraction else f"{sign}{whole}"
+
+    def to_number(self, units: int, pair: Optional[str] = None, kind: str = AMOUNT) -> float:
+        """A float that JSON encoders print as exactly `units`."""
+        number = float(self.format(units, pair, kind))
+        try:
+            exact = self.parse(number, pair, kind=kind) == units
+        except ValueError:
+            exact = False
+        if not exact:
+            raise NexoRequestException(
+                f"Bad Request: {self.format(units, pair, kind)} has too many digits to be sent exactly"
+            )
+        return number
@@ -1,6 +1,7 @@
 import re
 from typing import Dict
-import json
+
+from nexo.codec import DEFAULT_CODEC
 
 
 def check_pair_validity(pair: str) -> bool:
@@ -16,5 +17,5 @@ def check_pair_validity(pair: str) -> bool:
     return True
 
 
-def compact_json_dict(data: Dict):
-    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+def compact_json_dict(data: Dict, codec=DEFAULT_CODEC) -> str:
+    return codec.dumps(data).decode("utf-8")
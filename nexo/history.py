@@ -0,0 +1,72 @@
+import heapq
+from typing import Dict, Iterable, List, Tuple
+
+
+class HistoryShard:
+    def __init__(self, pairs: List[str], start_date: int, end_date: int):
+        self.pairs = pairs
+        self.start_date = start_date
+        self.end_date = end_date
+
+    @property
+    def duration(self) -> int:
+        return self.end_date - self.start_date
+
+    def split(self) -> Tuple["HistoryShard", "HistoryShard"]:
+        middle = self.start_date + self.duration // 2
+        return (
+            HistoryShard(self.pairs, self.start_date, middle),
+            HistoryShard(self.pairs, middle + 1, self.end_date),
+        )
+
+    def remaining(self, first: int, last: int) -> "HistoryShard":
+        # The part of the window not covered yet by pages running from a
+        # record at `first` to one at `last`, newest first or oldest first.
+        # `last` is included again, as more records may share it.
+        if first >= last:
+            return HistoryShard(self.pairs, self.start_date, last)
+        return HistoryShard(self.pairs, last, self.end_date)
+
+    def __repr__(self):
+        return f"HistoryShard({self.pairs}, {self.start_date}, {self.end_date})"
+
+
+def split_window(start_date: int, end_date: int, duration: int) -> List[Tuple[int, int]]:
+    # Inclusive [start, end] windows of at most `duration` milliseconds.
+    windows = []
+    start = int(start_date)
+    end_date = int(end_date)
+    while start <= end_date:
+        end = min(start + duration - 1, end_date)
+        windows.append((start, end))
+        start = end + 1
+    return windows
+
+
+def chunk_pairs(pairs: List[str], size: int) -> List[List[str]]:
+    return [pairs[i:i + size] for i in range(0, len(pairs), size)]
+
+
+def make_shards(
+    pairs: List[str], start_date: int, end_date: int, duration: int, pairs_per_shard: int
+) -> List[HistoryShard]:
+    return [
+        HistoryShard(group, start, end)
+        for group in chunk_pairs(pairs, pairs_per_shard)
+        for start, end in split_window(start_date, end_date, duration)
+    ]
+
+
+def merge_records(batches: Iterable[List[Dict]], key: str = "timestamp", id_key: str = "id") -> List[Dict]:
+    # Merges batches in `key` order, keeping the first record seen for an id.
+    ordered = [sorted(batch, key=lambda record: record.get(key, 0)) for batch in batches]
+    seen = set()
+    merged = []
+    for record in heapq.merge(*ordered, key=lambda record: record.get(key, 0)):
+        record_id = record.get(id_key)
+        if record_id is not None:
+            if record_id in seen:
+                continue
+            seen.add(record_id)
+        merged.append(record)
+    return merged
@@ -0,0 +1,200 @@
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from nexo.codec import DEFAULT_CODEC, JSONCodec
+
+TRADES = "trades"
+ORDERS = "orders"
+
+# statuses after which an order no longer changes
+FINAL_ORDER_STATUSES = ("completed", "filled", "cancelled", "canceled", "rejected", "expired")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id TEXT PRIMARY KEY,
+    pair TEXT,
+    timestamp INTEGER,
+    record BLOB
+);
+CREATE INDEX IF NOT EXISTS trades_pair_time ON trades (pair, timestamp);
+CREATE INDEX IF NOT EXISTS trades_time ON trades (timestamp);
+
+CREATE TABLE IF NOT EXISTS orders (
+    id TEXT PRIMARY KEY,
+    pair TEXT,
+    timestamp INTEGER,
+    status TEXT,
+    final INTEGER,
+    record BLOB
+);
+CREATE INDEX IF NOT EXISTS orders_pair_time ON orders (pair, timestamp);
+CREATE INDEX IF NOT EXISTS orders_time ON orders (timestamp);
+CREATE INDEX IF NOT EXISTS orders_open ON orders (pair, timestamp) WHERE final = 0;
+
+CREATE TABLE IF NOT EXISTS watermarks (
+    kind TEXT,
+    pair TEXT,
+    timestamp INTEGER,
+    id TEXT,
+    PRIMARY KEY (kind, pair)
+);
+"""
+
+
+class HistoryStore:
+    """Local SQLite copy of the order and trade history.
+
+    Records are upserted by id, and the latest timestamp and id seen are
+    kept per pair as a high watermark, so that a sync only asks the API
+    for newer records. Orders with a status that is not one of
+    `final_statuses` are fetched again until they reach one, orders without
+    a status (the order history does not always report it) are taken as
+    final.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        final_statuses: Iterable[str] = FINAL_ORDER_STATUSES,
+        codec: JSONCodec = DEFAULT_CODEC,
+    ):
+        self.path = path
+        self.final_statuses = frozenset(final_statuses)
+        self.codec = codec
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def watermark(self, kind: str, pair: str) -> Optional[Tuple[int, str]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT timestamp, id FROM watermarks WHERE kind = ? AND pair = ?",
+                (kind, pair),
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def sync_start(self, kind: str, pair: str, start_date: int) -> int:
+        """Start of the window holding everything newer than the store.
+
+        The watermark's own millisecond is fetched again, as other records
+        may share it, and so is every order that could still change.
+        """
+        watermark = self.watermark(kind, pair)
+        start = max(start_date, watermark[0]) if watermark else start_date
+
+        if kind == ORDERS:
+            with self._lock:
+                (oldest_open,) = self._db.execute(
+                    "SELECT MIN(timestamp) FROM orders WHERE pair = ? AND final = 0",
+                    (pair,),
+                ).fetchone()
+            if oldest_open is not None:
+                start = min(start, oldest_open)
+        return start
+
+    def add_trades(self, trades: Iterable[Dict]) -> int:
+        rows = [
+            (str(t["id"]), t.get("symbol"), t.get("timestamp"), self.codec.dumps(t))
+            for t in trades
+        ]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO trades (id, pair, timestamp, record) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._advance_watermarks(TRADES, rows)
+        return len(rows)
+
+    def add_orders(self, orders: Iterable[Dict]) -> int:
+        rows = [
+            (
+                str(o["id"]),
+                o.get("pair"),
+                o.get("timestamp"),
+                o.get("status"),
+                int(o.get("status") is None or o.get("status") in self.final_statuses),
+                self.codec.dumps(o),
+            )
+            for o in orders
+        ]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO orders (id, pair, timestamp, status, final, record)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._advance_watermarks(ORDERS, rows)
+        return len(rows)
+
+    def _advance_watermarks(self, kind: str, rows: List[Tuple]):
+        latest: Dict[str, Tuple[int, str]] = {}
+        for row in rows:
+            record_id, pair, timestamp = row[0], row[1], row[2]
+            if pair is None or timestamp is None:
+                continue
+            if pair not in latest or (timestamp, record_id) > latest[pair]:
+                latest[pair] = (timestamp, record_id)
+
+        for pair, (timestamp, record_id) in latest.items():
+            self._db.execute(
+                "INSERT INTO watermarks (kind, pair, timestamp, id) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (kind, pair) DO UPDATE SET timestamp = excluded.timestamp,"
+                " id = excluded.id WHERE excluded.timestamp > watermarks.timestamp",
+                (kind, pair, timestamp, record_id),
+            )
+
+    def _select(self, table: str, pairs, start_date, end_date, limit) -> List[Dict]:
+        clauses = []
+        params: List = []
+        if pairs:
+            clauses.append(f"pair IN ({', '.join('?' * len(pairs))})")
+            params += list(pairs)
+        if start_date is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start_date)
+        if end_date is not None:
+            clauses.append("timestamp <= ?")
+            params.append(end_date)
+
+        query = f"SELECT record FROM {table}"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        # newest first, like the API
+        query += " ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [self.codec.loads(record) for (record,) in rows]
+
+    def trades(
+        self,
+        pairs: Optional[List[str]] = None,
+        start_date: Optional[int] = None,
+        end_date: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        return self._select(TRADES, pairs, start_date, end_date, limit)
+
+    def orders(
+        self,
+        pairs: Optional[List[str]] = None,
+        start_date: Optional[int] = None,
+        end_date: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        return self._select(ORDERS, pairs, start_date, end_date, limit)
@@ -0,0 +1,77 @@
+import codecs
+import json
+import re
+from typing import Any, Dict, List
+
+from nexo.codec import DEFAULT_CODEC, JSONCodec
+
+_DECODER = json.JSONDecoder()
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+class JSONArrayStream:
+    """Incremental parser for the elements of one array in a JSON object.
+
+    Chunks of the body are passed to `feed` as they arrive, which returns
+    the elements of the `key` array completed so far, e.g. the `trades` of
+    a trade history page. Only the elements not yet complete are buffered.
+    The elements must be objects or arrays, as records are, since a number
+    cut by a chunk boundary would look complete. `close` returns the rest
+    of the document with the array emptied, or the whole document when it
+    had no such array (an error response for instance).
+    """
+
+    def __init__(self, key: str, codec: JSONCodec = DEFAULT_CODEC):
+        self.codec = codec
+        self._opening = re.compile(r'"' + re.escape(key) + r'"\s*:\s*\[')
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._head = None
+        self._tail = None
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        text = self._text.decode(chunk)
+        if self._tail is not None:
+            self._tail += text
+            return []
+
+        self._buffer += text
+        if self._head is None:
+            match = self._opening.search(self._buffer)
+            if match is None:
+                return []
+            self._head = self._buffer[: match.end()]
+            self._buffer = self._buffer[match.end():]
+
+        return self._scan()
+
+    def _scan(self) -> List[Any]:
+        buffer = self._buffer
+        position = 0
+        elements = []
+
+        while True:
+            position = _SEPARATORS.match(buffer, position).end()
+            if position == len(buffer):
+                break
+            if buffer[position] == "]":
+                self._tail = buffer[position:]
+                position = len(buffer)
+                break
+            try:
+                element, position = _DECODER.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # the element continues in the next chunk
+                break
+            elements.append(element)
+
+        self._buffer = buffer[position:]
+        return elements
+
+    def close(self) -> Dict:
+        self._buffer += self._text.decode(b"", final=True)
+        if self._head is None:
+            return self.codec.loads(self._buffer) if self._buffer.strip() else {}
+        if self._tail is None:
+            raise ValueError("Truncated JSON document, the array was not closed")
+        return self.codec.loads(self._head + self._tail)
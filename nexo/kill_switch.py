@@ -0,0 +1,347 @@
+import asyncio
+import itertools
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from nexo.exceptions import NexoRequestException
+from nexo.helpers import check_pair_validity
+from nexo.scheduler import URGENT
+
+POSITIONS = "positions"
+
+# statuses of orders that may still execute, compared case-insensitively
+OPEN_ORDER_STATUSES = (
+    "open",
+    "new",
+    "active",
+    "pending",
+    "partially_filled",
+    "partiallyfilled",
+    "partially filled",
+)
+
+
+class KillOutcome:
+    """Result of the cancel request for one pair, or of closing positions.
+
+    `elapsed` is the time from firing to the answer, in seconds. After
+    verification `remaining` counts the orders still open on the pair (or
+    the active positions) and `verified` is the time the check took. Both
+    stay None when verification was skipped or the history could not tell,
+    because orders came back without a status. `ok` is then None as well:
+    the target is neither known to be flat nor known to have failed.
+    """
+
+    __slots__ = ("target", "response", "error", "elapsed", "remaining", "verified")
+
+    def __init__(self, target: str, response: Any, error: Optional[Exception], elapsed: float):
+        self.target = target
+        self.response = response
+        self.error = error
+        self.elapsed = elapsed
+        self.remaining = None
+        self.verified = None
+
+    @property
+    def ok(self) -> Optional[bool]:
+        if self.error is not None or self.remaining:
+            return False
+        if self.remaining is None:
+            return None
+        return True
+
+    def __repr__(self):
+        ok = self.ok
+        if ok:
+            state = "ok"
+        elif ok is None:
+            state = "unverified"
+        else:
+            state = f"failed ({self.error or f'{self.remaining} left'})"
+        return f"KillOutcome({self.target}, {state}, {self.elapsed * 1000:.1f}ms)"
+
+
+class KillReport:
+    """Per-pair outcomes of a kill switch, with the time to flat.
+
+    `elapsed` runs from firing until every request was answered, and
+    `verified` until the order history and positions were checked, None
+    when verification was skipped. `flat` is True once every target was
+    checked flat, False when one failed and None while some are unverified.
+    """
+
+    def __init__(self, outcomes: Dict[str, KillOutcome], elapsed: float):
+        self.outcomes = outcomes
+        self.elapsed = elapsed
+        self.verified = None
+
+    @property
+    def flat(self) -> Optional[bool]:
+        if self.failed:
+            return False
+        if self.unverified:
+            return None
+        return True
+
+    @property
+    def failed(self) -> List[KillOutcome]:
+        return [outcome for outcome in self.outcomes.values() if outcome.ok is False]
+
+    @property
+    def unverified(self) -> List[KillOutcome]:
+        return [outcome for outcome in self.outcomes.values() if outcome.ok is None]
+
+    def __getitem__(self, target: str) -> KillOutcome:
+        return self.outcomes[target]
+
+    def __repr__(self):
+        return (
+            f"KillReport(flat={self.flat}, elapsed={self.elapsed * 1000:.1f}ms, "
+            f"failed={[outcome.target for outcome in self.failed]}, "
+            f"unverified={[outcome.target for outcome in self.unverified]})"
+        )
+
+
+def open_orders_by_pair(
+    orders_json: Dict, pairs: List[str], open_statuses: Iterable[str] = OPEN_ORDER_STATUSES
+) -> Dict[str, Optional[int]]:
+    # None for a pair with no open order but some orders without a status,
+    # which cannot be told apart from finished ones
+    open_statuses = {status.lower() for status in open_statuses}
+    counts = dict.fromkeys(pairs, 0)
+    unknown = set()
+    for order in orders_json.get("orders") or []:
+        pair = order.get("pair")
+        if pair not in counts:
+            continue
+        status = order.get("status")
+        if status is None:
+            unknown.add(pair)
+        elif str(status).lower() in open_statuses:
+            counts[pair] += 1
+
+    for pair in unknown:
+        if not counts[pair]:
+            counts[pair] = None
+    return counts
+
+
+def count_positions(positions_json) -> int:
+    if isinstance(positions_json, dict):
+        positions_json = positions_json.get("positions") or []
+    return len(positions_json)
+
+
+class BaseKillSwitch:
+    """Cancels every order of a set of pairs and closes futures positions.
+
+    All the requests are fired at once, `orders/cancel/all` for each pair
+    and `futures/close-all-positions`. On `AsyncClient` they take the
+    urgent class of the request scheduler. `warm_up` opens the connections
+    beforehand, so that firing does not pay for TCP and TLS handshakes;
+    connections are only kept for the transport's keep-alive timeout, so
+    warm up again periodically while armed.
+
+    Verification pages through the last `verify_window` milliseconds of
+    order history, `verify_page_size` orders at a time, counting the orders
+    with one of `open_statuses`, and reads the active positions. Open
+    orders placed before the window are not seen. These checks are never
+    answered by coalesced results, which could predate the cancels, and
+    take the urgent class too.
+    """
+
+    def __init__(
+        self,
+        client,
+        pairs: List[str],
+        close_positions: bool = True,
+        verify_window: int = 7 * 24 * 3600 * 1000,
+        verify_page_size: int = 500,
+        open_statuses: Iterable[str] = OPEN_ORDER_STATUSES,
+    ):
+        for pair in pairs:
+            if not check_pair_validity(pair):
+                raise NexoRequestException(
+                    f"Bad Request: Tried to arm a kill switch with pair = {pair}, must be of format [A-Z]{{2,6}}/[A-Z]{{2, 6}}"
+                )
+        self.client = client
+        self.pairs = list(pairs)
+        self.close_positions = close_positions
+        self.verify_window = verify_window
+        self.verify_page_size = verify_page_size
+        self.open_statuses = tuple(open_statuses)
+
+    @property
+    def connections(self) -> int:
+        # one per request fired, as far as the pool allows
+        requests = len(self.pairs) + int(self.close_positions)
+        return min(requests, self.client.transport.max_connections)
+
+    def _targets(self) -> List[str]:
+        return self.pairs + ([POSITIONS] if self.close_positions else [])
+
+    def _order_history_pages(self):
+        # arguments of every page of the verification window, in order
+        end_date = int(self.client.nonce_generator.server_time())
+        for page_num in itertools.count():
+            yield {
+                "pairs": self.pairs,
+                "start_date": end_date - self.verify_window,
+                "end_date": end_date,
+                "page_size": self.verify_page_size,
+                "page_num": page_num,
+            }
+
+    def _check(self, request):
+        # ahead of any backfill queued on the request scheduler
+        request.priority = URGENT
+        return self.client._live(request)
+
+    def _orders_request(self, args: Dict):
+        return self._check(self.client._build_get_order_history(**args))
+
+    def _positions_request(self):
+        return self._check(self.client._build_get_future_positions("active"))
+
+    def _last_page(self, orders: List) -> bool:
+        return len(orders) < self.verify_page_size
+
+    @staticmethod
+    def _outcome(target: str, result, started: float, answered: float) -> KillOutcome:
+        if isinstance(result, Exception):
+            return KillOutcome(target, None, result, answered - started)
+        return KillOutcome(target, result, None, answered - started)
+
+    def _record_checks(self, report: KillReport, orders_json, positions_json, started: float):
+        now = time.monotonic()
+        if self.pairs:
+            if isinstance(orders_json, Exception):
+                for pair in self.pairs:
+                    report[pair].error = report[pair].error or orders_json
+            else:
+                remaining_by_pair = open_orders_by_pair(
+                    orders_json, self.pairs, self.open_statuses
+                )
+                for pair, remaining in remaining_by_pair.items():
+                    report[pair].remaining = remaining
+                    if remaining is not None:
+                        report[pair].verified = now - started
+
+        if self.close_positions:
+            outcome = report[POSITIONS]
+            if isinstance(positions_json, Exception):
+                outcome.error = outcome.error or positions_json
+            else:
+                outcome.remaining = count_positions(positions_json)
+                outcome.verified = now - started
+        report.verified = now - started
+
+
+class KillSwitch(BaseKillSwitch):
+    def warm_up(self):
+        # concurrent requests leave as many connections in the session pool
+        self.client.gather(
+            [lambda: self.client.session.head(self.client.API_URL)] * self.connections,
+            return_exceptions=True,
+        )
+
+    def _fetch_orders(self) -> Dict:
+        orders = []
+        for args in self._order_history_pages():
+            page = self.client._call(self._orders_request(args)).get("orders") or []
+            orders += page
+            if self._last_page(page):
+                return {"orders": orders}
+
+    def _call(self, target: str, answered: Dict[str, float]):
+        try:
+            if target == POSITIONS:
+                return self.client.close_all_future_positions()
+            return self.client.cancel_all_orders(target)
+        finally:
+            answered[target] = time.monotonic()
+
+    def fire(self, verify: bool = True) -> KillReport:
+        targets = self._targets()
+        answered: Dict[str, float] = {}
+        started = time.monotonic()
+        results = self.client.gather(
+            [lambda target=target: self._call(target, answered) for target in targets],
+            return_exceptions=True,
+        )
+        report = KillReport(
+            {
+                target: self._outcome(target, result, started, answered[target])
+                for target, result in zip(targets, results)
+            },
+            time.monotonic() - started,
+        )
+
+        if verify:
+            orders_json, positions_json = self.client.gather(
+                [
+                    lambda: self._fetch_orders() if self.pairs else None,
+                    lambda: self.client._call(self._positions_request())
+                    if self.close_positions
+                    else None,
+                ],
+                return_exceptions=True,
+            )
+            self._record_checks(report, orders_json, positions_json, started)
+        return report
+
+
+class AsyncKillSwitch(BaseKillSwitch):
+    async def warm_up(self):
+        # concurrent requests leave as many connections in the session pool
+        async def head():
+            async with self.client.session.head(self.client.API_URL):
+                pass
+
+        await asyncio.gather(
+            *(head() for _ in range(self.connections)), return_exceptions=True
+        )
+
+    async def _fetch_orders(self) -> Dict:
+        orders = []
+        for args in self._order_history_pages():
+            result = await self.client._call(self._orders_request(args))
+            page = result.json.get("orders") or []
+            orders += page
+            if self._last_page(page):
+                return {"orders": orders}
+
+    async def _call(self, target: str, started: float) -> KillOutcome:
+        try:
+            if target == POSITIONS:
+                result = await self.client.close_all_future_positions()
+            else:
+                result = await self.client.cancel_all_orders(target)
+        except Exception as e:
+            result = e
+        return self._outcome(target, result, started, time.monotonic())
+
+    async def fire(self, verify: bool = True) -> KillReport:
+        started = time.monotonic()
+        outcomes = await asyncio.gather(
+            *(self._call(target, started) for target in self._targets())
+        )
+        report = KillReport(
+            {outcome.target: outcome for outcome in outcomes}, time.monotonic() - started
+        )
+
+        if verify:
+
+            async def nothing():
+                return None
+
+            async def positions():
+                return (await self.client._call(self._positions_request())).json
+
+            orders_json, positions_json = await asyncio.gather(
+                self._fetch_orders() if self.pairs else nothing(),
+                positions() if self.close_positions else nothing(),
+                return_exceptions=True,
+            )
+            self._record_checks(report, orders_json, positions_json, started)
+        return report
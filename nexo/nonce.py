@@ -0,0 +1,103 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+
+class NonceGenerator:
+    """Strictly increasing millisecond nonces anchored to the server clock.
+
+    Local time is read from the monotonic clock, so wall clock jumps do not
+    affect it, and corrected by `offset` (in milliseconds) which is estimated
+    from the `Date` header of the API responses. One generator can be shared
+    by every client, thread and task signing with the same API key.
+    """
+
+    # the Date header has a one second resolution
+    DATE_RESOLUTION_MS = 1000
+
+    def __init__(self, offset: float = 0.0):
+        self._wall_anchor = time.time() * 1000
+        self._monotonic_anchor = time.monotonic()
+        self._lock = threading.Lock()
+        self._last_nonce = 0
+
+        self.offset = float(offset)
+        self.issued = 0
+        self.bumped = 0
+        self.samples = 0
+        self.adjustments = 0
+        self.last_skew = None
+        self.max_skew = 0.0
+        self.drift = 0.0
+        self._first_sample = None
+
+    def local_time(self, monotonic_time: Optional[float] = None) -> float:
+        if monotonic_time is None:
+            monotonic_time = time.monotonic()
+        return self._wall_anchor + (monotonic_time - self._monotonic_anchor) * 1000
+
+    def server_time(self) -> float:
+        return self.local_time() + self.offset
+
+    def next(self) -> int:
+        with self._lock:
+            nonce = int(self.server_time())
+            if nonce <= self._last_nonce:
+                # same millisecond as the previous nonce, or the offset moved back
+                nonce = self._last_nonce + 1
+                self.bumped += 1
+            self._last_nonce = nonce
+            self.issued += 1
+            return nonce
+
+    def observe(self, date_header: Optional[str], sent_at: float, received_at: float):
+        # sent_at and received_at are time.monotonic() values taken around the
+        # request. The server stamped the response at some instant within that
+        # window, with a time in [date, date + resolution).
+        if not date_header:
+            return
+        try:
+            date_ms = parsedate_to_datetime(date_header).timestamp() * 1000
+        except (TypeError, ValueError):
+            return
+
+        lower = date_ms - self.local_time(received_at)
+        upper = date_ms + self.DATE_RESOLUTION_MS - self.local_time(sent_at)
+        skew = (lower + upper) / 2
+
+        with self._lock:
+            self.samples += 1
+            self.last_skew = skew
+            self.max_skew = max(self.max_skew, abs(skew))
+
+            # Only move the offset when it is proven wrong, by the smallest
+            # amount that makes it consistent with the observation.
+            if self.offset < lower:
+                self.offset = lower
+                self.adjustments += 1
+            elif self.offset > upper:
+                self.offset = upper
+                self.adjustments += 1
+
+            if self._first_sample is None:
+                self._first_sample = (received_at, self.offset)
+            else:
+                first_at, first_offset = self._first_sample
+                elapsed = (received_at - first_at) * 1000
+                if elapsed > 0:
+                    # parts per million of local clock drift against the server
+                    self.drift = (self.offset - first_offset) / elapsed * 1e6
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "offset": self.offset,
+                "last_skew": self.last_skew,
+                "max_skew": self.max_skew,
+                "drift": self.drift,
+                "samples": self.samples,
+                "adjustments": self.adjustments,
+                "issued": self.issued,
+                "bumped": self.bumped,
+            }
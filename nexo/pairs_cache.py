@@ -0,0 +1,93 @@
+import threading
+import time
+from typing import Dict, Optional, Union
+
+from nexo.exceptions import NexoRequestException
+from nexo.response_serializers import Pairs
+
+
+def normalize_pair(pair: str) -> str:
+    # limits are sometimes keyed as "BTC_USDT" instead of "BTC/USDT"
+    return pair.replace("_", "/")
+
+
+class PairsCache:
+    """Pairs metadata kept for `ttl` seconds, to validate orders locally.
+
+    Expired metadata keeps being served while the owning client refreshes
+    it in the background; only an empty cache blocks on the API.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self.pairs = frozenset()
+        self.min_limits: Dict[str, float] = {}
+        self.max_limits: Dict[str, float] = {}
+        self.updated_at: Optional[float] = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_empty(self) -> bool:
+        return self.updated_at is None
+
+    @property
+    def is_expired(self) -> bool:
+        return self.is_empty or time.monotonic() - self.updated_at > self.ttl
+
+    def update(self, pairs: Union[Dict, Pairs]):
+        if isinstance(pairs, Pairs):
+            pairs = pairs.json_dictionary
+
+        def limits(key):
+            parsed = {}
+            for pair, limit in (pairs.get(key) or {}).items():
+                try:
+                    parsed[normalize_pair(pair)] = float(limit)
+                except (TypeError, ValueError):
+                    pass
+            return parsed
+
+        with self._lock:
+            self.pairs = frozenset(normalize_pair(p) for p in pairs.get("pairs", []))
+            self.min_limits = limits("minLimits")
+            self.max_limits = limits("maxLimits")
+            self.updated_at = time.monotonic()
+            self._refreshing = False
+
+    def begin_refresh(self) -> bool:
+        # True for the one caller that should refresh the expired metadata
+        with self._lock:
+            if self._refreshing or not self.is_expired:
+                return False
+            self._refreshing = True
+            return True
+
+    def end_refresh(self):
+        with self._lock:
+            self._refreshing = False
+
+    def validate(self, pair: str, amount=None, action: str = "place an order", amount_name: str = "quantity"):
+        if self.is_empty:
+            return
+
+        if pair not in self.pairs:
+            raise NexoRequestException(
+                f"Bad Request: Tried to {action} with pair = {pair}, pair is not listed on Nexo Pro"
+            )
+
+        if amount is None:
+            return
+        try:
+            value = float(amount)
+        except (TypeError, ValueError):
+            return
+
+        min_limit = self.min_limits.get(pair)
+        max_limit = self.max_limits.get(pair)
+        if (min_limit is not None and value < min_limit) or (
+            max_limit is not None and value > max_limit
+        ):
+            raise NexoRequestException(
+                f"Bad Request: Tried to {action} with {amount_name} = {amount}, must be between {min_limit} and {max_limit} for {pair}"
+            )
@@ -0,0 +1,158 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+
+    def refill(self, now: float):
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.last_refill = now
+
+    def delay_for(self, weight: float) -> float:
+        # Time to wait until `weight` tokens are available, 0 if they already are.
+        # A weight above capacity is clamped so that it can still go through.
+        missing = min(weight, self.capacity) - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate
+
+    def consume(self, weight: float):
+        self.tokens -= min(weight, self.capacity)
+
+
+class RateLimiter:
+    """Client-side token buckets, one global and optional per-endpoint ones.
+
+    Endpoints are keyed either by path ("quote") or by method and path
+    ("POST orders"), the latter taking precedence. The refill rate adapts:
+    it is cut multiplicatively on every "Rate limit exceeded" answer and
+    grows back additively while requests succeed.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: Optional[float] = None,
+        endpoint_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        weights: Optional[Dict[str, float]] = None,
+        decrease_factor: float = 0.5,
+        recovery_step: float = 0.05,
+        min_rate_ratio: float = 0.1,
+        cooldown: float = 1.0,
+    ):
+        self.bucket = TokenBucket(rate, burst if burst is not None else rate)
+        self.endpoint_buckets = {
+            key: TokenBucket(endpoint_rate, endpoint_burst)
+            for key, (endpoint_rate, endpoint_burst) in (endpoint_limits or {}).items()
+        }
+        self.weights = dict(weights or {})
+        self.decrease_factor = decrease_factor
+        self.recovery_step = recovery_step
+        self.min_rate_ratio = min_rate_ratio
+        self.cooldown = cooldown
+
+        self.rate_limited_count = 0
+        self._last_rate_limited = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _lookup(table: Dict, path: str, method: str):
+        key = f"{method.upper()} {path}"
+        if key in table:
+            return table[key]
+        return table.get(path)
+
+    def _buckets_for(self, path: str, method: str):
+        endpoint_bucket = self._lookup(self.endpoint_buckets, path, method)
+        if endpoint_bucket is None:
+            return (self.bucket,)
+        return (self.bucket, endpoint_bucket)
+
+    def weight_for(self, path: str, method: str = "get") -> float:
+        weight = self._lookup(self.weights, path, method)
+        return 1.0 if weight is None else weight
+
+    def try_acquire(self, path: str, method: str = "get") -> float:
+        # Takes the tokens and returns 0 when every bucket involved can serve
+        # the request, otherwise takes nothing and returns the time to wait.
+        weight = self.weight_for(path, method)
+        buckets = self._buckets_for(path, method)
+
+        with self._lock:
+            now = time.monotonic()
+            delay = 0.0
+            for bucket in buckets:
+                bucket.refill(now)
+                delay = max(delay, bucket.delay_for(weight))
+
+            if delay > 0:
+                return delay
+
+            for bucket in buckets:
+                bucket.consume(weight)
+            return 0.0
+
+    def acquire(self, path: str, method: str = "get"):
+        delay = self.try_acquire(path, method)
+        while delay > 0:
+            time.sleep(delay)
+            delay = self.try_acquire(path, method)
+
+    async def acquire_async(self, path: str, method: str = "get"):
+        delay = self.try_acquire(path, method)
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.try_acquire(path, method)
+
+    def on_rate_limited(self, path: str, method: str = "get"):
+        with self._lock:
+            now = time.monotonic()
+            self.rate_limited_count += 1
+
+            # Responses already in flight when the limit was hit report it too,
+            # only the first one of a burst should lower the rate.
+            if (
+                self._last_rate_limited is not None
+                and now - self._last_rate_limited < self.cooldown
+            ):
+                return
+            self._last_rate_limited = now
+
+            for bucket in self._buckets_for(path, method):
+                bucket.refill(now)
+                bucket.rate = max(
+                    bucket.max_rate * self.min_rate_ratio,
+                    bucket.rate * self.decrease_factor,
+                )
+                bucket.tokens = min(bucket.tokens, 0.0)
+
+    def on_success(self, path: str, method: str = "get"):
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._last_rate_limited is not None
+                and now - self._last_rate_limited < self.cooldown
+            ):
+                return
+
+            for bucket in self._buckets_for(path, method):
+                if bucket.rate < bucket.max_rate:
+                    bucket.refill(now)
+                    bucket.rate = min(
+                        bucket.max_rate,
+                        bucket.rate + bucket.max_rate * self.recovery_step,
+                    )
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
@@ -0,0 +1,37 @@
+from typing import Any, Mapping, Optional
+
+
+class RequestResult:
+    """What one API request returned, detached from its HTTP response.
+
+    `elapsed` is the time in seconds from sending the request to having
+    read its body, and `attempts` counts the retries. `status` is None when
+    the response was lost and an order placement was confirmed from the
+    order history instead.
+    """
+
+    __slots__ = ("method", "path", "status", "headers", "elapsed", "attempts", "json")
+
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        status: Optional[int],
+        headers: Mapping[str, str],
+        elapsed: float,
+        json: Any = None,
+        attempts: int = 1,
+    ):
+        self.method = method
+        self.path = path
+        self.status = status
+        self.headers = headers
+        self.elapsed = elapsed
+        self.json = json
+        self.attempts = attempts
+
+    def __repr__(self):
+        return (
+            f"RequestResult({self.method.upper()} {self.path}, status={self.status}, "
+            f"elapsed={self.elapsed:.3f}s, attempts={self.attempts})"
+        )
@@ -1,188 +1,314 @@
-from typing import Dict
+from collections.abc import Sequence
+from typing import Dict, List, Optional, Tuple, Type
+
+from nexo.fixed_point import AMOUNT, PRICE
+
+_MISSING = object()
 
 
 class BaseSerializedResponse:
+    __slots__ = ("_json_dictionary",)
+
     def __init__(self, json_dictionary: Dict):
-        self.json_dictionary = json_dictionary
+        self._json_dictionary = json_dictionary
+
+    @property
+    def json_dictionary(self) -> Dict:
+        if self._json_dictionary is not None:
+            return self._json_dictionary
+        return self._to_json()
+
+    def _to_json(self) -> Dict:
+        return {}
 
     def __repr__(self):
         return str(self.json_dictionary)
 
 
-# GET /balances
-class WalletBalance(BaseSerializedResponse):
-    def __init__(self, json_dictionary: Dict):
-        super().__init__(json_dictionary)
-
-        if "assetName" in json_dictionary:
-            self.asset_name = json_dictionary["assetName"]
-        if "totalBalance" in json_dictionary:
-            self.total_balance = json_dictionary["totalBalance"]
-        if "availableBalance" in json_dictionary:
-            self.available_balance = json_dictionary["availableBalance"]
-        if "lockedBalance" in json_dictionary:
-            self.locked_balance = json_dictionary["lockedBalance"]
-        if "debt" in json_dictionary:
-            self.debt = json_dictionary["debt"]
-        if "interest" in json_dictionary:
-            self.interest = json_dictionary["interest"]
-
-
-class Balances(BaseSerializedResponse):
-    def __init__(self, json_dictionary: Dict):
-        super().__init__(json_dictionary)
+class SerializedRecord(BaseSerializedResponse):
+    """Response object with one slot per field of `_FIELDS`.
+
+    `_FIELDS` maps the JSON keys to attribute names, and `_NESTED` maps the
+    JSON keys holding lists of records to their record type. Fields missing
+    from the JSON are left unset. The JSON itself is only kept when
+    `keep_json` is set, otherwise `json_dictionary` is rebuilt from the
+    fields on access. With `lazy`, nested lists are wrapped in a
+    `LazySequence` instead of being converted up front. With a `FixedPoint`,
+    the `_NUMERIC` fields are parsed into scaled integers, at the price
+    precision for those in `_PRICES` and the amount precision for the
+    others, of the pair found under `_PAIR_KEY`.
+    """
+
+    __slots__ = ("_fixed_point",)
+    _FIELDS: Dict[str, str] = {}
+    _NESTED: Dict[str, Type["SerializedRecord"]] = {}
+    _NUMERIC: Tuple[str, ...] = ()
+    _PRICES: Tuple[str, ...] = ()
+    _PAIR_KEY: Optional[str] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.__init__ = _record_init(cls)
+
+    def _to_json(self) -> Dict:
+        json_dictionary = {}
+        for key, attribute in self._FIELDS.items():
+            value = getattr(self, attribute, _MISSING)
+            if value is _MISSING:
+                continue
+            if isinstance(value, LazySequence):
+                value = value.json_list
+            elif key in self._NESTED and value is not None:
+                value = [item.json_dictionary for item in value]
+            elif key in self._NUMERIC and self._fixed_point is not None and value is not None:
+                value = self._fixed_point.format(
+                    value,
+                    json_dictionary.get(self._PAIR_KEY),
+                    PRICE if key in self._PRICES else AMOUNT,
+                )
+            json_dictionary[key] = value
+        return json_dictionary
+
+
+class LazySequence(Sequence):
+    """Read-only list of records built from a JSON list on first access.
+
+    Length, slicing and `filter` work on the JSON list and construct no
+    records; records that were built are cached for later accesses.
+    """
+
+    __slots__ = ("json_list", "_record", "_keep_json", "_fixed_point", "_cache")
+
+    def __init__(
+        self,
+        json_list: List[Dict],
+        record: Type[SerializedRecord],
+        keep_json: bool = False,
+        fixed_point=None,
+    ):
+        self.json_list = json_list
+        self._record = record
+        self._keep_json = keep_json
+        self._fixed_point = fixed_point
+        self._cache: Dict[int, SerializedRecord] = {}
+
+    def __len__(self) -> int:
+        return len(self.json_list)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LazySequence(
+                self.json_list[index], self._record, self._keep_json, self._fixed_point
+            )
+
+        if index < 0:
+            index += len(self.json_list)
+            if index < 0:
+                raise IndexError("LazySequence index out of range")
+        record = self._cache.get(index)
+        if record is None:
+            # raises IndexError past the end, which also ends iteration
+            record = self._record(
+                self.json_list[index], self._keep_json, fixed_point=self._fixed_point
+            )
+            self._cache[index] = record
+        return record
+
+    def filter(self, **fields) -> "LazySequence":
+        """Records whose attributes equal the given values, e.g. `side="buy"`."""
+        keys = {value: key for key, value in self._record._FIELDS.items()}
+        try:
+            criteria = [(keys[attribute], value) for attribute, value in fields.items()]
+        except KeyError as e:
+            raise AttributeError(
+                f"{self._record.__name__} has no field {e.args[0]}"
+            ) from None
+
+        return LazySequence(
+            [
+                item
+                for item in self.json_list
+                if all(key in item and item[key] == value for key, value in criteria)
+            ],
+            self._record,
+            self._keep_json,
+            self._fixed_point,
+        )
 
-        if "balances" in json_dictionary:
-            self.balances = [
-                WalletBalance(balance) for balance in json_dictionary["balances"]
+    def __repr__(self):
+        return f"LazySequence({self._record.__name__} x {len(self.json_list)})"
+
+
+def _record_init(cls):
+    # a straight-line __init__ per record type, much faster than looping
+    # over the field map for every record of a large page
+    lines = [
+        "def __init__(self, json_dictionary, keep_json=False, lazy=False, fixed_point=None):",
+        "    self._json_dictionary = json_dictionary if keep_json else None",
+        "    self._fixed_point = fixed_point",
+    ]
+    if cls._NUMERIC:
+        lines.append(
+            f"    pair = json_dictionary.get({cls._PAIR_KEY!r})"
+            if cls._PAIR_KEY
+            else "    pair = None"
+        )
+    namespace = {}
+    for key, attribute in cls._FIELDS.items():
+        lines.append(f"    if {key!r} in json_dictionary:")
+        if key in cls._NESTED:
+            namespace[attribute] = cls._NESTED[key]
+            namespace["LazySequence"] = LazySequence
+            lines += [
+                f"        value = json_dictionary[{key!r}]",
+                "        if value is None:",
+                f"            self.{attribute} = None",
+                "        elif lazy:",
+                f"            self.{attribute} = LazySequence(value, {attribute}, keep_json, fixed_point)",
+                "        else:",
+                f"            self.{attribute} = [{attribute}(item, keep_json, fixed_point=fixed_point) for item in value]",
             ]
+        elif key in cls._NUMERIC:
+            lines += [
+                f"        value = json_dictionary[{key!r}]",
+                f"        self.{attribute} = value if fixed_point is None else fixed_point.parse(value, pair, False, {PRICE if key in cls._PRICES else AMOUNT!r})",
+            ]
+        else:
+            lines.append(f"        self.{attribute} = json_dictionary[{key!r}]")
 
+    exec("\n".join(lines), namespace)
+    __init__ = namespace["__init__"]
+    __init__.__qualname__ = f"{cls.__qualname__}.__init__"
+    return __init__
 
-# GET /pairs
-class Pairs(BaseSerializedResponse):
-    def __init__(self, json_dictionary: Dict):
-        super().__init__(json_dictionary)
 
-        if "pairs" in json_dictionary:
-            self.pairs = json_dictionary["pairs"]
-        if "minLimits" in json_dictionary:
-            self.min_limits = json_dictionary["minLimits"]
-        if "maxLimits" in json_dictionary:
-            self.max_limits = json_dictionary["maxLimits"]
+# GET /balances
+class WalletBalance(SerializedRecord):
+    _FIELDS = {
+        "assetName": "asset_name",
+        "totalBalance": "total_balance",
+        "availableBalance": "available_balance",
+        "lockedBalance": "locked_balance",
+        "debt": "debt",
+        "interest": "interest",
+    }
+    _NUMERIC = ("totalBalance", "availableBalance", "lockedBalance", "debt", "interest")
+    __slots__ = tuple(_FIELDS.values())
 
 
-# GET /quote
-class Quote(BaseSerializedResponse):
-    def __init__(self, json_dictionary: Dict):
-        super().__init__(json_dictionary)
-
-        if "pair" in json_dictionary:
-            self.pair = json_dictionary["pair"]
-        if "amount" in json_dictionary:
-            self.amount = json_dictionary["amount"]
-        if "price" in json_dictionary:
-            self.price = json_dictionary["price"]
-        if "timestamp" in json_dictionary:
-            self.timestamp = json_dictionary["timestamp"]
+class Balances(SerializedRecord):
+    _FIELDS = {"balances": "balances"}
+    _NESTED = {"balances": WalletBalance}
+    __slots__ = tuple(_FIELDS.values())
 
 
-# POST /orders | /orders/trigger | /orders/advanced
-class OrderResponse(BaseSerializedResponse):
-    def __init__(self, json_dictionary: Dict):
-        super().__init__(json_dictionary)
-
-        if "orderId" in json_dictionary:
-            self.order_id = json_dictionary["orderId"]
+# GET /pairs
+class Pairs(SerializedRecord):
+    _FIELDS = {"pairs": "pairs", "minLimits": "min_limits", "maxLimits": "max_limits"}
+    __slots__ = tuple(_FIELDS.values())
 
 
-# POST /orders/twap
-class AdvancedOrderResponse(BaseSerializedResponse):
-    def __init__(self, json_dictionary: Dict):
-        super().__init__(json_dictionary)
+# GET /quote
+class Quote(SerializedRecord):
+    _FIELDS = {
+        "pair": "pair",
+        "amount": "amount",
+        "price": "price",
+        "timestamp": "timestamp",
+    }
+    _NUMERIC = ("amount", "price")
+    _PRICES = ("price",)
+    _PAIR_KEY = "pair"
+    __slots__ = tuple(_FIELDS.values())
 
-        if "orderId" in json_dictionary:
-            self.order_id = json_dictionary["orderId"]
 
-        if "amount" in json_dictionary:
-            self.amount = json_dictionary["amount"]
+# POST /orders | /orders/trigger | /orders/advanced
+class OrderResponse(SerializedRecord):
+    _FIELDS = {"orderId": "order_id"}
+    __slots__ = tuple(_FIELDS.values())
 
 
-class TradeForOrder(BaseSerializedResponse):
-    def __init__(self, json_dictionary: Dict):
-        super().__init__(json_dictionary)
-
-        if "id" in json_dictionary:
-            self.id = json_dictionary["id"]
-        if "symbol" in json_dictionary:
-            self.symbol = json_dictionary["symbol"]
-        if "type" in json_dictionary:
-            self.type = json_dictionary["type"]
-        if "orderAmount" in json_dictionary:
-            self.order_amount = json_dictionary["orderAmount"]
-        if "amountFilled" in json_dictionary:
-            self.amount_filled = json_dictionary["amountFilled"]
-        if "executedPrice" in json_dictionary:
-            self.executed_price = json_dictionary["executedPrice"]
-        if "timestamp" in json_dictionary:
-            self.timestamp = json_dictionary["timestamp"]
-        if "status" in json_dictionary:
-            self.status = json_dictionary["status"]
+# POST /orders/twap
+class AdvancedOrderResponse(SerializedRecord):
+    _FIELDS = {"orderId": "order_id", "amount": "amount"}
+    _NUMERIC = ("amount",)
+    __slots__ = tuple(_FIELDS.values())
+
+
+class TradeForOrder(SerializedRecord):
+    _FIELDS = {
+        "id": "id",
+        "symbol": "symbol",
+        "type": "type",
+        "orderAmount": "order_amount",
+        "amountFilled": "amount_filled",
+        "executedPrice": "executed_price",
+        "timestamp": "timestamp",
+        "status": "status",
+    }
+    _NUMERIC = ("orderAmount", "amountFilled", "executedPrice")
+    _PRICES = ("executedPrice",)
+    _PAIR_KEY = "symbol"
+    __slots__ = tuple(_FIELDS.values())
 
 
 # GET /orderDetails
-class OrderDetails(BaseSerializedResponse):
-    def __init__(self, json_dictionary: Dict):
-        super().__init__(json_dictionary)
-
-        if "id" in json_dictionary:
-            self.id = json_dictionary["id"]
-        if "side" in json_dictionary:
-            self.side = json_dictionary["side"]
-        if "pair" in json_dictionary:
-            self.pair = json_dictionary["pair"]
-        if "timestamp" in json_dictionary:
-            self.timestamp = json_dictionary["timestamp"]
-        if "quantity" in json_dictionary:
-            self.quantity = json_dictionary["quantity"]
-        if "exchangeRate" in json_dictionary:
-            self.exchange_rate = json_dictionary["exchangeRate"]
-        if "exchangeQuantity" in json_dictionary:
-            self.exchange_quantity = json_dictionary["exchangeQuantity"]
-        if "trades" in json_dictionary:
-            self.trades = [TradeForOrder(trade) for trade in json_dictionary["trades"]]
+class OrderDetails(SerializedRecord):
+    _FIELDS = {
+        "id": "id",
+        "side": "side",
+        "pair": "pair",
+        "timestamp": "timestamp",
+        "quantity": "quantity",
+        "exchangeRate": "exchange_rate",
+        "exchangeQuantity": "exchange_quantity",
+        "trades": "trades",
+    }
+    _NESTED = {"trades": TradeForOrder}
+    _NUMERIC = ("quantity", "exchangeRate", "exchangeQuantity")
+    _PRICES = ("exchangeRate",)
+    _PAIR_KEY = "pair"
+    __slots__ = tuple(_FIELDS.values())
 
 
 # GET /orders
-class Orders(BaseSerializedResponse):
-    def __init__(self, json_dictionary: Dict):
-        super().__init__(json_dictionary)
-
-        if "orders" in json_dictionary:
-            self.orders = [OrderDetails(order) for order in json_dictionary["orders"]]
+class Orders(SerializedRecord):
+    _FIELDS = {"orders": "orders"}
+    _NESTED = {"orders": OrderDetails}
+    __slots__ = tuple(_FIELDS.values())
 
 
 # GET /trades
-class Trade(BaseSerializedResponse):
-    def __init__(self, json_dictionary: Dict):
-        super().__init__(json_dictionary)
-
-        if "id" in json_dictionary:
-            self.id = json_dictionary["id"]
-        if "symbol" in json_dictionary:
-            self.symbol = json_dictionary["symbol"]
-        if "side" in json_dictionary:
-            self.side = json_dictionary["side"]
-        if "tradeAmount" in json_dictionary:
-            self.trade_amount = json_dictionary["tradeAmount"]
-        if "executedPrice" in json_dictionary:
-            self.executed_price = json_dictionary["executedPrice"]
-        if "timestamp" in json_dictionary:
-            self.timestamp = json_dictionary["timestamp"]
-        if "orderId" in json_dictionary:
-            self.order_id = json_dictionary["orderId"]
-
-
-class TradeHistory(BaseSerializedResponse):
-    def __init__(self, json_dictionary: Dict):
-        super().__init__(json_dictionary)
-
-        if "trades" in json_dictionary:
-            self.trades = [Trade(trade) for trade in json_dictionary["trades"]]
-
-
-class Transaction(BaseSerializedResponse):
-    def __init__(self, json_dictionary: Dict):
-        super().__init__(json_dictionary)
-
-        if "transactionId" in json_dictionary:
-            self.transaction_id = json_dictionary["transactionId"]
-        if "createDate" in json_dictionary:
-            self.create_date = json_dictionary["createDate"]
-        if "assetName" in json_dictionary:
-            self.asset_name = json_dictionary["assetName"]
-        if "amount" in json_dictionary:
-            self.amount = json_dictionary["amount"]
-        if "type" in json_dictionary:
-            self.type = json_dictionary["type"]
-        if "status" in json_dictionary:
-            self.status = json_dictionary["status"]
+class Trade(SerializedRecord):
+    _FIELDS = {
+        "id": "id",
+        "symbol": "symbol",
+        "side": "side",
+        "tradeAmount": "trade_amount",
+        "executedPrice": "executed_price",
+        "timestamp": "timestamp",
+        "orderId": "order_id",
+    }
+    _NUMERIC = ("tradeAmount", "executedPrice")
+    _PRICES = ("executedPrice",)
+    _PAIR_KEY = "symbol"
+    __slots__ = tuple(_FIELDS.values())
+
+
+class TradeHistory(SerializedRecord):
+    _FIELDS = {"trades": "trades"}
+    _NESTED = {"trades": Trade}
+    __slots__ = tuple(_FIELDS.values())
+
+
+class Transaction(SerializedRecord):
+    _FIELDS = {
+        "transactionId": "transaction_id",
+        "createDate": "create_date",
+        "assetName": "asset_name",
+        "amount": "amount",
+        "type": "type",
+        "status": "status",
+    }
+    _NUMERIC = ("amount",)
+    __slots__ = tuple(_FIELDS.values())
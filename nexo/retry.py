@@ -0,0 +1,185 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from nexo.exceptions import NexoAPIException, NexoRequestException
+
+# The request never reached the server, or the server refused to execute it.
+NOT_EXECUTED = "not_executed"
+# The request may or may not have been executed.
+AMBIGUOUS = "ambiguous"
+
+RETRY = "retry"
+VERIFY = "verify"
+
+# Endpoints whose effect is the same when repeated.
+IDEMPOTENT_POSTS = ("orders/cancel", "orders/cancel/all", "futures/close-all-positions")
+# Endpoints whose execution can be checked against the order history.
+VERIFIABLE_POSTS = ("orders",)
+
+
+def classify_error(error: Exception) -> Optional[str]:
+    if isinstance(error, NexoAPIException):
+        if error.code == 301:
+            return NOT_EXECUTED
+        if error.code == 206:
+            return AMBIGUOUS
+        return None
+
+    if isinstance(error, NexoRequestException):
+        if error.status_code == 429:
+            return NOT_EXECUTED
+        if error.status_code is not None and error.status_code >= 500:
+            return AMBIGUOUS
+        return None
+
+    if isinstance(error, (requests.exceptions.ConnectTimeout, aiohttp.ClientConnectorError)):
+        return NOT_EXECUTED
+
+    if isinstance(error, requests.exceptions.ConnectionError):
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        if isinstance(reason, NewConnectionError):
+            return NOT_EXECUTED
+        return AMBIGUOUS
+
+    if isinstance(
+        error,
+        (
+            requests.exceptions.Timeout,
+            aiohttp.ClientConnectionError,
+            aiohttp.ClientPayloadError,
+            asyncio.TimeoutError,
+        ),
+    ):
+        return AMBIGUOUS
+
+    return None
+
+
+class RetryBudget:
+    """Caps retries to a fraction of the requests made.
+
+    Every request deposits `ratio` tokens and every retry withdraws one, so
+    that when the API is down workers stop retrying instead of multiplying
+    the load. `min_per_second` keeps a few retries available at low traffic.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.max_tokens,
+            self.tokens + (now - self._last_refill) * self.min_per_second,
+        )
+        self._last_refill = now
+
+    def deposit(self):
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class RetryPolicy:
+    """Decides whether a failed request is sent again, and when.
+
+    GETs and cancels are retried on any transient failure. Order placement
+    is only retried when the request was not executed. After an ambiguous
+    failure the order history is looked up `verify_attempts` times,
+    `verify_delay` seconds apart since it may lag behind the matching
+    engine, and `NexoOrderStateUnknownException` is raised when the order
+    does not show up rather than risking a duplicate. The history is read
+    even when no attempt or retry budget is left. Delays follow the
+    decorrelated jitter backoff so that workers failing together do not
+    retry together.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.1,
+        max_delay: float = 2.0,
+        budget: Optional[RetryBudget] = None,
+        idempotent_posts=IDEMPOTENT_POSTS,
+        verifiable_posts=VERIFIABLE_POSTS,
+        verify_attempts: int = 3,
+        verify_delay: float = 1.0,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self.idempotent_posts = set(idempotent_posts)
+        self.verifiable_posts = set(verifiable_posts)
+        self.verify_attempts = verify_attempts
+        self.verify_delay = verify_delay
+
+    def backoff(self, previous_delay: float) -> float:
+        upper = max(self.base_delay, previous_delay * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+    def action(self, method: str, path: str, error: Exception, attempt: int) -> Optional[str]:
+        kind = classify_error(error)
+        if kind is None:
+            return None
+
+        if (
+            kind == AMBIGUOUS
+            and method != "get"
+            and path not in self.idempotent_posts
+            and path in self.verifiable_posts
+        ):
+            # checking the history never resends the order, so it is done
+            # whatever the attempts and budget left
+            return VERIFY
+
+        if attempt >= self.max_attempts:
+            return None
+        if kind == NOT_EXECUTED or method == "get" or path in self.idempotent_posts:
+            if self.budget.withdraw():
+                return RETRY
+        return None
+
+
+def match_placed_order(orders_json: Dict, data: Dict, since: float) -> Optional[str]:
+    # Looks for the order described by the request payload of place_order or
+    # place_trigger_order in an order history page, among the orders created
+    # no earlier than `since`, the server time before it was sent. An
+    # identical order placed concurrently by another worker would match as
+    # well.
+    quantity = data.get("quantity", data.get("amount"))
+    orders: List[Dict] = orders_json.get("orders", []) if orders_json else []
+
+    for order in orders:
+        if order.get("pair") != data.get("pair") or order.get("side") != data.get("side"):
+            continue
+        try:
+            if float(order.get("timestamp", 0)) < since:
+                continue
+            if float(order.get("quantity")) != float(quantity):
+                continue
+        except (TypeError, ValueError):
+            continue
+        return order.get("id")
+
+    return None
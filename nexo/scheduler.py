@@ -0,0 +1,95 @@
+import asyncio
+import heapq
+import itertools
+from typing import Dict, List, Optional
+
+from nexo.rate_limiter import RateLimiter
+
+# lower goes first
+URGENT = 0
+PLACEMENT = 1
+QUOTE = 2
+DEFAULT = 3
+BULK = 4
+
+DEFAULT_PRIORITIES = {
+    "POST orders/cancel": URGENT,
+    "POST orders/cancel/all": URGENT,
+    "POST futures/close-all-positions": URGENT,
+    "POST orders": PLACEMENT,
+    "POST orders/twap": PLACEMENT,
+    "POST futures/order": PLACEMENT,
+    "GET quote": QUOTE,
+    "GET orders": BULK,
+    "GET trades": BULK,
+}
+
+
+class RequestScheduler:
+    """Hands out the rate limiter's tokens by priority.
+
+    Requests are classified like rate limiter weights, by method and path
+    ("POST orders/cancel") or path alone, everything else is `DEFAULT`.
+    A request goes straight through when nothing is waiting and a token is
+    available. Otherwise it is queued, and each token is given to the most
+    urgent request waiting, oldest first within a priority, so that a
+    cancel never waits behind a history backfill.
+    """
+
+    def __init__(
+        self, rate_limiter: RateLimiter, priorities: Optional[Dict[str, int]] = None
+    ):
+        self.rate_limiter = rate_limiter
+        self.priorities = dict(DEFAULT_PRIORITIES)
+        self.priorities.update(priorities or {})
+        self._waiting: List = []
+        self._order = itertools.count()
+        self._wakeup = None
+        self._dispatcher = None
+
+    def priority_for(self, path: str, method: str = "get") -> int:
+        priority = RateLimiter._lookup(self.priorities, path, method)
+        return DEFAULT if priority is None else priority
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiting)
+
+    async def acquire(self, path: str, method: str = "get", priority: Optional[int] = None):
+        if not self._waiting and self.rate_limiter.try_acquire(path, method) == 0:
+            return
+
+        if priority is None:
+            priority = self.priority_for(path, method)
+        granted = asyncio.get_event_loop().create_future()
+        heapq.heappush(
+            self._waiting, (priority, next(self._order), granted, path, method)
+        )
+
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        else:
+            # a more urgent request may have to go before the current head
+            self._wakeup.set()
+        await granted
+
+    async def _dispatch(self):
+        while self._waiting:
+            _, _, granted, path, method = self._waiting[0]
+            if granted.done():
+                # the waiting request was cancelled
+                heapq.heappop(self._waiting)
+                continue
+
+            delay = self.rate_limiter.try_acquire(path, method)
+            if delay == 0:
+                heapq.heappop(self._waiting)
+                granted.set_result(None)
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,146 @@
+import os
+import struct
+from typing import Dict, Iterable, Optional, Union
+
+from nexo.fixed_point import FixedPoint
+from nexo.response_serializers import Trade
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+MAGIC = b"NEXOTLOG"
+VERSION = 1
+# magic, version, decimals, record size
+_HEADER = struct.Struct("<8sIII")
+HEADER_SIZE = 32
+
+SIDES = {"buy": 0, "sell": 1}
+
+
+def trade_dtype():
+    # prices and amounts are fixed point, see `TradeLog.decimals`
+    return np.dtype(
+        [
+            ("timestamp", "<i8"),
+            ("executed_price", "<i8"),
+            ("trade_amount", "<i8"),
+            ("side", "i1"),
+            ("symbol", "S16"),
+            ("id", "S40"),
+            ("order_id", "S40"),
+        ]
+    )
+
+
+class TradeLog:
+    """Append-only file of fixed-width trade records, read through mmap.
+
+    Records are stored in timestamp order, so `between` finds a time range
+    with binary searches on a sparse index holding every `index_stride`-th
+    timestamp, then within one stride of the memory-mapped file. Prices and
+    amounts are integers with `decimals` decimals (a new log takes the
+    argument, an existing one keeps the precision it was created with), a
+    trade needing more decimals fails the append with a ValueError.
+    """
+
+    def __init__(self, path: str, decimals: int = 8, index_stride: int = 1024):
+        if np is None:
+            raise ImportError(
+                "numpy is required for the trade log, install python-nexo[columns]"
+            )
+        self.path = path
+        self.index_stride = index_stride
+        self.dtype = trade_dtype()
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                magic, version, decimals, record_size = _HEADER.unpack(
+                    f.read(_HEADER.size)
+                )
+            if magic != MAGIC or version != VERSION or record_size != self.dtype.itemsize:
+                raise ValueError(f"{path} is not a version {VERSION} trade log")
+        else:
+            with open(path, "wb") as f:
+                f.write(
+                    _HEADER.pack(MAGIC, VERSION, decimals, self.dtype.itemsize).ljust(
+                        HEADER_SIZE, b"\0"
+                    )
+                )
+
+        self.decimals = decimals
+        self.fixed_point = FixedPoint(decimals)
+        self._records = None
+        self._index = None
+        self._refresh()
+
+    def _refresh(self):
+        count = (os.path.getsize(self.path) - HEADER_SIZE) // self.dtype.itemsize
+        if count == 0:
+            self._records = np.empty(0, dtype=self.dtype)
+        else:
+            self._records = np.memmap(
+                self.path, dtype=self.dtype, mode="r", offset=HEADER_SIZE, shape=(count,)
+            )
+        self._index = np.ascontiguousarray(
+            self._records["timestamp"][:: self.index_stride]
+        )
+
+    @property
+    def records(self):
+        """Every record, as a read-only structured array over the file."""
+        return self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def append(self, trades: Iterable[Union[Dict, Trade]]) -> int:
+        """Appends trades, in any order but not older than the last record.
+
+        Trades are JSON dictionaries, as in the `trades` of a trade history
+        page, or `Trade` objects.
+        """
+        parse = self.fixed_point.parse
+        rows = []
+        for trade in trades:
+            if isinstance(trade, Trade):
+                trade = trade.json_dictionary
+            rows.append(
+                (
+                    int(trade["timestamp"]),
+                    parse(trade.get("executedPrice")) or 0,
+                    parse(trade.get("tradeAmount")) or 0,
+                    SIDES.get(trade.get("side"), -1),
+                    str(trade.get("symbol") or "").encode(),
+                    str(trade.get("id") or "").encode(),
+                    str(trade.get("orderId") or "").encode(),
+                )
+            )
+        if not rows:
+            return 0
+
+        batch = np.array(rows, dtype=self.dtype)
+        batch.sort(order="timestamp", kind="stable")
+        if len(self._records) and batch["timestamp"][0] < self._records["timestamp"][-1]:
+            raise ValueError(
+                "Trades older than the end of the log cannot be appended"
+            )
+
+        with open(self.path, "ab") as f:
+            f.write(batch.tobytes())
+        self._refresh()
+        return len(batch)
+
+    def _seek(self, timestamp: int, side: str) -> int:
+        timestamps = self._records["timestamp"]
+        block = int(np.searchsorted(self._index, timestamp, side))
+        low = max(block - 1, 0) * self.index_stride
+        high = min(block * self.index_stride, len(timestamps))
+        return low + int(np.searchsorted(timestamps[low:high], timestamp, side))
+
+    def between(self, start_date: Optional[int] = None, end_date: Optional[int] = None):
+        """Records with `start_date <= timestamp <= end_date`, without copying."""
+        start = 0 if start_date is None else self._seek(start_date, "left")
+        end = len(self._records) if end_date is None else self._seek(end_date, "right")
+        return self._records[start:max(start, end)]
@@ -0,0 +1,101 @@
+import socket
+import ssl
+from typing import Optional
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "User-Agent": "python-nexo",
+    "Content-Type": "application/json",
+}
+
+
+class _PooledHTTPAdapter(HTTPAdapter):
+    def __init__(self, ssl_context=None, socket_options=None, **kwargs):
+        self.ssl_context = ssl_context
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.ssl_context is not None:
+            kwargs["ssl_context"] = self.ssl_context
+        if self.socket_options is not None:
+            kwargs["socket_options"] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+class TransportConfig:
+    """Connection pool settings for the sync and async sessions.
+
+    Sessions created from the same config share one SSL context, and a
+    session can be handed to any number of clients, whatever their keys.
+    `keepalive_timeout` and `dns_cache_ttl` only apply to aiohttp, which
+    always enables TCP_NODELAY on its own.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 100,
+        per_host_limit: int = 0,
+        keepalive_timeout: Optional[float] = 30.0,
+        dns_cache_ttl: Optional[int] = 300,
+        tcp_nodelay: bool = True,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ):
+        self.pool_size = pool_size
+        self.per_host_limit = per_host_limit
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.tcp_nodelay = tcp_nodelay
+        self._ssl_context = ssl_context
+
+    @property
+    def ssl_context(self) -> ssl.SSLContext:
+        # built once, loading the CA bundle is the expensive part
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context(
+                cafile=requests.certs.where()
+            )
+        return self._ssl_context
+
+    @property
+    def max_connections(self) -> int:
+        # per host, the API lives on a single one
+        if self.per_host_limit:
+            return min(self.per_host_limit, self.pool_size)
+        return self.pool_size
+
+    def _socket_options(self):
+        options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        if self.tcp_nodelay:
+            options.append((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1))
+        return options
+
+    def create_session(self) -> requests.Session:
+        session = requests.session()
+        adapter = _PooledHTTPAdapter(
+            ssl_context=self.ssl_context,
+            socket_options=self._socket_options(),
+            pool_maxsize=self.max_connections,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(DEFAULT_HEADERS)
+        return session
+
+    def create_async_session(self, loop=None) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.per_host_limit,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=self.dns_cache_ttl is not None,
+            ttl_dns_cache=self.dns_cache_ttl,
+            ssl=self.ssl_context,
+            loop=loop,
+        )
+        return aiohttp.ClientSession(
+            connector=connector, headers=DEFAULT_HEADERS, loop=loop
+        )
@@ -0,0 +1,301 @@
+import asyncio
+import itertools
+import threading
+from typing import Dict, Iterator, List, Optional
+
+import aiohttp
+
+from nexo.async_client import AsyncClient
+from nexo.exceptions import NexoAPIException, NexoRequestException
+from nexo.retry import RetryPolicy
+
+ORDERS_CHANNEL = "orders"
+TRADES_CHANNEL = "trades"
+BALANCES_CHANNEL = "balances"
+
+# error 105, a resumed session may still be authenticated
+ALREADY_AUTHENTICATED = 105
+
+_CLOSED = object()
+
+
+class Subscription:
+    def __init__(self, socket: "WebSocketClient", channel: str):
+        self.socket = socket
+        self.channel = channel
+        self._queue = asyncio.Queue()
+
+    def _put(self, message):
+        self._queue.put_nowait(message)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict:
+        message = await self._queue.get()
+        if message is _CLOSED:
+            raise StopAsyncIteration
+        return message
+
+    async def unsubscribe(self):
+        await self.socket._unsubscribe(self)
+
+
+class WebSocketClient:
+    """Authenticated, self-healing WebSocket connection to Nexo Pro.
+
+    Requests are JSON objects with an `id`, a `method` and `params`, answered
+    by an object carrying the same `id` and either a `result` or an
+    `errorCode`. Channel updates arrive as `{"channel": ..., "data": ...}` and
+    are delivered to every subscription of that channel. When the connection
+    drops it is re-established, re-authenticated and every channel is
+    subscribed again.
+    """
+
+    WS_URL = "wss://pro-api.nexo.io/ws"
+
+    def __init__(
+        self,
+        client: AsyncClient,
+        url: Optional[str] = None,
+        heartbeat: float = 30.0,
+        reconnect: bool = True,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: float = 10.0,
+    ):
+        self.client = client
+        self.url = url or self.WS_URL
+        self.heartbeat = heartbeat
+        self.reconnect = reconnect
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.timeout = timeout
+
+        self.connections = 0
+        self._ws = None
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._subscriptions: Dict[str, List[Subscription]] = {}
+        self._runner = None
+        self._ready = None
+        self._closing = False
+        self._session_ok = False
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+
+    async def connect(self):
+        if self._runner is not None:
+            return
+        self._ready = asyncio.get_event_loop().create_future()
+        self._runner = asyncio.ensure_future(self._run())
+        await self._ready
+
+    async def close(self):
+        self._closing = True
+        if self._ws is not None:
+            await self._ws.close()
+        if self._runner is not None:
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                subscription._put(_CLOSED)
+        self._subscriptions.clear()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(self, channel)
+        subscribers = self._subscriptions.setdefault(channel, [])
+        subscribers.append(subscription)
+
+        if len(subscribers) == 1 and self.connected:
+            try:
+                await self._call("subscribe", {"channels": [channel]})
+            except Exception:
+                subscribers.remove(subscription)
+                raise
+        return subscription
+
+    async def _unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscriptions.get(subscription.channel, [])
+        if subscription in subscribers:
+            subscribers.remove(subscription)
+        subscription._put(_CLOSED)
+
+        if not subscribers:
+            self._subscriptions.pop(subscription.channel, None)
+            if self.connected:
+                await self._call("unsubscribe", {"channels": [subscription.channel]})
+
+    async def _call(self, method: str, params: Dict):
+        request_id = next(self._ids)
+        future = asyncio.get_event_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self._ws.send_str(
+                self.client.json_codec.dumps(
+                    {"id": request_id, "method": method, "params": params}
+                ).decode("utf-8")
+            )
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _handshake(self):
+        nonce = self.client._generate_nonce()
+        try:
+            await self._call(
+                "auth",
+                {
+                    "apiKey": self.client.API_KEY,
+                    "nonce": nonce,
+                    "signature": self.client._generate_signature(nonce).decode("utf8"),
+                },
+            )
+        except NexoAPIException as e:
+            if e.code != ALREADY_AUTHENTICATED:
+                raise
+
+        if self._subscriptions:
+            await self._call("subscribe", {"channels": list(self._subscriptions)})
+
+    def _dispatch(self, raw: str):
+        message = self.client.json_codec.loads(raw)
+
+        future = self._pending.get(message.get("id"))
+        if future is not None:
+            if future.done():
+                return
+            if "errorCode" in message:
+                future.set_exception(NexoAPIException(message["errorCode"], raw, message))
+            else:
+                future.set_result(message.get("result"))
+            return
+
+        for subscription in self._subscriptions.get(message.get("channel"), []):
+            subscription._put(message.get("data"))
+
+    def _handshake_done(self, handshake: asyncio.Future):
+        if handshake.cancelled():
+            return
+
+        error = handshake.exception()
+        if error is None:
+            self._session_ok = True
+            if not self._ready.done():
+                self._ready.set_result(None)
+            return
+
+        if not self._ready.done():
+            self._ready.set_exception(error)
+        # drop the connection, the run loop decides whether to reconnect
+        asyncio.ensure_future(self._ws.close())
+
+    async def _run(self):
+        delay = 0.0
+
+        while not self._closing:
+            self._session_ok = False
+            error = None
+            try:
+                self._ws = await self.client.session.ws_connect(
+                    self.url,
+                    heartbeat=self.heartbeat,
+                    headers={"X-API-KEY": self.client.API_KEY},
+                )
+                self.connections += 1
+                handshake = asyncio.ensure_future(self._handshake())
+                handshake.add_done_callback(self._handshake_done)
+
+                async for message in self._ws:
+                    if message.type == aiohttp.WSMsgType.TEXT:
+                        self._dispatch(message.data)
+                    elif message.type == aiohttp.WSMsgType.ERROR:
+                        break
+
+                handshake.cancel()
+            except Exception as e:
+                error = e
+            finally:
+                for future in self._pending.values():
+                    if not future.done():
+                        future.set_exception(
+                            NexoRequestException("WebSocket connection closed")
+                        )
+
+            # only sessions that were up once are resumed
+            if not self._ready.done():
+                self._ready.set_exception(
+                    error or NexoRequestException("WebSocket connection closed")
+                )
+            if self._ready.exception() is not None:
+                return
+            if self._closing or not self.reconnect:
+                return
+
+            delay = self.retry_policy.backoff(0.0 if self._session_ok else delay)
+            await asyncio.sleep(delay)
+
+
+class ThreadedWebSocketClient:
+    """Blocking wrapper running a `WebSocketClient` on a background loop."""
+
+    def __init__(self, api_key, api_secret, url: Optional[str] = None, **kwargs):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+        async def open_socket():
+            client = await AsyncClient.create(api_key, api_secret)
+            socket = WebSocketClient(client, url, **kwargs)
+            try:
+                await socket.connect()
+            except Exception:
+                await client.close_connection()
+                raise
+            return client, socket
+
+        try:
+            self.client, self.socket = self._run(open_socket())
+        except Exception:
+            self._stop()
+            raise
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def subscribe(self, channel: str) -> Iterator[Dict]:
+        subscription = self._run(self.socket.subscribe(channel))
+
+        def messages():
+            while True:
+                try:
+                    yield self._run(subscription.__anext__())
+                except StopAsyncIteration:
+                    return
+
+        return messages()
+
+    def close(self):
+        self._run(self.socket.close())
+        self._run(self.client.close_connection())
+        self._stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
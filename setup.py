@@ -31,6 +31,7 @@ setup(
     license="MIT",
     author_email="erwin.lejeune15@gmail.com",
     install_requires=required,
+    extras_require={"columns": ["numpy"], "fast-json": ["orjson"]},
     keywords="nexo crypto exchange rest api bitcoin ethereum btc eth neo",
     classifiers=[
         "Intended Audience :: Developers",
@@ -0,0 +1,99 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+class StubAPI:
+    """Local stand-in for the Nexo Pro REST API.
+
+    Routes are registered per method and endpoint path (without the
+    /api/v1 prefix) with a list of responses served in order, the last
+    one being repeated. A response is a (status, body) tuple or a
+    callable taking the recorded request and returning one.
+    """
+
+    PREFIX = "/api/v1/"
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.url = "http://127.0.0.1:%d" % self.server.server_address[1]
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        )
+
+    def add(self, method, path, *responses):
+        self.routes[(method.upper(), path)] = list(responses)
+
+    def calls(self, method, path):
+        return [r for r in self.requests if r["method"] == method.upper() and r["path"] == path]
+
+    def _next_response(self, request):
+        key = (request["method"], request["path"])
+        with self.lock:
+            self.requests.append(request)
+            responses = self.routes.get(key)
+            if not responses:
+                return 404, {"errorCode": 102, "errorMessage": "Unknown route"}
+            response = responses.pop(0) if len(responses) > 1 else responses[0]
+
+        if callable(response):
+            return response(request)
+        return response
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _serve(self):
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                request = {
+                    "method": self.command,
+                    "path": url.path[len(stub.PREFIX):],
+                    "query": parse_qs(url.query),
+                    "headers": dict(self.headers),
+                    "body": json.loads(body) if body else None,
+                }
+                status, payload = stub._next_response(request)
+                raw = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            do_GET = _serve
+            do_POST = _serve
+            do_PUT = _serve
+            do_DELETE = _serve
+
+        return Handler
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def api():
+    stub = StubAPI()
+    stub.start()
+    yield stub
+    stub.stop()
@@ -0,0 +1,100 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+
+import pytest
+
+import nexo
+from nexo.account_pool import merge_balances, merge_positions
+
+ACCOUNTS = {"main": ("key-1", "secret-1"), "hedge": ("key-2", "secret-2")}
+
+
+def balances_responder(request):
+    # each account holds a different amount of BTC
+    if request["headers"]["X-API-KEY"] == "key-1":
+        return 200, {"balances": [{"assetName": "BTC", "totalBalance": "0.5", "availableBalance": "0.1"}]}
+    return 200, {
+        "balances": [
+            {"assetName": "BTC", "totalBalance": "1.25", "availableBalance": "1"},
+            {"assetName": "ETH", "totalBalance": "3"},
+        ]
+    }
+
+
+def positions_responder(request):
+    if request["headers"]["X-API-KEY"] == "key-1":
+        return 400, {"errorCode": 100, "errorMessage": "API-key is malformed or invalid"}
+    return 200, {"positions": [{"instrument": "BTCUSD-PERP", "size": "2"}]}
+
+
+def test_merge_balances():
+    merged = merge_balances(
+        {
+            "a": {"balances": [{"assetName": "BTC", "totalBalance": "0.1", "debt": "0"}]},
+            "b": {"balances": [{"assetName": "BTC", "totalBalance": "0.2"}]},
+        }
+    )
+    assert merged == {"balances": [{"assetName": "BTC", "totalBalance": "0.3", "debt": "0"}]}
+    assert merge_positions({"a": [{"size": 1}], "b": {"positions": []}}) == {
+        "positions": [{"size": 1, "account": "a"}]
+    }
+
+
+def test_account_pool(api):
+    api.add("GET", "accountSummary", balances_responder)
+    api.add("GET", "futures/positions", positions_responder)
+
+    with nexo.AccountPool(
+        ACCOUNTS, rate_limiter_factory=lambda: nexo.RateLimiter(1000.0)
+    ) as pool:
+        for client in pool.clients.values():
+            client.API_URL = api.url
+
+        assert pool.names == ["main", "hedge"]
+        assert pool["main"].session is pool["hedge"].session
+        assert pool["main"].rate_limiter is not pool["hedge"].rate_limiter
+        with pytest.raises(nexo.NexoRequestException):
+            pool["other"]
+
+        balances = pool.get_account_balances(serialize_json_to_object=True)
+        assert [(b.asset_name, b.total_balance) for b in balances.balances] == [
+            ("BTC", "1.75"),
+            ("ETH", "3"),
+        ]
+        assert balances.balances[0].available_balance == "1.1"
+
+        with pytest.raises(nexo.NexoAPIException):
+            pool.get_future_positions("any")
+        positions = pool.get_future_positions("any", return_exceptions=True)
+
+    assert isinstance(positions["accounts"]["main"], nexo.NexoAPIException)
+    assert positions["positions"] == [
+        {"instrument": "BTCUSD-PERP", "size": "2", "account": "hedge"}
+    ]
+    keys = {call["headers"]["X-API-KEY"] for call in api.calls("GET", "accountSummary")}
+    assert keys == {"key-1", "key-2"}
+
+
+def test_async_account_pool(api):
+    api.add("GET", "accountSummary", balances_responder)
+
+    async def main():
+        pool = await nexo.AsyncAccountPool.create(
+            ACCOUNTS, rate_limiter_factory=lambda: nexo.RateLimiter(1000.0)
+        )
+        for client in pool.clients.values():
+            client.API_URL = api.url
+        async with pool:
+            return await pool.get_account_balances()
+
+    balances = asyncio.run(main())
+    assert balances["balances"][0] == {
+        "assetName": "BTC",
+        "totalBalance": "1.75",
+        "availableBalance": "1.1",
+    }
+    assert set(balances["accounts"]) == {"main", "hedge"}
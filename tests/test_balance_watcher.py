@@ -0,0 +1,105 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+from decimal import Decimal
+
+import nexo
+from nexo.balance_watcher import AdaptiveInterval, BalanceSnapshot
+
+
+def summary(*balances):
+    return 200, {
+        "balances": [
+            {"assetName": name, "totalBalance": total, "availableBalance": available}
+            for name, total, available in balances
+        ]
+    }
+
+
+POLLS = [
+    summary(("BTC", "1.0", "1.0"), ("ETH", "2", "2")),
+    summary(("BTC", "1.00", "1.0"), ("ETH", "2", "2")),
+    summary(("BTC", "1.5", "0.5"), ("ETH", "2", "2")),
+    summary(("BTC", "1.5", "0.5")),
+]
+
+
+def test_snapshot_deltas():
+    snapshot = BalanceSnapshot()
+    first = snapshot.update(POLLS[0][1])
+    assert [(d.asset_name, d.previous, d.changes) for d in first] == [
+        ("BTC", None, {"total_balance": Decimal("1.0"), "available_balance": Decimal("1.0")}),
+        ("ETH", None, {"total_balance": Decimal("2"), "available_balance": Decimal("2")}),
+    ]
+    # same amounts written differently
+    assert snapshot.update(POLLS[1][1]) == []
+
+    (btc,) = snapshot.update(POLLS[2][1])
+    assert btc.changes == {"total_balance": Decimal("0.5"), "available_balance": Decimal("-0.5")}
+    assert btc.current is snapshot.balances["BTC"]
+
+    (eth,) = snapshot.update(POLLS[3][1])
+    assert eth.current is None and eth.changes["total_balance"] == Decimal("-2")
+    assert list(snapshot.balances) == ["BTC"]
+
+
+def test_fixed_point_deltas():
+    snapshot = BalanceSnapshot(nexo.FixedPoint(8))
+    snapshot.update(POLLS[0][1])
+    (btc,) = snapshot.update(POLLS[2][1])
+    assert btc.changes == {"total_balance": 50_000_000, "available_balance": -50_000_000}
+
+
+def test_adaptive_interval():
+    interval = AdaptiveInterval(1.0, 5.0, 2.0)
+    assert [interval.next(False) for _ in range(4)] == [2.0, 4.0, 5.0, 5.0]
+    assert interval.next(True) == 1.0
+
+
+def make_client(api):
+    client = nexo.Client("key", "secret", rate_limiter=nexo.RateLimiter(1000.0))
+    client.API_URL = api.url
+    return client
+
+
+def test_threaded_watcher(api):
+    api.add("GET", "accountSummary", *POLLS)
+    client = make_client(api)
+
+    with client.watch_balances(min_interval=0.001, max_interval=0.01) as watcher:
+        deltas = iter(watcher)
+        received = [next(deltas) for _ in range(4)]
+
+    assert [d.asset_name for d in received] == ["BTC", "ETH", "BTC", "ETH"]
+    assert received[3].current is None
+    assert list(watcher.balances) == ["BTC"]
+
+
+def test_async_watcher(api):
+    api.add("GET", "accountSummary", *POLLS)
+
+    async def main():
+        client = await nexo.AsyncClient.create(
+            "key", "secret", rate_limiter=nexo.RateLimiter(1000.0)
+        )
+        client.API_URL = api.url
+        received = []
+        try:
+            async for delta in client.watch_balances(min_interval=0.001, max_interval=0.01):
+                received.append(delta)
+                if len(received) == 4:
+                    break
+        finally:
+            await client.close_connection()
+        return received
+
+    received = asyncio.run(main())
+    assert [(d.asset_name, d.changes.get("available_balance")) for d in received] == [
+        ("BTC", Decimal("1.0")),
+        ("ETH", Decimal("2")),
+        ("BTC", Decimal("-0.5")),
+        ("ETH", Decimal("-2")),
+    ]
@@ -0,0 +1,123 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import nexo
+from nexo.coalescing import AsyncSingleFlight, SingleFlight, request_key
+
+
+def test_request_key():
+    assert request_key("k", "get", "/q", {"a": 1, "b": [2]}) == request_key(
+        "k", "get", "/q", {"b": [2], "a": 1}
+    )
+    assert request_key("k", "get", "/q", {"a": 1}) != request_key("other", "get", "/q", {"a": 1})
+
+
+def test_single_flight_threads():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(1)
+        return {"price": "1"}
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(flight.do, "quote", slow) for _ in range(8)]
+        time.sleep(0.05)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+    # nothing in flight anymore, and no freshness window
+    flight.do("quote", slow)
+    assert len(calls) == 2
+
+
+def test_single_flight_exception_and_freshness():
+    flight = SingleFlight(freshness=60)
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 1
+
+
+def test_async_single_flight():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"balances": []}
+
+    async def main():
+        waiters = [asyncio.ensure_future(flight.do("k", fetch)) for _ in range(10)]
+        await asyncio.sleep(0)
+        # a cancelled waiter does not cancel the shared call
+        waiters[0].cancel()
+        return await asyncio.gather(*waiters[1:])
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert results == [{"balances": []}] * 9
+
+
+def test_async_client_coalesces_quotes(api):
+    def slow_quote(request):
+        time.sleep(0.1)
+        return 200, {"pair": "BTC/USDT", "price": "20000"}
+
+    api.add("GET", "quote", slow_quote)
+    api.add("POST", "orders/cancel", (200, {}))
+
+    async def main():
+        client = await nexo.AsyncClient.create("key", "secret")
+        client.API_URL = api.url
+        try:
+            quotes = await asyncio.gather(
+                *[client.get_price_quote("BTC/USDT", 1, "buy") for _ in range(20)]
+            )
+            other = await client.get_price_quote("BTC/USDT", 2, "buy")
+            # writes are never coalesced
+            await asyncio.gather(client.cancel_order("1"), client.cancel_order("1"))
+            return quotes, other
+        finally:
+            await client.close_connection()
+
+    quotes, other = asyncio.run(main())
+    assert len(quotes) == 20
+    assert len(api.calls("GET", "quote")) == 2
+    assert len(api.calls("POST", "orders/cancel")) == 2
+
+
+def test_client_coalesces_balances(api):
+    def slow_balances(request):
+        time.sleep(0.1)
+        return 200, {"balances": []}
+
+    api.add("GET", "accountSummary", slow_balances)
+    client = nexo.Client("key", "secret")
+    client.API_URL = api.url
+
+    with ThreadPoolExecutor(5) as pool:
+        results = list(pool.map(lambda _: client.get_account_balances(), range(5)))
+
+    assert results == [{"balances": []}] * 5
+    assert len(api.calls("GET", "accountSummary")) == 1
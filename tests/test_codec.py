@@ -0,0 +1,89 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+
+import pytest
+
+import nexo
+from nexo.codec import CODECS, JSONCodec, get_codec
+
+
+class CountingCodec(JSONCodec):
+    def __init__(self):
+        self.encoded = 0
+        self.decoded = 0
+
+    def dumps(self, obj):
+        self.encoded += 1
+        return super().dumps(obj)
+
+    def loads(self, data):
+        self.decoded += 1
+        return super().loads(data)
+
+
+@pytest.mark.parametrize("name", list(CODECS))
+def test_codecs_round_trip(name):
+    try:
+        codec = get_codec(name)
+    except ImportError:
+        pytest.skip(f"{name} is not installed")
+
+    data = {"pair": "BTC/USDT", "quantity": 2.0, "note": "é", "pairs": ["a", "b"]}
+
+    encoded = codec.dumps(data)
+    assert isinstance(encoded, bytes)
+    assert encoded == '{"pair":"BTC/USDT","quantity":2.0,"note":"é","pairs":["a","b"]}'.encode()
+    assert codec.loads(encoded) == data
+    assert codec.loads(encoded.decode()) == data
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        get_codec("yaml")
+
+
+def test_client_decodes_once(api):
+    api.add("GET", "pairs", (200, {"pairs": ["BTC/USDT"]}))
+    api.add("POST", "orders", (400, {"errorCode": 102, "errorMessage": "Missing field."}))
+    codec = CountingCodec()
+    client = nexo.Client(
+        "key", "secret", json_codec=codec, retry_policy=nexo.RetryPolicy(max_attempts=1)
+    )
+    client.API_URL = api.url
+
+    assert client.get_pairs() == {"pairs": ["BTC/USDT"]}
+    assert codec.decoded == 1
+
+    with pytest.raises(nexo.NexoAPIException) as e:
+        client.place_order("BTC/USDT", "buy", "market", 1.0)
+
+    assert e.value.code == 102
+    assert e.value.message == "Missing field."
+    assert codec.encoded == 1
+    assert codec.decoded == 2
+    assert api.calls("POST", "orders")[0]["body"] == {
+        "pair": "BTC/USDT",
+        "side": "buy",
+        "type": "market",
+        "quantity": 1.0,
+    }
+
+
+def test_async_client_uses_codec(api):
+    api.add("GET", "accountSummary", (200, {"balances": []}))
+    codec = CountingCodec()
+
+    async def main():
+        client = await nexo.AsyncClient.create("key", "secret", json_codec=codec)
+        client.API_URL = api.url
+        try:
+            return await client.get_account_balances()
+        finally:
+            await client.close_connection()
+
+    assert asyncio.run(main()) == {"balances": []}
+    assert codec.decoded == 1
@@ -0,0 +1,75 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import pytest
+
+import nexo
+import nexo.columns
+from nexo.columns import Columns, trade_columns
+
+TRADES = [
+    {"id": "1", "symbol": "BTC/USDT", "side": "buy", "tradeAmount": "0.5", "executedPrice": "20000", "timestamp": 1000, "orderId": "a"},
+    {"id": "2", "symbol": "ETH/USDT", "side": "sell", "tradeAmount": "2", "executedPrice": "1500.5", "timestamp": 1001, "orderId": "b"},
+    {"id": "3", "symbol": "BTC/USDT", "side": "sell", "tradeAmount": "0.25", "executedPrice": "21000", "timestamp": 1002},
+]
+
+
+def test_trade_columns():
+    np = pytest.importorskip("numpy")
+
+    columns = trade_columns(TRADES)
+
+    assert len(columns) == 3
+    assert columns.executed_price.dtype == np.float64
+    assert columns.timestamp.dtype == np.int64
+    assert list(columns.trade_amount) == [0.5, 2.0, 0.25]
+    assert list(columns["id"]) == ["1", "2", "3"]
+    assert list(columns.order_id) == ["a", "b", None]
+
+    assert columns.categories["symbol"] == ["BTC/USDT", "ETH/USDT"]
+    assert list(columns.symbol) == [0, 1, 0]
+    assert list(columns.labels("side")) == ["buy", "sell", "sell"]
+
+    btc = columns.symbol == columns.code("symbol", "BTC/USDT")
+    vwap = (columns.executed_price[btc] * columns.trade_amount[btc]).sum() / columns.trade_amount[btc].sum()
+    assert vwap == pytest.approx((20000 * 0.5 + 21000 * 0.25) / 0.75)
+    assert columns.code("symbol", "NEXO/USDT") == -1
+
+
+def test_concat_recodes_categories():
+    pytest.importorskip("numpy")
+
+    merged = Columns.concat([trade_columns(TRADES[1:]), trade_columns(TRADES[:1])])
+
+    assert list(merged.id) == ["2", "3", "1"]
+    assert list(merged.labels("symbol")) == ["ETH/USDT", "BTC/USDT", "BTC/USDT"]
+    assert list(merged.labels("side")) == ["sell", "sell", "buy"]
+
+
+def test_iter_trade_history_columns(api):
+    pytest.importorskip("numpy")
+
+    trades = [dict(TRADES[i % 3], id=str(i)) for i in range(25)]
+
+    def respond(request):
+        size = int(request["query"]["pageSize"][0])
+        page = int(request["query"]["pageNum"][0])
+        return 200, {"trades": trades[page * size:(page + 1) * size]}
+
+    api.add("GET", "trades", respond)
+    client = nexo.Client("key", "secret")
+    client.API_URL = api.url
+
+    pages = list(client.iter_trade_history(["BTC/USDT"], 0, 5000, page_size=10, columns=True))
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert list(Columns.concat(pages).id) == [t["id"] for t in trades]
+
+
+def test_numpy_required(monkeypatch):
+    monkeypatch.setattr(nexo.columns, "np", None)
+
+    with pytest.raises(ImportError):
+        trade_columns(TRADES)
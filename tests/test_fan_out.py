@@ -0,0 +1,134 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import threading
+import time
+from functools import partial
+
+import pytest
+
+import nexo
+from nexo.transport import TransportConfig
+
+
+def quote_responder():
+    # echoes the pair back as the price after a short delay
+    active = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def respond(request):
+        with lock:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        time.sleep(0.02)
+        with lock:
+            active["now"] -= 1
+        return 200, {"pair": request["query"]["pair"][0], "price": 1.0}
+
+    return respond, active
+
+
+def make_client(api, **kwargs):
+    client = nexo.Client("key", "secret", rate_limiter=nexo.RateLimiter(1000.0), **kwargs)
+    client.API_URL = api.url
+    return client
+
+
+PAIRS = [f"A{chr(65 + i)}C/USDT" for i in range(12)]
+
+
+def test_map_keeps_order_and_pool_size(api):
+    respond, active = quote_responder()
+    api.add("GET", "quote", respond)
+    client = make_client(api, transport=TransportConfig(pool_size=4))
+
+    try:
+        quotes = client.map(
+            client.get_price_quote,
+            [{"pair": pair, "amount": "1", "side": "buy"} for pair in PAIRS],
+        )
+    finally:
+        client.close_connection()
+
+    assert [quote["pair"] for quote in quotes] == PAIRS
+    assert 1 < active["max"] <= 4
+
+
+def test_gather_exceptions(api):
+    respond, _ = quote_responder()
+    api.add("GET", "quote", respond)
+    client = make_client(api)
+    calls = [
+        partial(client.get_price_quote, "BTC/USDT", "1", "buy"),
+        partial(client.get_price_quote, "BTC/USDT", "1", "tails"),
+        partial(client.get_price_quote, "ETH/USDT", "1", "sell"),
+    ]
+
+    try:
+        with pytest.raises(nexo.NexoRequestException, match="side = tails"):
+            client.gather(calls)
+
+        results = client.gather(calls, return_exceptions=True)
+    finally:
+        client.close_connection()
+
+    assert results[0]["pair"] == "BTC/USDT"
+    assert isinstance(results[1], nexo.NexoRequestException)
+    assert results[2]["pair"] == "ETH/USDT"
+
+
+def test_nested_gather_runs_inline(api):
+    respond, _ = quote_responder()
+    api.add("GET", "quote", respond)
+    client = make_client(api, transport=TransportConfig(pool_size=1))
+
+    def inner(pair):
+        return client.map(
+            client.get_price_quote, [(pair, "1", "buy"), (pair, "2", "buy")]
+        )
+
+    try:
+        results = client.map(inner, ["BTC/USDT", "ETH/USDT"])
+    finally:
+        client.close_connection()
+
+    assert [[quote["pair"] for quote in pair] for pair in results] == [
+        ["BTC/USDT", "BTC/USDT"],
+        ["ETH/USDT", "ETH/USDT"],
+    ]
+
+
+def test_pool_size_is_bounded(api):
+    respond, _ = quote_responder()
+    api.add("GET", "quote", respond)
+    client = make_client(api)
+
+    try:
+        client.map(client.get_price_quote, [("BTC/USDT", "1", "buy")])
+        assert client._executor._max_workers == nexo.Client.FAN_OUT_WORKERS
+    finally:
+        client.close_connection()
+
+
+def test_account_pool_shares_one_executor(api):
+    accounts = {"a": ("key-1", "secret"), "b": ("key-2", "secret")}
+    with nexo.AccountPool(accounts) as pool:
+        executors = {id(client._get_executor()) for client in pool.clients.values()}
+        assert executors == {id(pool._executor)}
+        # a shared executor survives the clients closing
+        pool["a"].close_connection()
+        assert pool["b"]._get_executor() is pool._executor
+
+
+def test_account_pool_fan_outs_stay_concurrent():
+    accounts = {"a": ("key-1", "secret"), "b": ("key-2", "secret")}
+    with nexo.AccountPool(accounts) as pool:
+        started = time.monotonic()
+        results = pool.each("gather", [lambda: time.sleep(0.2) or 1] * 5)
+        elapsed = time.monotonic() - started
+
+    assert results == {"a": [1] * 5, "b": [1] * 5}
+    # 2s when the calls of each account run one at a time
+    assert elapsed < 1.0
@@ -0,0 +1,143 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+from decimal import Decimal
+
+import pytest
+
+import nexo
+from nexo.fixed_point import PRICE, FixedPoint, Units
+from nexo.response_serializers import Balances, TradeHistory
+
+
+def test_parse():
+    fixed = FixedPoint(8)
+
+    assert fixed.parse("0.1") == 10_000_000
+    assert fixed.parse("20000") == 2_000_000_000_000
+    assert fixed.parse("-1.5") == -150_000_000
+    assert fixed.parse(".5") == 50_000_000
+    assert fixed.parse(0.1) == 10_000_000
+    assert fixed.parse(3) == 300_000_000
+    assert fixed.parse(Decimal("1.23")) == 123_000_000
+    assert fixed.parse("1e-8") == 1
+    assert fixed.parse(None) is None
+    assert fixed.parse("") is None
+    assert fixed.parse("  ") is None
+
+    with pytest.raises(ValueError):
+        fixed.parse("abc")
+    assert fixed.parse("abc", strict=False) is None
+
+
+def test_parse_never_rounds():
+    fixed = FixedPoint(2)
+
+    assert fixed.parse("0.120") == 12
+    assert fixed.parse("1.5e-1") == 15
+    with pytest.raises(ValueError):
+        fixed.parse("0.125")
+    # even for responses, which only forgive non-numbers
+    with pytest.raises(ValueError):
+        fixed.parse(0.001, strict=False)
+
+
+def test_pair_precision_and_format():
+    fixed = FixedPoint(8, {"BTC/USDT": (2, 6), "ETH/USDT": 4})
+
+    assert fixed.decimals_for("BTC/USDT", PRICE) == 2
+    assert fixed.decimals_for("BTC/USDT") == 6
+    assert fixed.decimals_for("ETH/USDT", PRICE) == fixed.decimals_for("ETH/USDT") == 4
+    assert fixed.decimals_for("XRP/USDT", PRICE) == 8
+    assert fixed.parse("20000.51", "BTC/USDT", kind=PRICE) == 2_000_051
+    assert fixed.format(2_000_051, "BTC/USDT", PRICE) == "20000.51"
+    assert fixed.parse("0.00123", "BTC/USDT") == 1_230
+    assert fixed.format(1_230, "BTC/USDT") == "0.00123"
+    assert fixed.format(-150_000_000) == "-1.5"
+    assert fixed.format(300_000_000) == "3"
+
+    # sums of units are exact, unlike floats
+    assert fixed.format(fixed.parse("0.1") + fixed.parse("0.2")) == "0.3"
+
+
+def test_to_number():
+    fixed = FixedPoint(8)
+
+    assert repr(fixed.to_number(fixed.parse("0.3"))) == "0.3"
+
+    with pytest.raises(nexo.NexoRequestException):
+        fixed.to_number(fixed.parse("12345678901.12345678"))
+
+
+def test_fixed_point_records():
+    fixed = FixedPoint(8, {"ETH/USDT": 4})
+    history = TradeHistory(
+        {
+            "trades": [
+                {"id": "1", "symbol": "ETH/USDT", "tradeAmount": "1.5", "executedPrice": "1500.25"},
+                {"id": "2", "symbol": "BTC/USDT", "tradeAmount": "0.001", "executedPrice": "20000"},
+            ]
+        },
+        fixed_point=fixed,
+    )
+
+    assert history.trades[0].trade_amount == 15_000
+    assert history.trades[0].executed_price == 15_002_500
+    assert history.trades[1].trade_amount == 100_000
+    assert history.trades[1].json_dictionary["executedPrice"] == "20000"
+
+    # prices and amounts of a pair are scaled separately
+    trade = {"id": "1", "symbol": "BTC/USDT", "tradeAmount": "0.00123", "executedPrice": "20000.51"}
+    record = TradeHistory(
+        {"trades": [trade]}, fixed_point=FixedPoint(8, {"BTC/USDT": (2, 8)})
+    ).trades[0]
+    assert (record.trade_amount, record.executed_price) == (123_000, 2_000_051)
+    assert record.json_dictionary == trade
+
+    # too precise for the scale fails instead of losing the amount
+    with pytest.raises(ValueError):
+        TradeHistory({"trades": [trade]}, fixed_point=FixedPoint(8, {"BTC/USDT": 2}))
+
+    balances = Balances(
+        {"balances": [{"assetName": "BTC", "totalBalance": "0.5"}]},
+        lazy=True,
+        fixed_point=fixed,
+    )
+    assert balances.balances[0].total_balance == 50_000_000
+    assert balances.balances[0].asset_name == "BTC"
+
+    # an empty or odd field does not fail the response
+    history = TradeHistory(
+        {"trades": [{"id": "1", "executedPrice": "", "tradeAmount": "n/a"}]},
+        fixed_point=fixed,
+    )
+    assert history.trades[0].executed_price is None
+    assert history.trades[0].trade_amount is None
+
+
+def test_place_order_with_units(api):
+    api.add("POST", "orders", (200, {"orderId": "abc"}))
+    client = nexo.Client("key", "secret", fixed_point=FixedPoint(8, {"BTC/USDT": (2, 8)}))
+    client.API_URL = api.url
+
+    client.place_order(
+        "BTC/USDT", "buy", "limit", Units(10_000_000), price=Units(2_000_051)
+    )
+    # plain integers are whole amounts, not units
+    client.place_order("BTC/USDT", "buy", "market", 1)
+
+    first, second = [call["body"] for call in api.calls("POST", "orders")]
+    assert first["quantity"] == 0.1
+    assert first["price"] == 20000.51
+    assert second["quantity"] == 1
+
+
+def test_units_need_fixed_point():
+    client = nexo.Client("key", "secret")
+
+    with pytest.raises(nexo.NexoRequestException, match="fixed_point"):
+        client.place_order("BTC/USDT", "buy", "market", Units(1))
+    with pytest.raises(TypeError):
+        Units("1")
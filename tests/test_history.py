@@ -0,0 +1,242 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+
+import nexo
+from nexo.history import HistoryShard, merge_records, split_window
+from nexo.response_serializers import OrderDetails, Trade
+
+
+def paged(key, records):
+    def respond(request):
+        size = int(request["query"]["pageSize"][0])
+        page = int(request["query"]["pageNum"][0])
+        return 200, {key: records[page * size:(page + 1) * size]}
+
+    return respond
+
+
+def make_trades(count):
+    return [
+        {
+            "id": str(i),
+            "symbol": "BTC/USDT",
+            "side": "buy",
+            "tradeAmount": "0.1",
+            "executedPrice": "20000",
+            "timestamp": 1000 + i,
+            "orderId": "o%d" % i,
+        }
+        for i in range(count)
+    ]
+
+
+def test_iter_trade_history(api):
+    trades = make_trades(25)
+    api.add("GET", "trades", paged("trades", trades))
+    client = nexo.Client("key", "secret")
+    client.API_URL = api.url
+
+    records = list(client.iter_trade_history(["BTC/USDT"], 0, 5000, page_size=10))
+
+    assert records == trades
+    assert len(api.calls("GET", "trades")) == 3
+
+
+def test_iter_stops_lazily(api):
+    api.add("GET", "trades", paged("trades", make_trades(100)))
+    client = nexo.Client("key", "secret")
+    client.API_URL = api.url
+
+    iterator = client.iter_trade_history(["BTC/USDT"], 0, 5000, page_size=10)
+    first = [next(iterator) for _ in range(5)]
+
+    assert [t["id"] for t in first] == ["0", "1", "2", "3", "4"]
+    assert len(api.calls("GET", "trades")) == 1
+
+
+def test_iter_order_history_serialized(api):
+    orders = [{"id": str(i), "pair": "BTC/USDT", "side": "sell"} for i in range(20)]
+    api.add("GET", "orders", paged("orders", orders))
+    client = nexo.Client("key", "secret")
+    client.API_URL = api.url
+
+    records = list(
+        client.iter_order_history(
+            ["BTC/USDT"], 0, 5000, page_size=10, serialize_json_to_object=True
+        )
+    )
+
+    assert len(records) == 20
+    assert all(isinstance(r, OrderDetails) for r in records)
+    # a full last page needs one more request to find out it was the last
+    assert len(api.calls("GET", "orders")) == 3
+
+
+def test_async_iter_trade_history(api):
+    trades = make_trades(35)
+    api.add("GET", "trades", paged("trades", trades))
+
+    async def main():
+        client = await nexo.AsyncClient.create("key", "secret")
+        client.API_URL = api.url
+        try:
+            return [
+                trade
+                async for trade in client.iter_trade_history(
+                    ["BTC/USDT"], 0, 5000, page_size=10, serialize_json_to_object=True
+                )
+            ]
+        finally:
+            await client.close_connection()
+
+    records = asyncio.run(main())
+
+    assert [r.id for r in records] == [t["id"] for t in trades]
+    assert all(isinstance(r, Trade) for r in records)
+    assert len(api.calls("GET", "trades")) == 4
+
+
+def test_async_iter_prefetches_next_page(api):
+    api.add("GET", "trades", paged("trades", make_trades(100)))
+
+    async def main():
+        client = await nexo.AsyncClient.create("key", "secret")
+        client.API_URL = api.url
+        iterator = client.iter_trade_history(["BTC/USDT"], 0, 5000, page_size=10)
+        try:
+            await iterator.__anext__()
+            # give the prefetch a chance to complete
+            await asyncio.sleep(0.2)
+            return len(api.calls("GET", "trades"))
+        finally:
+            await iterator.aclose()
+            await client.close_connection()
+
+    assert asyncio.run(main()) == 2
+
+
+def test_split_window():
+    assert split_window(0, 9, 5) == [(0, 4), (5, 9)]
+    assert split_window(0, 10, 5) == [(0, 4), (5, 9), (10, 10)]
+    assert split_window(5, 5, 100) == [(5, 5)]
+
+
+def test_shard_remaining():
+    shard = HistoryShard(["BTC/USDT"], 0, 1000)
+    # pages newest first stopped at 600, which may have more records
+    assert (shard.remaining(1000, 600).start_date, shard.remaining(1000, 600).end_date) == (0, 600)
+    # oldest first
+    assert (shard.remaining(0, 400).start_date, shard.remaining(0, 400).end_date) == (400, 1000)
+
+
+def test_merge_records():
+    first = [{"id": "b", "timestamp": 2}, {"id": "a", "timestamp": 1}]
+    second = [{"id": "c", "timestamp": 3}, {"id": "b", "timestamp": 2}]
+
+    merged = merge_records([first, second])
+    assert [r["id"] for r in merged] == ["a", "b", "c"]
+
+
+def windowed_trades(trades):
+    def respond(request):
+        query = request["query"]
+        start, end = int(query["startDate"][0]), int(query["endDate"][0])
+        pairs = query["pairs"]
+        size = int(query["pageSize"][0])
+        page = int(query["pageNum"][0])
+
+        matching = [
+            t for t in trades if start <= t["timestamp"] <= end and t["symbol"] in pairs
+        ]
+        # newest first, like the API
+        matching.sort(key=lambda t: t["timestamp"], reverse=True)
+        return 200, {"trades": matching[page * size:(page + 1) * size]}
+
+    return respond
+
+
+def test_download_trade_history(api):
+    trades = make_trades(300)
+    for i, trade in enumerate(trades):
+        trade["symbol"] = ["BTC/USDT", "ETH/USDT", "NEXO/USDT"][i % 3]
+        # a dense burst at the end of the range
+        trade["timestamp"] = i * 100 if i < 200 else 20_000 + i
+
+    api.add("GET", "trades", windowed_trades(trades))
+
+    async def main():
+        client = await nexo.AsyncClient.create(
+            "key", "secret", rate_limiter=nexo.RateLimiter(1000.0)
+        )
+        client.API_URL = api.url
+        try:
+            return await client.download_trade_history(
+                ["BTC/USDT", "ETH/USDT", "NEXO/USDT"],
+                0,
+                29_999,
+                shard_duration=10_000,
+                pairs_per_shard=2,
+                page_size=20,
+                max_pages_per_shard=1,
+                min_shard_duration=100,
+                serialize_json_to_object=True,
+            )
+        finally:
+            await client.close_connection()
+
+    records = asyncio.run(main())
+
+    assert sorted(r.id for r in records) == sorted(t["id"] for t in trades)
+    timestamps = [r.timestamp for r in records]
+    assert timestamps == sorted(timestamps)
+    # dense shards were split, so more requests than the 6 initial shards
+    assert len(api.calls("GET", "trades")) > 6
+
+
+def test_download_does_not_refetch_split_shards(api):
+    trades = make_trades(1000)
+    for i, trade in enumerate(trades):
+        trade["timestamp"] = i * 10
+    api.add("GET", "trades", windowed_trades(trades))
+
+    async def main():
+        client = await nexo.AsyncClient.create(
+            "key", "secret", rate_limiter=nexo.RateLimiter(1000.0)
+        )
+        client.API_URL = api.url
+        try:
+            return await client.download_trade_history(
+                ["BTC/USDT"],
+                0,
+                9_999,
+                shard_duration=10_000,
+                page_size=50,
+                max_pages_per_shard=2,
+                min_shard_duration=100,
+            )
+        finally:
+            await client.close_connection()
+
+    records = asyncio.run(main())
+
+    assert [r["id"] for r in records] == [t["id"] for t in trades]
+    # 20 full pages, plus a partial last page for some of the shards
+    assert len(api.calls("GET", "trades")) <= 30
+
+
+def test_get_trade_history_lazy(api):
+    api.add("GET", "trades", (200, {"trades": make_trades(50)}))
+    client = nexo.Client("key", "secret")
+    client.API_URL = api.url
+
+    history = client.get_trade_history(
+        ["BTC/USDT"], 0, 5000, 50, 0, serialize_json_to_object=True, lazy=True
+    )
+
+    assert len(history.trades) == 50
+    assert history.trades[49].order_id == "o49"
+    assert isinstance(history.trades[0], Trade)
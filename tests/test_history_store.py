@@ -0,0 +1,127 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+
+import nexo
+from nexo.history_store import ORDERS, TRADES, HistoryStore
+
+
+def windowed(key, pair_key, records):
+    # newest first and paged, like the API
+    def respond(request):
+        query = request["query"]
+        start, end = int(query["startDate"][0]), int(query["endDate"][0])
+        size = int(query["pageSize"][0])
+        page = int(query["pageNum"][0])
+
+        matching = [
+            r
+            for r in records
+            if start <= r["timestamp"] <= end and r[pair_key] in query["pairs"]
+        ]
+        matching.sort(key=lambda r: r["timestamp"], reverse=True)
+        return 200, {key: matching[page * size:(page + 1) * size]}
+
+    return respond
+
+
+def trade(i, pair="BTC/USDT"):
+    return {"id": "t%d" % i, "symbol": pair, "side": "buy", "tradeAmount": "1", "executedPrice": "2", "timestamp": 1000 + i}
+
+
+def test_store_queries():
+    with HistoryStore() as store:
+        store.add_trades([trade(1), trade(2), trade(3, "ETH/USDT")])
+        store.add_trades([dict(trade(2), tradeAmount="5")])
+
+        assert [t["id"] for t in store.trades()] == ["t3", "t2", "t1"]
+        assert [t["id"] for t in store.trades(["BTC/USDT"])] == ["t2", "t1"]
+        assert [t["id"] for t in store.trades(start_date=1002, end_date=1003)] == ["t3", "t2"]
+        assert store.trades(["BTC/USDT"], limit=1)[0]["tradeAmount"] == "5"
+
+        assert store.watermark(TRADES, "BTC/USDT") == (1002, "t2")
+        assert store.watermark(TRADES, "ETH/USDT") == (1003, "t3")
+        assert store.watermark(ORDERS, "BTC/USDT") is None
+
+
+def test_sync_trade_history_fetches_deltas(api):
+    trades = [trade(i) for i in range(30)]
+    api.add("GET", "trades", windowed("trades", "symbol", trades))
+    client = nexo.Client("key", "secret", rate_limiter=nexo.RateLimiter(1000.0))
+    client.API_URL = api.url
+    store = HistoryStore()
+
+    assert client.sync_trade_history(store, ["BTC/USDT"], end_date=5000, page_size=10) == 30
+    assert len(api.calls("GET", "trades")) == 4
+
+    trades += [trade(i) for i in range(30, 35)]
+    # only the watermark's millisecond and newer is fetched again
+    assert client.sync_trade_history(store, ["BTC/USDT"], end_date=5000, page_size=10) == 6
+    assert api.calls("GET", "trades")[-1]["query"]["startDate"] == ["1029"]
+
+    assert len(store.trades()) == 35
+    assert store.watermark(TRADES, "BTC/USDT") == (1034, "t34")
+
+
+def test_sync_order_history_refreshes_open_orders(api):
+    orders = [
+        {"id": "o1", "pair": "BTC/USDT", "side": "buy", "timestamp": 1000, "status": "open"},
+        {"id": "o2", "pair": "BTC/USDT", "side": "buy", "timestamp": 2000, "status": "completed"},
+    ]
+    api.add("GET", "orders", windowed("orders", "pair", orders))
+    client = nexo.Client("key", "secret", rate_limiter=nexo.RateLimiter(1000.0))
+    client.API_URL = api.url
+    store = HistoryStore()
+
+    client.sync_order_history(store, ["BTC/USDT"], end_date=5000)
+    orders[0]["status"] = "completed"
+    client.sync_order_history(store, ["BTC/USDT"], end_date=5000)
+
+    assert api.calls("GET", "orders")[-1]["query"]["startDate"] == ["1000"]
+    assert [o["status"] for o in store.orders()] == ["completed", "completed"]
+
+    # nothing is open any more, the next sync starts at the watermark
+    client.sync_order_history(store, ["BTC/USDT"], end_date=5000)
+    assert api.calls("GET", "orders")[-1]["query"]["startDate"] == ["2000"]
+
+
+def test_orders_without_status_are_final(api):
+    orders = [
+        {"id": "o1", "pair": "BTC/USDT", "side": "buy", "timestamp": 1000},
+        {"id": "o2", "pair": "BTC/USDT", "side": "sell", "timestamp": 2000},
+    ]
+    api.add("GET", "orders", windowed("orders", "pair", orders))
+    client = nexo.Client("key", "secret", rate_limiter=nexo.RateLimiter(1000.0))
+    client.API_URL = api.url
+    store = HistoryStore()
+
+    client.sync_order_history(store, ["BTC/USDT"], end_date=5000)
+    assert store.sync_start(ORDERS, "BTC/USDT", 0) == 2000
+
+    client.sync_order_history(store, ["BTC/USDT"], end_date=5000)
+    assert api.calls("GET", "orders")[-1]["query"]["startDate"] == ["2000"]
+
+
+def test_async_sync_trade_history(api):
+    trades = [trade(i, ["BTC/USDT", "ETH/USDT"][i % 2]) for i in range(20)]
+    api.add("GET", "trades", windowed("trades", "symbol", trades))
+    store = HistoryStore()
+
+    async def main():
+        client = await nexo.AsyncClient.create(
+            "key", "secret", rate_limiter=nexo.RateLimiter(1000.0)
+        )
+        client.API_URL = api.url
+        try:
+            return await client.sync_trade_history(
+                store, ["BTC/USDT", "ETH/USDT"], end_date=5000, page_size=5
+            )
+        finally:
+            await client.close_connection()
+
+    assert asyncio.run(main()) == 20
+    assert len(store.trades(["ETH/USDT"])) == 10
+    assert store.watermark(TRADES, "ETH/USDT") == (1019, "t19")
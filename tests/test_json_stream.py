@@ -0,0 +1,141 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+import json
+import random
+
+import pytest
+
+import nexo
+from nexo.json_stream import JSONArrayStream
+from nexo.response_serializers import Trade
+
+
+def feed_in_chunks(parser, raw, sizes):
+    records = []
+    position = 0
+    while position < len(raw):
+        size = sizes()
+        records += parser.feed(raw[position:position + size])
+        position += size
+    return records
+
+
+def test_parses_array_across_chunks():
+    document = {
+        "meta": {"nested": [1, {"text": "]"}]},
+        "trades": [
+            {"id": str(i), "text": 'q"uo\\te}[', "values": [1, {"x": "}"}], "é": "ü"}
+            for i in range(100)
+        ],
+        "after": {"key": "value"},
+    }
+    raw = json.dumps(document, ensure_ascii=False).encode()
+    rng = random.Random(0)
+
+    for _ in range(50):
+        parser = JSONArrayStream("trades")
+        assert feed_in_chunks(parser, raw, lambda: rng.randint(1, 40)) == document["trades"]
+        assert parser.close() == {"meta": document["meta"], "trades": [], "after": {"key": "value"}}
+
+
+def test_records_are_yielded_before_the_end():
+    parser = JSONArrayStream("orders")
+
+    assert parser.feed(b'{"orders": [{"id": "1"}, {"id"') == [{"id": "1"}]
+    assert parser.feed(b': "2"}') == [{"id": "2"}]
+    assert parser.feed(b"]}") == []
+    assert parser.close() == {"orders": []}
+
+
+def test_document_without_the_array():
+    parser = JSONArrayStream("trades")
+    parser.feed(b'{"errorCode": 301, ')
+    parser.feed(b'"errorMessage": "Rate limit exceeded."}')
+
+    assert parser.close() == {"errorCode": 301, "errorMessage": "Rate limit exceeded."}
+
+
+def test_truncated_document():
+    parser = JSONArrayStream("trades")
+    parser.feed(b'{"trades": [{"id": "1"}')
+
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+def paged(records):
+    def respond(request):
+        size = int(request["query"]["pageSize"][0])
+        page = int(request["query"]["pageNum"][0])
+        return 200, {"trades": records[page * size:(page + 1) * size]}
+
+    return respond
+
+
+def test_stream_trade_history(api):
+    trades = [{"id": str(i), "symbol": "BTC/USDT", "timestamp": i} for i in range(25)]
+    api.add("GET", "trades", paged(trades))
+    client = nexo.Client("key", "secret")
+    client.API_URL = api.url
+
+    records = list(
+        client.iter_trade_history(
+            ["BTC/USDT"], 0, 5000, page_size=10, stream=True, serialize_json_to_object=True
+        )
+    )
+
+    assert [r.id for r in records] == [t["id"] for t in trades]
+    assert all(isinstance(r, Trade) for r in records)
+    assert len(api.calls("GET", "trades")) == 3
+
+
+def test_stream_error_body(api):
+    api.add("GET", "orders", (200, {"errorCode": 103, "errorMessage": "Unauthorized."}))
+    client = nexo.Client("key", "secret")
+    client.API_URL = api.url
+
+    with pytest.raises(nexo.NexoAPIException) as e:
+        list(client.iter_order_history(["BTC/USDT"], 0, 5000, stream=True))
+    assert e.value.code == 103
+
+
+def test_async_stream_trade_history(api):
+    trades = [{"id": str(i), "symbol": "BTC/USDT", "timestamp": i} for i in range(15)]
+    api.add("GET", "trades", paged(trades))
+
+    async def main():
+        client = await nexo.AsyncClient.create("key", "secret")
+        client.API_URL = api.url
+        try:
+            return [
+                trade
+                async for trade in client.iter_trade_history(
+                    ["BTC/USDT"], 0, 5000, page_size=10, stream=True
+                )
+            ]
+        finally:
+            await client.close_connection()
+
+    assert asyncio.run(main()) == trades
+    assert len(api.calls("GET", "trades")) == 2
+
+
+def test_async_stream_rate_limited(api):
+    api.add("GET", "trades", (429, {"errorCode": 301, "errorMessage": "Rate limit exceeded."}))
+
+    async def main():
+        client = await nexo.AsyncClient.create("key", "secret")
+        client.API_URL = api.url
+        try:
+            with pytest.raises(nexo.NexoAPIException):
+                async for _ in client.iter_trade_history(["BTC/USDT"], 0, 5000, stream=True):
+                    pass
+            return client.rate_limiter.rate_limited_count
+        finally:
+            await client.close_connection()
+
+    assert asyncio.run(main()) == 1
@@ -0,0 +1,198 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+
+import pytest
+
+import nexo
+from nexo.coalescing import SingleFlight
+from nexo.kill_switch import POSITIONS, open_orders_by_pair
+from nexo.scheduler import URGENT, RequestScheduler
+
+PAIRS = ["BTC/USDT", "ETH/USDT", "SOL/USDT"]
+
+
+def cancel_responder(request):
+    if request["body"]["pair"] == "SOL/USDT":
+        return 400, {"errorCode": 102, "errorMessage": "Some request field is malformed or missing."}
+    return 200, {}
+
+
+def stub_exchange(api):
+    api.add("POST", "orders/cancel/all", cancel_responder)
+    api.add("POST", "futures/close-all-positions", (200, {}))
+    api.add(
+        "GET",
+        "orders",
+        (
+            200,
+            {
+                "orders": [
+                    {"id": "1", "pair": "BTC/USDT", "status": "cancelled"},
+                    {"id": "2", "pair": "ETH/USDT", "status": "open"},
+                ]
+            },
+        ),
+    )
+    api.add("GET", "futures/positions", (200, {"positions": []}))
+
+
+def check_report(api, report):
+    assert set(report.outcomes) == set(PAIRS) | {POSITIONS}
+    assert report["BTC/USDT"].ok and report[POSITIONS].ok
+    assert report["ETH/USDT"].remaining == 1
+    assert isinstance(report["SOL/USDT"].error, nexo.NexoAPIException)
+    assert report.flat is False
+    assert {outcome.target for outcome in report.failed} == {"ETH/USDT", "SOL/USDT"}
+    assert 0 < report.elapsed <= report.verified
+    assert all(0 < outcome.elapsed <= report.elapsed for outcome in report.outcomes.values())
+
+    cancelled = {call["body"]["pair"] for call in api.calls("POST", "orders/cancel/all")}
+    assert cancelled == set(PAIRS)
+    assert len(api.calls("POST", "futures/close-all-positions")) == 1
+    assert api.calls("GET", "futures/positions")[0]["query"]["status"] == ["active"]
+
+
+def test_open_orders_by_pair():
+    orders_json = {
+        "orders": [
+            {"pair": "BTC/USDT", "status": "open"},
+            {"pair": "BTC/USDT", "status": "filled"},
+            {"pair": "BTC/USDT"},
+            {"pair": "ETH/USDT", "status": "Partially_Filled"},
+            {"pair": "SOL/USDT"},
+            {"pair": "SOL/USDT", "status": "weird"},
+            {"pair": "XRP/USDT", "status": "open"},
+        ]
+    }
+    assert open_orders_by_pair(orders_json, ["BTC/USDT", "ETH/USDT", "SOL/USDT", "ADA/USDT"]) == {
+        "BTC/USDT": 1,
+        "ETH/USDT": 1,
+        "SOL/USDT": None,
+        "ADA/USDT": 0,
+    }
+
+
+def test_kill_switch(api):
+    stub_exchange(api)
+    client = nexo.Client("key", "secret", rate_limiter=nexo.RateLimiter(1000.0))
+    client.API_URL = api.url
+
+    with pytest.raises(nexo.NexoRequestException):
+        nexo.KillSwitch(client, ["BTCUSDT"])
+
+    switch = nexo.KillSwitch(client, PAIRS)
+    assert switch.connections == 4
+    try:
+        switch.warm_up()
+        report = switch.fire()
+    finally:
+        client.close_connection()
+
+    check_report(api, report)
+
+
+def test_async_kill_switch(api):
+    stub_exchange(api)
+
+    async def main():
+        client = await nexo.AsyncClient.create(
+            "key", "secret", rate_limiter=nexo.RateLimiter(1000.0)
+        )
+        client.API_URL = api.url
+        try:
+            await nexo.AsyncKillSwitch(client, PAIRS).warm_up()
+            return await client.kill_switch(PAIRS)
+        finally:
+            await client.close_connection()
+
+    check_report(api, asyncio.run(main()))
+
+
+def test_kill_switch_without_verification(api):
+    stub_exchange(api)
+    client = nexo.Client("key", "secret", rate_limiter=nexo.RateLimiter(1000.0))
+    client.API_URL = api.url
+
+    report = client.kill_switch(["BTC/USDT"], close_positions=False, verify=False)
+
+    assert list(report.outcomes) == ["BTC/USDT"]
+    # nothing was checked, so the switch is not known to be flat
+    assert report.flat is None and report.verified is None
+    assert report["BTC/USDT"].ok is None and not report.failed
+    assert api.calls("GET", "orders") == []
+
+
+def test_kill_switch_pages_and_unverified_pairs(api):
+    orders = [{"id": str(i), "pair": "BTC/USDT"} for i in range(5)]
+    orders.append({"id": "5", "pair": "ETH/USDT", "status": "cancelled"})
+
+    def paged(request):
+        size = int(request["query"]["pageSize"][0])
+        page = int(request["query"]["pageNum"][0])
+        return 200, {"orders": orders[page * size:(page + 1) * size]}
+
+    api.add("POST", "orders/cancel/all", (200, {}))
+    api.add("GET", "orders", paged)
+    client = nexo.Client("key", "secret", rate_limiter=nexo.RateLimiter(1000.0))
+    client.API_URL = api.url
+
+    switch = nexo.KillSwitch(
+        client, ["BTC/USDT", "ETH/USDT"], close_positions=False, verify_page_size=2
+    )
+    report = switch.fire()
+
+    assert [call["query"]["pageNum"] for call in api.calls("GET", "orders")] == [
+        ["0"], ["1"], ["2"], ["3"]
+    ]
+    # orders without a status leave the pair unverified, not failed
+    assert report["BTC/USDT"].remaining is None
+    assert report["BTC/USDT"].verified is None
+    assert report["ETH/USDT"].remaining == 0
+    assert report["BTC/USDT"].ok is None and report["ETH/USDT"].ok
+    assert [outcome.target for outcome in report.unverified] == ["BTC/USDT"]
+    assert report.flat is None
+
+
+def test_checks_are_not_answered_from_fresh_results(api):
+    stub_exchange(api)
+    client = nexo.Client(
+        "key",
+        "secret",
+        rate_limiter=nexo.RateLimiter(1000.0),
+        single_flight=SingleFlight(freshness=60.0),
+    )
+    client.API_URL = api.url
+
+    nexo.KillSwitch(client, ["BTC/USDT"]).fire()
+    nexo.KillSwitch(client, ["BTC/USDT"]).fire()
+    assert len(api.calls("GET", "orders")) == 2
+    assert len(api.calls("GET", "futures/positions")) == 2
+
+
+def test_async_checks_are_urgent(api):
+    stub_exchange(api)
+    priorities = []
+
+    class RecordingScheduler(RequestScheduler):
+        async def acquire(self, path, method="get", priority=None):
+            priorities.append((method, path, priority))
+            await super().acquire(path, method, priority)
+
+    async def main():
+        limiter = nexo.RateLimiter(1000.0)
+        client = await nexo.AsyncClient.create(
+            "key", "secret", rate_limiter=limiter, scheduler=RecordingScheduler(limiter)
+        )
+        client.API_URL = api.url
+        try:
+            return await client.kill_switch(["BTC/USDT"])
+        finally:
+            await client.close_connection()
+
+    asyncio.run(main())
+    assert ("get", "orders", URGENT) in priorities
+    assert ("get", "futures/positions", URGENT) in priorities
@@ -0,0 +1,103 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+import threading
+import time
+from email.utils import formatdate
+
+import nexo
+from nexo.nonce import NonceGenerator
+
+
+def test_strictly_increasing():
+    generator = NonceGenerator()
+    nonces = [generator.next() for _ in range(1000)]
+
+    assert all(b > a for a, b in zip(nonces, nonces[1:]))
+    assert generator.stats()["issued"] == 1000
+    # far more than one nonce per millisecond
+    assert generator.stats()["bumped"] > 0
+
+
+def test_unique_across_threads():
+    generator = NonceGenerator()
+    results = []
+
+    def worker():
+        local = [generator.next() for _ in range(500)]
+        results.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 4000
+    assert len(set(results)) == 4000
+
+
+def test_unique_across_tasks():
+    generator = NonceGenerator()
+
+    async def sign():
+        await asyncio.sleep(0)
+        return generator.next()
+
+    async def main():
+        return await asyncio.gather(*[sign() for _ in range(300)])
+
+    nonces = asyncio.run(main())
+    assert len(set(nonces)) == 300
+
+
+def test_offset_never_makes_nonce_go_back():
+    generator = NonceGenerator()
+    first = generator.next()
+
+    generator.offset = -60_000
+    assert generator.next() > first
+
+
+def test_observe_date_header():
+    generator = NonceGenerator()
+
+    # server runs one minute ahead of us
+    now = time.monotonic()
+    server_ms = generator.local_time(now) + 60_000
+    header = formatdate(server_ms / 1000, usegmt=True)
+
+    generator.observe(header, now - 0.05, now)
+
+    stats = generator.stats()
+    assert stats["samples"] == 1
+    assert stats["adjustments"] == 1
+    assert 58_900 < stats["offset"] < 60_100
+    assert generator.next() >= int(generator.local_time() + 58_900)
+
+    # a consistent observation does not move the offset again
+    offset = generator.offset
+    generator.observe(header, now - 0.05, now)
+    assert generator.offset == offset
+    assert generator.stats()["adjustments"] == 1
+
+
+def test_observe_invalid_header():
+    generator = NonceGenerator()
+    generator.observe(None, 0.0, 0.0)
+    generator.observe("not a date", 0.0, 0.0)
+
+    assert generator.stats()["samples"] == 0
+
+
+def test_client_timestamp_offset():
+    shared = NonceGenerator()
+    client = nexo.Client("key", "secret", nonce_generator=shared)
+
+    client.timestamp_offset = 1500
+    assert shared.offset == 1500
+    assert client.get_clock_stats()["offset"] == 1500
+    assert int(client._generate_nonce()) > 0
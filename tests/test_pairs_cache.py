@@ -0,0 +1,116 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+import time
+
+import pytest
+
+import nexo
+from nexo.pairs_cache import PairsCache
+from nexo.response_serializers import Pairs
+
+PAIRS_JSON = {
+    "pairs": ["BTC/USDT", "MKR/BTC"],
+    "minLimits": {"BTC/USDT": 0.001, "MKR_BTC": 0.002},
+    "maxLimits": {"BTC/USDT": 50, "MKR_BTC": 42.4},
+}
+
+
+def test_validate():
+    cache = PairsCache()
+    # nothing is rejected before the metadata is known
+    cache.validate("DOGE/USDT", 1)
+
+    cache.update(Pairs(PAIRS_JSON))
+    cache.validate("BTC/USDT", "0.5")
+    cache.validate("MKR/BTC", 0.002)
+    cache.validate("BTC/USDT", None)
+
+    with pytest.raises(nexo.NexoRequestException) as e:
+        cache.validate("DOGE/USDT", 1)
+    assert "pair is not listed" in e.value.message
+
+    with pytest.raises(nexo.NexoRequestException) as e:
+        cache.validate("MKR/BTC", 50, "place a twap order")
+    assert e.value.message == (
+        "Bad Request: Tried to place a twap order with quantity = 50, must be between 0.002 and 42.4 for MKR/BTC"
+    )
+
+
+def test_expiry_and_refresh_claim():
+    cache = PairsCache(ttl=0.05)
+    assert cache.is_expired
+    cache.update(PAIRS_JSON)
+    assert not cache.is_expired
+    assert not cache.begin_refresh()
+
+    time.sleep(0.06)
+    assert cache.is_expired
+    assert cache.begin_refresh()
+    # only one refresh at a time
+    assert not cache.begin_refresh()
+
+    cache.update(PAIRS_JSON)
+    assert not cache.is_expired
+
+
+def test_order_rejected_locally(api):
+    api.add("GET", "pairs", (200, PAIRS_JSON))
+    api.add("POST", "orders", (200, {"orderId": "1"}))
+    client = nexo.Client("key", "secret", pairs_cache=PairsCache())
+    client.API_URL = api.url
+
+    with pytest.raises(nexo.NexoRequestException):
+        client.place_order("DOGE/USDT", "buy", "market", "10")
+    with pytest.raises(nexo.NexoRequestException):
+        client.place_trigger_order("BTC/USDT", "buy", "stopLoss", "100", "10")
+
+    assert client.place_order("BTC/USDT", "buy", "market", "1") == {"orderId": "1"}
+
+    assert len(api.calls("GET", "pairs")) == 1
+    assert len(api.calls("POST", "orders")) == 1
+
+
+def test_expired_metadata_refreshed_in_background(api):
+    api.add("GET", "pairs", (200, PAIRS_JSON))
+    api.add("GET", "quote", (200, {"price": "1"}))
+    cache = PairsCache(ttl=0.05)
+    client = nexo.Client("key", "secret", pairs_cache=cache)
+    client.API_URL = api.url
+
+    client.get_price_quote("BTC/USDT", 1, "buy")
+    time.sleep(0.06)
+    client.get_price_quote("BTC/USDT", 1, "buy")
+
+    deadline = time.monotonic() + 2
+    while len(api.calls("GET", "pairs")) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(api.calls("GET", "pairs")) == 2
+
+
+def test_metadata_unavailable(api):
+    api.add("GET", "pairs", (500, {"errorCode": 103, "errorMessage": "Unauthorized"}))
+    api.add("POST", "orders", (200, {"orderId": "1"}))
+    client = nexo.Client("key", "secret", pairs_cache=PairsCache())
+    client.API_URL = api.url
+
+    assert client.place_order("DOGE/USDT", "buy", "market", "10") == {"orderId": "1"}
+
+
+def test_async_order_rejected_locally(api):
+    api.add("GET", "pairs", (200, PAIRS_JSON))
+
+    async def main():
+        client = await nexo.AsyncClient.create("key", "secret", pairs_cache=PairsCache())
+        client.API_URL = api.url
+        try:
+            with pytest.raises(nexo.NexoRequestException):
+                await client.place_advanced_order("BTC/USDT", "buy", "0.0001", "1", "2")
+        finally:
+            await client.close_connection()
+
+    asyncio.run(main())
+    assert api.calls("POST", "orders") == []
@@ -0,0 +1,88 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+import threading
+import time
+
+import nexo
+from nexo.response_serializers import OrderResponse
+
+REJECTED = (400, {"errorCode": 102, "errorMessage": "Some request field is malformed or missing."})
+
+
+def order_responder():
+    # answers with the quantity as order id, refuses quantity 13
+    active = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def respond(request):
+        with lock:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        time.sleep(0.02)
+        with lock:
+            active["now"] -= 1
+
+        if request["body"]["quantity"] == "13":
+            return REJECTED
+        return 200, {"orderId": request["body"]["quantity"]}
+
+    return respond, active
+
+
+def intents():
+    batch = [
+        {"pair": "BTC/USDT", "side": "buy", "type": "market", "quantity": str(i)}
+        for i in range(1, 21)
+    ]
+    batch[4]["side"] = "tails"
+    return batch
+
+
+def check_results(results):
+    assert len(results) == 20
+    assert isinstance(results[4], nexo.NexoRequestException)
+    assert "side = tails" in results[4].message
+    assert isinstance(results[12], nexo.NexoAPIException)
+
+    for i, result in enumerate(results):
+        if i not in (4, 12):
+            assert isinstance(result, OrderResponse)
+            assert result.order_id == str(i + 1)
+
+
+def test_place_orders(api):
+    respond, active = order_responder()
+    api.add("POST", "orders", respond)
+    client = nexo.Client("key", "secret", rate_limiter=nexo.RateLimiter(1000.0))
+    client.API_URL = api.url
+
+    results = client.place_orders(intents(), max_concurrency=4, serialize_json_to_object=True)
+
+    check_results(results)
+    assert len(api.calls("POST", "orders")) == 19
+    assert 1 < active["max"] <= 4
+
+
+def test_async_place_orders(api):
+    respond, active = order_responder()
+    api.add("POST", "orders", respond)
+
+    async def main():
+        client = await nexo.AsyncClient.create(
+            "key", "secret", rate_limiter=nexo.RateLimiter(1000.0)
+        )
+        client.API_URL = api.url
+        try:
+            return await client.place_orders(
+                intents(), max_concurrency=5, serialize_json_to_object=True
+            )
+        finally:
+            await client.close_connection()
+
+    check_results(asyncio.run(main()))
+    assert len(api.calls("POST", "orders")) == 19
+    assert 1 < active["max"] <= 5
@@ -0,0 +1,100 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+import base64
+import hashlib
+import hmac
+
+import pytest
+
+import nexo
+from nexo.exceptions import NexoRequestException
+
+
+def expected_signature(secret, nonce):
+    return base64.b64encode(
+        hmac.new(secret.encode(), nonce.encode(), hashlib.sha256).digest()
+    )
+
+
+def test_signature_from_prekeyed_state():
+    client = nexo.Client("key", "secret")
+    assert client._generate_signature("123") == expected_signature("secret", "123")
+    # the keyed state is copied, not consumed
+    assert client._generate_signature("456") == expected_signature("secret", "456")
+
+    client.API_SECRET = "other"
+    assert client._generate_signature("123") == expected_signature("other", "123")
+
+
+def test_prepare_get_and_post():
+    client = nexo.Client("key", "secret")
+
+    get = client._prepare("get", "orders", data={"pairs": ["BTC/USDT"], "pageNum": 0})
+    assert get.uri == "https://pro-api.nexo.io/api/v1/orders"
+    assert get.params == {"pairs": ["BTC/USDT"], "pageNum": 0}
+    assert get.body is None
+    assert get.key is not None
+
+    post = client._prepare("post", "orders", data={"pair": "BTC/USDT"})
+    assert post.params is None and post.key is None
+    assert post.body == b'{"pair":"BTC/USDT"}'
+
+    # static headers are copied per request
+    client._sign(post)
+    assert set(post.headers) == {"X-API-KEY", "X-NONCE", "X-SIGNATURE"}
+    assert client._static_headers == {"X-API-KEY": "key"}
+    assert post.headers["X-SIGNATURE"] == expected_signature(
+        "secret", post.headers["X-NONCE"]
+    ).decode()
+
+    client.API_URL = "http://localhost:1"
+    client.API_KEY = "other"
+    moved = client._prepare("post", "orders")
+    assert moved.uri == "http://localhost:1/api/v1/orders"
+    assert moved.headers == {"X-API-KEY": "other"}
+    assert moved.body is None
+
+
+def test_sync_and_async_prepare_the_same_request():
+    async def main():
+        client = await nexo.AsyncClient.create("key", "secret")
+        try:
+            return client._prepare("post", "orders/cancel", data={"orderId": "1"})
+        finally:
+            await client.close_connection()
+
+    prepared = nexo.Client("key", "secret")._prepare(
+        "post", "orders/cancel", data={"orderId": "1"}
+    )
+    other = asyncio.run(main())
+    assert [getattr(prepared, name) for name in prepared.__slots__] == [
+        getattr(other, name) for name in other.__slots__
+    ]
+
+
+def test_endpoint_builders():
+    client = nexo.Client("key", "secret")
+
+    order = client._build_place_order("BTC/USDT", "buy", "limit", "1.5", "100")
+    assert (order.method, order.path) == ("post", "orders")
+    assert order.data == {
+        "pair": "BTC/USDT",
+        "side": "buy",
+        "type": "limit",
+        "quantity": "1.5",
+        "price": "100",
+    }
+    assert order.limits == ("BTC/USDT", "1.5", "place an order", "quantity")
+
+    cancel = client._build_cancel_all_orders("BTC/USDT")
+    assert cancel.body == b'{"pair":"BTC/USDT"}' and cancel.limits is None
+
+    # arguments are validated before anything is sent
+    with pytest.raises(NexoRequestException):
+        client._build_place_order("BTC/USDT", "hold", "limit", "1.5")
+    with pytest.raises(NexoRequestException):
+        client._build_get_future_positions("closed")
@@ -0,0 +1,94 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+import time
+
+from nexo.rate_limiter import RateLimiter, TokenBucket
+
+
+def test_bucket_delay():
+    bucket = TokenBucket(rate=10.0, capacity=2.0)
+    assert bucket.delay_for(1) == 0.0
+
+    bucket.consume(2)
+    assert bucket.delay_for(1) == 0.1
+
+    # weights above capacity are clamped instead of blocking forever
+    assert bucket.delay_for(5) == 0.2
+
+
+def test_burst_then_wait():
+    limiter = RateLimiter(rate=50.0, burst=3)
+
+    for _ in range(3):
+        assert limiter.try_acquire("quote") == 0.0
+
+    assert limiter.try_acquire("quote") > 0.0
+
+    start = time.monotonic()
+    limiter.acquire("quote")
+    assert time.monotonic() - start >= 0.01
+
+
+def test_endpoint_bucket_and_weights():
+    limiter = RateLimiter(
+        rate=1.0,
+        burst=100.0,
+        endpoint_limits={"POST orders": (1.0, 1.0)},
+        weights={"trades": 5},
+    )
+
+    assert limiter.try_acquire("orders", "post") == 0.0
+    assert limiter.try_acquire("orders", "post") > 0.0
+    # GET orders is not covered by the POST bucket
+    assert limiter.try_acquire("orders", "get") == 0.0
+
+    before = limiter.bucket.tokens
+    assert limiter.try_acquire("trades") == 0.0
+    assert before - limiter.bucket.tokens > 4.9
+
+
+def test_adaptive_rate():
+    limiter = RateLimiter(rate=10.0, cooldown=0.0, recovery_step=0.5)
+
+    limiter.on_rate_limited("quote")
+    assert limiter.rate == 5.0
+    assert limiter.rate_limited_count == 1
+
+    limiter.on_success("quote")
+    assert limiter.rate == 10.0
+
+    limiter.on_success("quote")
+    assert limiter.rate == 10.0
+
+
+def test_adaptive_rate_floor_and_cooldown():
+    limiter = RateLimiter(rate=10.0, min_rate_ratio=0.2, cooldown=60.0)
+
+    limiter.on_rate_limited("quote")
+    limiter.on_rate_limited("quote")
+    # the second 301 falls in the cooldown window
+    assert limiter.rate == 5.0
+    assert limiter.rate_limited_count == 2
+
+    limiter.on_success("quote")
+    assert limiter.rate == 5.0
+
+    limiter = RateLimiter(rate=10.0, min_rate_ratio=0.2, cooldown=0.0)
+    for _ in range(10):
+        limiter.on_rate_limited("quote")
+    assert limiter.rate == 2.0
+
+
+def test_async_acquire():
+    limiter = RateLimiter(rate=100.0, burst=5)
+
+    async def main():
+        await asyncio.gather(*[limiter.acquire_async("quote") for _ in range(10)])
+
+    start = time.monotonic()
+    asyncio.run(main())
+    assert time.monotonic() - start >= 0.04
@@ -0,0 +1,77 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+
+import pytest
+
+import nexo
+from nexo.retry import RetryPolicy
+
+
+def run(api, scenario, **kwargs):
+    async def main():
+        client = await nexo.AsyncClient.create(
+            "key",
+            "secret",
+            rate_limiter=nexo.RateLimiter(1000.0),
+            retry_policy=RetryPolicy(base_delay=0.001, max_delay=0.01),
+            **kwargs,
+        )
+        client.API_URL = api.url
+        try:
+            return await scenario(client)
+        finally:
+            await client.close_connection()
+
+    return asyncio.run(main())
+
+
+def test_request_returns_metadata(api):
+    api.add("GET", "accountSummary", (502, b"Bad gateway"), (200, {"balances": []}))
+
+    async def scenario(client):
+        result = await client.request("GET", "accountSummary")
+        assert not hasattr(client, "response")
+        return result
+
+    result = run(api, scenario)
+    assert isinstance(result, nexo.RequestResult)
+    assert result.json == {"balances": []}
+    assert result.status == 200
+    assert result.attempts == 2
+    assert result.elapsed >= 0
+    assert "application/json" in result.headers["content-type"]
+
+
+def test_debug_history_is_bounded(api):
+    api.add(
+        "GET",
+        "accountSummary",
+        (200, {"balances": []}),
+        (200, {"balances": []}),
+        (200, {"balances": []}),
+    )
+    api.add("GET", "pairs", (400, {"errorCode": 100, "errorMessage": "API-key is malformed or invalid"}))
+
+    async def scenario(client):
+        for _ in range(3):
+            await client.get_account_balances()
+        with pytest.raises(nexo.NexoAPIException):
+            await client.get_pairs()
+        return client.debug_history
+
+    history = run(api, scenario, debug_history=2)
+    assert [(r.path, r.status) for r in history] == [("accountSummary", 200), ("pairs", 400)]
+
+
+def test_no_debug_history_by_default(api):
+    api.add("GET", "accountSummary", (200, {"balances": []}))
+
+    async def scenario(client):
+        await client.get_account_balances()
+        return client.debug_history
+
+    assert run(api, scenario) is None
@@ -0,0 +1,217 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+import time
+
+import pytest
+
+import nexo
+from nexo.coalescing import SingleFlight
+from nexo.retry import (
+    AMBIGUOUS,
+    NOT_EXECUTED,
+    RETRY,
+    VERIFY,
+    RetryBudget,
+    RetryPolicy,
+    classify_error,
+    match_placed_order,
+)
+
+INTERNAL_ERROR = (500, {"errorCode": 206, "errorMessage": "Internal error"})
+
+
+def fast_policy(**kwargs):
+    return RetryPolicy(base_delay=0.001, max_delay=0.01, verify_delay=0.001, **kwargs)
+
+
+def make_client(api, **kwargs):
+    client = nexo.Client("key", "secret", retry_policy=fast_policy(**kwargs))
+    client.API_URL = api.url
+    return client
+
+
+def test_classify_error():
+    assert classify_error(nexo.NexoAPIException(301, '{"errorCode": 301, "errorMessage": ""}')) == NOT_EXECUTED
+    assert classify_error(nexo.NexoAPIException(206, '{"errorCode": 206, "errorMessage": ""}')) == AMBIGUOUS
+    assert classify_error(nexo.NexoAPIException(100, '{"errorCode": 100, "errorMessage": ""}')) is None
+    assert classify_error(nexo.NexoRequestException("", 503)) == AMBIGUOUS
+    assert classify_error(nexo.NexoRequestException("", 400)) is None
+    assert classify_error(asyncio.TimeoutError()) == AMBIGUOUS
+    assert classify_error(ValueError()) is None
+
+
+def test_policy_actions():
+    policy = fast_policy(max_attempts=3)
+    ambiguous = nexo.NexoRequestException("", 502)
+    rejected = nexo.NexoAPIException(301, '{"errorCode": 301, "errorMessage": ""}')
+
+    assert policy.action("get", "trades", ambiguous, 1) == RETRY
+    assert policy.action("post", "orders/cancel", ambiguous, 1) == RETRY
+    assert policy.action("post", "orders", ambiguous, 1) == VERIFY
+    assert policy.action("post", "orders", rejected, 1) == RETRY
+    assert policy.action("post", "orders/twap", ambiguous, 1) is None
+    assert policy.action("get", "trades", ambiguous, 3) is None
+    # the history is read even with no attempt or budget left
+    assert policy.action("post", "orders", ambiguous, 3) == VERIFY
+    broke = fast_policy(budget=RetryBudget(min_per_second=0.0, max_tokens=0.0))
+    assert broke.action("post", "orders", ambiguous, 1) == VERIFY
+    assert broke.action("post", "orders", rejected, 1) is None
+
+
+def test_backoff_bounds():
+    policy = RetryPolicy(base_delay=0.1, max_delay=1.0)
+    delay = 0.0
+    for _ in range(50):
+        delay = policy.backoff(delay)
+        assert 0.1 <= delay <= 1.0
+
+
+def test_budget():
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0, max_tokens=2.0)
+    assert budget.withdraw()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+def test_match_placed_order():
+    orders = {
+        "orders": [
+            {"id": "1", "pair": "BTC/USDT", "side": "buy", "quantity": "0.5", "timestamp": 1000},
+            {"id": "2", "pair": "BTC/USDT", "side": "buy", "quantity": "1.0", "timestamp": 20000},
+        ]
+    }
+    data = {"pair": "BTC/USDT", "side": "buy", "quantity": 1}
+
+    assert match_placed_order(orders, data, 20000) == "2"
+    assert match_placed_order(orders, dict(data, side="sell"), 20000) is None
+    assert match_placed_order(orders, dict(data, quantity="0.5"), 60000) is None
+    # an identical order created before this one was sent is someone else's
+    assert match_placed_order(orders, data, 20001) is None
+
+
+def test_get_is_retried(api):
+    api.add("GET", "pairs", INTERNAL_ERROR, (200, {"pairs": ["BTC/USDT"]}))
+    client = make_client(api)
+
+    assert client.get_pairs() == {"pairs": ["BTC/USDT"]}
+    assert len(api.calls("GET", "pairs")) == 2
+
+
+def test_get_gives_up(api):
+    api.add("GET", "pairs", INTERNAL_ERROR)
+    client = make_client(api, max_attempts=2)
+
+    with pytest.raises(nexo.NexoAPIException):
+        client.get_pairs()
+    assert len(api.calls("GET", "pairs")) == 2
+
+
+def test_ambiguous_order_found_in_history(api):
+    api.add("POST", "orders", INTERNAL_ERROR)
+
+    def history(request):
+        now = time.time() * 1000
+        order = {"id": "abc", "pair": "BTC/USDT", "side": "buy", "quantity": "0.1", "timestamp": now}
+        return 200, {"orders": [order]}
+
+    api.add("GET", "orders", history)
+    client = make_client(api)
+
+    assert client.place_order("BTC/USDT", "buy", "market", "0.1") == {"orderId": "abc"}
+    assert len(api.calls("POST", "orders")) == 1
+
+
+def test_ambiguous_order_found_after_history_lag(api):
+    api.add("POST", "orders", INTERNAL_ERROR)
+
+    def history(request):
+        now = time.time() * 1000
+        order = {"id": "abc", "pair": "BTC/USDT", "side": "buy", "quantity": "0.1", "timestamp": now}
+        return 200, {"orders": [order]}
+
+    api.add("GET", "orders", (200, {"orders": []}), INTERNAL_ERROR, history)
+    client = make_client(api)
+
+    assert client.place_order("BTC/USDT", "buy", "market", "0.1") == {"orderId": "abc"}
+    assert len(api.calls("POST", "orders")) == 1
+
+
+@pytest.mark.parametrize("max_attempts, rejections", [(3, 2), (1, 0)])
+def test_ambiguous_order_checked_on_last_attempt(api, max_attempts, rejections):
+    rejected = (200, {"errorCode": 301, "errorMessage": "Rate limit exceeded"})
+    api.add("POST", "orders", *[rejected] * rejections, INTERNAL_ERROR)
+
+    def history(request):
+        now = time.time() * 1000
+        order = {"id": "abc", "pair": "BTC/USDT", "side": "buy", "quantity": "0.1", "timestamp": now}
+        return 200, {"orders": [order]}
+
+    api.add("GET", "orders", history)
+    client = make_client(api, max_attempts=max_attempts)
+
+    assert client.place_order("BTC/USDT", "buy", "market", "0.1") == {"orderId": "abc"}
+    assert len(api.calls("POST", "orders")) == rejections + 1
+    assert len(api.calls("GET", "orders")) == 1
+
+
+def test_ambiguous_order_lookups_bypass_fresh_results(api):
+    api.add("POST", "orders", INTERNAL_ERROR)
+
+    def history(request):
+        now = time.time() * 1000
+        order = {"id": "abc", "pair": "BTC/USDT", "side": "buy", "quantity": "0.1", "timestamp": now}
+        return 200, {"orders": [order]}
+
+    api.add("GET", "orders", (200, {"orders": []}), history)
+    client = make_client(api)
+    client.single_flight = SingleFlight(freshness=5.0)
+
+    assert client.place_order("BTC/USDT", "buy", "market", "0.1") == {"orderId": "abc"}
+    assert len(api.calls("GET", "orders")) == 2
+
+
+def test_ambiguous_order_not_in_history(api):
+    api.add("POST", "orders", INTERNAL_ERROR, (200, {"orderId": "def"}))
+    api.add("GET", "orders", (200, {"orders": []}))
+    client = make_client(api)
+
+    with pytest.raises(nexo.NexoOrderStateUnknownException) as error:
+        client.place_order("BTC/USDT", "buy", "market", "0.1")
+
+    assert isinstance(error.value.error, nexo.NexoAPIException)
+    assert error.value.data["pair"] == "BTC/USDT"
+    # never sent twice
+    assert len(api.calls("POST", "orders")) == 1
+    assert len(api.calls("GET", "orders")) == 3
+
+
+def test_twap_is_not_retried(api):
+    api.add("POST", "orders/twap", INTERNAL_ERROR, (200, {"orderId": "x"}))
+    client = make_client(api)
+
+    with pytest.raises(nexo.NexoAPIException):
+        client.place_twap_order("BTC/USDT", "buy", "1.0", 10, 60)
+    assert len(api.calls("POST", "orders/twap")) == 1
+
+
+def test_async_get_is_retried(api):
+    api.add("GET", "accountSummary", (502, b"Bad gateway"), (200, {"balances": []}))
+
+    async def main():
+        client = await nexo.AsyncClient.create("key", "secret", retry_policy=fast_policy())
+        client.API_URL = api.url
+        try:
+            return await client.get_account_balances()
+        finally:
+            await client.close_connection()
+
+    assert asyncio.run(main()) == {"balances": []}
+    assert len(api.calls("GET", "accountSummary")) == 2
@@ -0,0 +1,60 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+
+import nexo
+from nexo.scheduler import BULK, DEFAULT, PLACEMENT, QUOTE, URGENT, RequestScheduler
+
+
+def test_priority_for():
+    scheduler = RequestScheduler(nexo.RateLimiter(), priorities={"accountSummary": QUOTE})
+    assert scheduler.priority_for("orders/cancel/all", "post") == URGENT
+    assert scheduler.priority_for("orders", "post") == PLACEMENT
+    assert scheduler.priority_for("orders", "get") == BULK
+    assert scheduler.priority_for("accountSummary") == QUOTE
+    assert scheduler.priority_for("futures/positions") == DEFAULT
+
+
+def test_urgent_requests_preempt_queued_ones():
+    async def main():
+        scheduler = RequestScheduler(nexo.RateLimiter(50.0, 1.0))
+        granted = []
+
+        async def request(path, method, name):
+            await scheduler.acquire(path, method)
+            granted.append(name)
+
+        backfill = [
+            asyncio.ensure_future(request("trades", "get", f"trades-{i}")) for i in range(6)
+        ]
+        await asyncio.sleep(0.05)
+        assert scheduler.queued > 0
+
+        urgent = [
+            asyncio.ensure_future(request("orders", "post", "place")),
+            asyncio.ensure_future(request("orders/cancel/all", "post", "cancel")),
+        ]
+        await asyncio.gather(*backfill, *urgent)
+        return granted
+
+    granted = asyncio.run(main())
+    cancel, place = granted.index("cancel"), granted.index("place")
+    assert place == cancel + 1
+    assert cancel <= 4
+    assert sorted(granted[cancel + 2:]) == granted[cancel + 2:]
+
+
+def test_cancelled_waiter_is_skipped():
+    async def main():
+        scheduler = RequestScheduler(nexo.RateLimiter(50.0, 1.0))
+        await scheduler.acquire("trades")
+        waiter = asyncio.ensure_future(scheduler.acquire("trades"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.wait_for(scheduler.acquire("orders/cancel", "post"), 1.0)
+        return scheduler.queued
+
+    assert asyncio.run(main()) == 0
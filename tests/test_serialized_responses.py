@@ -221,3 +221,101 @@ def test_order_details():
 
     with pytest.raises(AttributeError):
         assert order_details.status == "completed"
+
+
+def test_records_are_slotted():
+    trade_json = {
+        "id": "1",
+        "symbol": "BTC/USDT",
+        "side": "buy",
+        "tradeAmount": "0.1",
+        "executedPrice": "20000",
+        "timestamp": 1000,
+        "orderId": "o1",
+    }
+
+    trade = TradeHistory({"trades": [trade_json]}).trades[0]
+
+    assert not hasattr(trade, "__dict__")
+    assert trade._json_dictionary is None
+    # rebuilt from the fields when not kept
+    assert trade.json_dictionary == trade_json
+    assert str(trade) == str(trade_json)
+
+    with pytest.raises(AttributeError):
+        trade.random = "random"
+
+
+def test_records_keep_json():
+    order_json = {
+        "id": "234",
+        "pair": "NEXO/USDT",
+        "random": "random",
+        "trades": [{"id": "1", "random": "random"}],
+    }
+
+    kept = OrderDetails(order_json, keep_json=True)
+    assert kept.json_dictionary is order_json
+    assert kept.trades[0].json_dictionary is order_json["trades"][0]
+
+    rebuilt = OrderDetails(order_json)
+    assert rebuilt.json_dictionary == {
+        "id": "234",
+        "pair": "NEXO/USDT",
+        "trades": [{"id": "1"}],
+    }
+
+
+def test_lazy_sequence():
+    trades_json = {
+        "trades": [
+            {"id": str(i), "side": "buy" if i % 2 else "sell", "timestamp": i}
+            for i in range(10)
+        ]
+    }
+
+    history = TradeHistory(trades_json, lazy=True)
+    trades = history.trades
+
+    assert isinstance(trades, LazySequence)
+    assert len(trades) == 10
+    assert not trades._cache
+
+    assert trades[3].id == "3"
+    assert trades[-1].id == "9"
+    assert trades[3] is trades[3]
+    assert len(trades._cache) == 2
+
+    assert [t.id for t in trades[2:5]] == ["2", "3", "4"]
+    assert [t.id for t in trades] == [str(i) for i in range(10)]
+
+    with pytest.raises(IndexError):
+        trades[10]
+    cached = len(trades._cache)
+    with pytest.raises(IndexError):
+        trades[-11]
+    assert len(trades._cache) == cached
+
+    # the JSON list is handed back as is
+    assert history.json_dictionary["trades"] is trades_json["trades"]
+
+
+def test_lazy_sequence_filter():
+    orders = Orders(
+        {
+            "orders": [
+                {"id": "1", "pair": "BTC/USDT", "side": "buy"},
+                {"id": "2", "pair": "ETH/USDT", "side": "buy"},
+                {"id": "3", "pair": "BTC/USDT", "side": "sell"},
+            ]
+        },
+        lazy=True,
+    )
+
+    btc_buys = orders.orders.filter(pair="BTC/USDT", side="buy")
+    assert len(btc_buys) == 1
+    assert btc_buys[0].id == "1"
+    assert not orders.orders._cache
+
+    with pytest.raises(AttributeError):
+        orders.orders.filter(random="random")
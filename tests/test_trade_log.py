@@ -0,0 +1,94 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import nexo
+from nexo.response_serializers import TradeHistory
+from nexo.trade_log import SIDES, TradeLog
+
+
+def make_trades(timestamps):
+    return [
+        {
+            "id": "t%d" % i,
+            "symbol": "BTC/USDT",
+            "side": "buy" if i % 2 else "sell",
+            "tradeAmount": "0.5",
+            "executedPrice": "20000.12345678",
+            "timestamp": timestamp,
+            "orderId": "o%d" % i,
+        }
+        for i, timestamp in enumerate(timestamps)
+    ]
+
+
+def test_append_and_read(tmp_path):
+    log = TradeLog(str(tmp_path / "trades.log"))
+    assert len(log) == 0
+    assert len(log.between(0, 10)) == 0
+
+    # newest first, like a history page
+    assert log.append(make_trades([30, 20, 10])) == 3
+
+    records = log.records
+    assert isinstance(records, np.memmap)
+    assert list(records["timestamp"]) == [10, 20, 30]
+    assert records["executed_price"][0] == 2_000_012_345_678
+    assert records["trade_amount"][0] == 50_000_000
+    assert records["symbol"][0] == b"BTC/USDT"
+    assert records["id"][0] == b"t2"
+    assert records["side"][0] == SIDES["sell"]
+
+
+def test_reopen_keeps_precision(tmp_path):
+    name = str(tmp_path / "trades.log")
+    trades = make_trades([1])
+    trades[0]["executedPrice"] = "20000.12"
+    TradeLog(name, decimals=2).append(TradeHistory({"trades": trades}).trades)
+
+    log = TradeLog(name)
+    assert log.decimals == 2
+    assert log.records["executed_price"][0] == 2_000_012
+    assert log.records["order_id"][0] == b"o0"
+
+    # prices are never rounded to fit the log
+    with pytest.raises(ValueError):
+        log.append(make_trades([2]))
+    assert len(TradeLog(name)) == 1
+
+
+def test_rejects_going_back_in_time(tmp_path):
+    log = TradeLog(str(tmp_path / "trades.log"))
+    log.append(make_trades([100]))
+
+    with pytest.raises(ValueError):
+        log.append(make_trades([99]))
+    log.append(make_trades([100, 101]))
+    assert len(log) == 3
+
+
+def test_between(tmp_path):
+    timestamps = sorted(np.random.default_rng(0).integers(0, 10_000, 5_000).tolist())
+    log = TradeLog(str(tmp_path / "trades.log"), index_stride=64)
+    log.append(make_trades(timestamps))
+    stamps = np.array(timestamps)
+
+    for start, end in [(0, 10_000), (-5, -1), (2_500, 2_600), (9_999, 20_000), (4_000, 4_000), (5, 3)]:
+        expected = stamps[(stamps >= start) & (stamps <= end)]
+        assert list(log.between(start, end)["timestamp"]) == list(expected)
+
+    assert len(log.between()) == 5_000
+    assert len(log.between(start_date=5_000)) == (stamps >= 5_000).sum()
+
+
+def test_not_a_log(tmp_path):
+    name = tmp_path / "other.bin"
+    name.write_bytes(b"x" * 64)
+
+    with pytest.raises(ValueError):
+        TradeLog(str(name))
@@ -0,0 +1,90 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+
+import pytest
+
+import nexo
+from nexo.transport import TransportConfig
+
+
+def test_sync_session_pool():
+    config = TransportConfig(pool_size=64, per_host_limit=32)
+    session = config.create_session()
+
+    adapter = session.get_adapter("https://pro-api.nexo.io")
+    assert adapter._pool_maxsize == 32
+    assert adapter.ssl_context is config.ssl_context
+    assert session.headers["User-Agent"] == "python-nexo"
+
+    # the SSL context is built once per config
+    assert config.create_session().get_adapter("https://x").ssl_context is config.ssl_context
+
+
+def test_shared_sync_session(api):
+    api.add("GET", "accountSummary", (200, {"balances": []}))
+    session = TransportConfig().create_session()
+
+    first = nexo.Client("key-1", "secret-1", session=session)
+    second = nexo.Client("key-2", "secret-2", session=session)
+    first.API_URL = second.API_URL = api.url
+
+    assert first.get_account_balances() == {"balances": []}
+    assert second.get_account_balances() == {"balances": []}
+
+    keys = [r["headers"]["X-API-KEY"] for r in api.calls("GET", "accountSummary")]
+    assert keys == ["key-1", "key-2"]
+
+    # a shared session stays open for the other clients
+    first.close_connection()
+    assert second.get_account_balances() == {"balances": []}
+
+
+def test_rate_limited_response_slows_down(api):
+    api.add(
+        "GET",
+        "pairs",
+        (429, {"errorCode": 301, "errorMessage": "Rate limit exceeded"}),
+    )
+    client = nexo.Client("key", "secret")
+    client.API_URL = api.url
+
+    with pytest.raises(nexo.NexoAPIException) as e:
+        client.get_pairs()
+
+    assert e.value.code == 301
+    # every attempt was refused
+    assert client.rate_limiter.rate_limited_count == len(api.calls("GET", "pairs"))
+    assert client.rate_limiter.rate < client.REQUEST_RATE
+
+
+def test_shared_async_session(api):
+    api.add("GET", "accountSummary", (200, {"balances": []}))
+    config = TransportConfig(pool_size=20, keepalive_timeout=5.0, dns_cache_ttl=60)
+
+    async def main():
+        session = config.create_async_session()
+        assert session.connector.limit == 20
+
+        clients = [
+            await nexo.AsyncClient.create(f"key-{i}", "secret", session=session)
+            for i in range(3)
+        ]
+        for client in clients:
+            client.API_URL = api.url
+
+        results = await asyncio.gather(*[c.get_account_balances() for c in clients])
+        for client in clients:
+            await client.close_connection()
+
+        assert not session.closed
+        await session.close()
+        return results
+
+    assert asyncio.run(main()) == [{"balances": []}] * 3
+
+    keys = sorted(r["headers"]["X-API-KEY"] for r in api.calls("GET", "accountSummary"))
+    assert keys == ["key-0", "key-1", "key-2"]
@@ -0,0 +1,181 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import threading
+
+import pytest
+from aiohttp import web
+
+import nexo
+from nexo.retry import RetryPolicy
+from nexo.websocket_client import ThreadedWebSocketClient, WebSocketClient
+
+SECRET = "secret"
+
+
+class StubSocketServer:
+    # Local stand-in for the Nexo Pro WebSocket API, on its own loop thread.
+
+    def __init__(self):
+        self.sockets = []
+        self.authentications = 0
+        self.subscriptions = []
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.sockets.append(ws)
+
+        async for message in ws:
+            call = json.loads(message.data)
+            params = call["params"]
+            response = {"id": call["id"], "result": "ok"}
+
+            if call["method"] == "auth":
+                expected = base64.b64encode(
+                    hmac.new(SECRET.encode(), params["nonce"].encode(), hashlib.sha256).digest()
+                ).decode()
+                if params["signature"] != expected:
+                    response = {"id": call["id"], "errorCode": 103, "errorMessage": "Unauthorized."}
+                else:
+                    self.authentications += 1
+            elif call["method"] == "subscribe":
+                self.subscriptions.append(params["channels"])
+
+            await ws.send_str(json.dumps(response))
+        return ws
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get("/ws", self._handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.url = "http://127.0.0.1:%d/ws" % port
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def start(self):
+        self.thread.start()
+        self._run(self._start())
+
+    def stop(self):
+        self._run(self.runner.cleanup())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    def publish(self, channel, data):
+        async def send():
+            for ws in self.sockets:
+                if not ws.closed:
+                    await ws.send_str(json.dumps({"channel": channel, "data": data}))
+
+        self._run(send())
+
+    def drop_connections(self):
+        async def drop():
+            for ws in self.sockets:
+                await ws.close()
+
+        self._run(drop())
+
+
+@pytest.fixture
+def ws_server():
+    server = StubSocketServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+def fast_policy():
+    return RetryPolicy(base_delay=0.01, max_delay=0.05)
+
+
+async def wait_until(condition, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+def test_subscribe_and_receive(ws_server):
+    async def main():
+        client = await nexo.AsyncClient.create("key", SECRET)
+        try:
+            async with WebSocketClient(client, ws_server.url) as socket:
+                orders = await socket.subscribe("orders")
+                await asyncio.get_event_loop().run_in_executor(
+                    None, ws_server.publish, "orders", {"id": "1", "status": "filled"}
+                )
+                await asyncio.get_event_loop().run_in_executor(
+                    None, ws_server.publish, "balances", {"assetName": "BTC"}
+                )
+                return await asyncio.wait_for(orders.__anext__(), 2)
+        finally:
+            await client.close_connection()
+
+    assert asyncio.run(main()) == {"id": "1", "status": "filled"}
+    assert ws_server.authentications == 1
+    assert ws_server.subscriptions == [["orders"]]
+
+
+def test_reconnect_resubscribes(ws_server):
+    async def main():
+        loop = asyncio.get_event_loop()
+        client = await nexo.AsyncClient.create("key", SECRET)
+        socket = WebSocketClient(client, ws_server.url, retry_policy=fast_policy())
+        try:
+            await socket.connect()
+            trades = await socket.subscribe("trades")
+
+            await loop.run_in_executor(None, ws_server.drop_connections)
+            await wait_until(lambda: ws_server.authentications == 2 and len(ws_server.subscriptions) == 2)
+
+            await loop.run_in_executor(None, ws_server.publish, "trades", {"id": "t1"})
+            message = await asyncio.wait_for(trades.__anext__(), 2)
+            return message, socket.connections
+        finally:
+            await socket.close()
+            await client.close_connection()
+
+    message, connections = asyncio.run(main())
+    assert message == {"id": "t1"}
+    assert connections == 2
+    assert ws_server.subscriptions == [["trades"], ["trades"]]
+
+
+def test_authentication_failure(ws_server):
+    async def main():
+        client = await nexo.AsyncClient.create("key", "wrong secret")
+        try:
+            with pytest.raises(nexo.NexoAPIException) as e:
+                await WebSocketClient(client, ws_server.url).connect()
+            return e.value.code
+        finally:
+            await client.close_connection()
+
+    assert asyncio.run(main()) == 103
+
+
+def test_threaded_client(ws_server):
+    with ThreadedWebSocketClient("key", SECRET, ws_server.url) as socket:
+        balances = socket.subscribe("balances")
+        ws_server.publish("balances", {"assetName": "BTC", "totalBalance": "1"})
+
+        assert next(balances) == {"assetName": "BTC", "totalBalance": "1"}
+
+    assert ws_server.authentications == 1